@@ -0,0 +1,421 @@
+"""Executor assíncrono de testes com progresso em streaming."""
+
+import asyncio
+import time
+import uuid
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    AsyncGenerator,
+    Callable,
+    Collection,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from src import metrics, tracing
+from src.database import Database
+from src.models import Objective, TestRun, TestSummary
+from src.test_runner import (
+    DEFAULT_MAX_ERROR_CHARS,
+    READ_CHUNK_BYTES,
+    OutputCapture,
+    PytestOutputParser,
+    RunLimits,
+    TestFileKey,
+    TestResult,
+    TestRunner,
+)
+
+if TYPE_CHECKING:
+    from src.worker_pool import WarmProcess, WorkerPool
+
+# Processos pytest simultâneos quando nenhum valor é informado
+DEFAULT_CONCURRENCY = 4
+
+# Callback chamado a cada teste concluído
+ResultCallback = Callable[[Objective, TestRun], None]
+
+
+class _AsyncWarmProcess:
+    """Processo de um worker pré-aquecido com a interface usada de asyncio.subprocess.Process."""
+
+    def __init__(self, process: "WarmProcess", stdout: asyncio.StreamReader) -> None:
+        self._process = process
+        self.pid = process.pid
+        self.stdout = stdout
+
+    @classmethod
+    async def connect(cls, process: "WarmProcess") -> "_AsyncWarmProcess":
+        """Liga a saída do processo ao loop de eventos."""
+        reader = asyncio.StreamReader()
+        loop = asyncio.get_running_loop()
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), process.stdout)
+        return cls(process, reader)
+
+    @property
+    def returncode(self) -> Optional[int]:
+        return self._process.returncode
+
+    async def wait(self) -> int:
+        # O worker responde pelo socket de controle, lido em uma thread
+        return await asyncio.to_thread(self._process.wait)
+
+
+class AsyncTestRunner(TestRunner):
+    """Executa testes em paralelo com asyncio.
+
+    Cada arquivo de teste roda em um processo pytest próprio; até
+    `concurrency` processos ficam ativos ao mesmo tempo. A saída é lida
+    linha a linha e cada resultado é persistido assim que o teste
+    termina, sem esperar o arquivo ou o objetivo inteiro.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        quiet: bool = False,
+        limits: Optional[RunLimits] = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        on_result: Optional[ResultCallback] = None,
+        selection: Optional[Collection[TestFileKey]] = None,
+        retries: int = 0,
+        coverage: bool = False,
+        max_error_chars: int = DEFAULT_MAX_ERROR_CHARS,
+        workers: Optional["WorkerPool"] = None,
+    ) -> None:
+        """Inicializa o runner.
+
+        Args:
+            db: Banco de dados onde os resultados são persistidos.
+            quiet: Se True, mensagens de progresso vão para stderr.
+            limits: Timeouts e limites de recursos padrão.
+            concurrency: Máximo de processos pytest simultâneos.
+            on_result: Chamado com (objetivo, execução) a cada teste concluído.
+            selection: Arquivos (objective_id, nome do arquivo) a executar.
+            retries: Reexecuções dos testes que falharem.
+            coverage: Registra as linhas executadas por objetivo.
+            max_error_chars: Tamanho máximo de error_message nos resultados.
+            workers: Pool de workers pytest pré-aquecidos; use `concurrency`
+                workers para não limitar o paralelismo.
+        """
+        super().__init__(
+            db,
+            quiet=quiet,
+            limits=limits,
+            selection=selection,
+            retries=retries,
+            coverage=coverage,
+            max_error_chars=max_error_chars,
+            workers=workers,
+        )
+        self.concurrency = max(1, concurrency)
+        self.on_result = on_result
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def execute_objective(
+        self,
+        objective_id: str,
+        base_path: Optional[Path] = None,
+        deadline: Optional[float] = None,
+    ) -> Optional[Tuple[TestSummary, List[TestRun]]]:
+        """Versão síncrona de execute_objective_async."""
+        self._semaphore = None
+        return asyncio.run(self.execute_objective_async(objective_id, base_path, deadline))
+
+    def iter_all_tests(
+        self, deadline: Optional[float] = None, fail_fast: bool = False
+    ) -> Iterator[Tuple[Objective, TestSummary, List[TestRun]]]:
+        """Executa todos os objetivos, produzindo cada um na ordem de conclusão.
+
+        Os processos continuam rodando enquanto o consumidor trata um
+        resultado; o loop de eventos só avança ao pedir o próximo.
+        """
+        loop = asyncio.new_event_loop()
+        results = self.aiter_all_tests(deadline, fail_fast)
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(results.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            loop.run_until_complete(results.aclose())
+            loop.close()
+
+    async def aiter_all_tests(
+        self, deadline: Optional[float] = None, fail_fast: bool = False
+    ) -> AsyncGenerator[Tuple[Objective, TestSummary, List[TestRun]], None]:
+        """Executa testes de todos os objetivos em paralelo.
+
+        Os objetivos rodam por nível do grafo de dependências: um nível só
+        começa quando o anterior termina, e dentro dele os objetivos
+        disputam as vagas na ordem de schedule_objectives. Dependentes de
+        objetivos que falharam (ou estão bloqueados) são pulados.
+
+        Args:
+            deadline: Prazo global em segundos. Arquivos que não
+                conseguirem iniciar dentro do prazo são registrados como
+                ERROR por orçamento esgotado.
+            fail_fast: Cancela os objetivos restantes (encerrando seus
+                processos) após o primeiro objetivo com falha.
+
+        Yields:
+            Tuplas (objetivo, sumário, execuções) na ordem de conclusão.
+        """
+        global_deadline = time.monotonic() + deadline if deadline else None
+        levels = self._scheduled_levels()
+        total = sum(len(level) for level in levels)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(
+            obj: Objective,
+        ) -> Tuple[Objective, Optional[Tuple[TestSummary, List[TestRun]]]]:
+            return obj, await self.execute_objective_async(obj.id, deadline=global_deadline)
+
+        tasks: List[
+            "asyncio.Future[Tuple[Objective, Optional[Tuple[TestSummary, List[TestRun]]]]]"
+        ] = []
+        done = 0
+        try:
+            for level in levels:
+                runnable = []
+                for obj in level:
+                    blocker = self._blocked_by(obj)
+                    if blocker is None:
+                        runnable.append(obj)
+                    else:
+                        done += 1
+                        self._log(
+                            f"⏭️  Pulando {obj.nome}: depende de '{blocker.nome}', "
+                            "que falhou ou está bloqueado"
+                        )
+                tasks = [asyncio.ensure_future(run(obj)) for obj in runnable]
+                for next_done in asyncio.as_completed(tasks):
+                    obj, result = await next_done
+                    done += 1
+                    if result:
+                        yield obj, result[0], result[1]
+                        if fail_fast and not result[0].is_passing() and done < total:
+                            self._log(f"🛑 --fail-fast: {total - done} objetivo(s) interrompido(s)")
+                            return
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def execute_objective_async(
+        self,
+        objective_id: str,
+        base_path: Optional[Path] = None,
+        deadline: Optional[float] = None,
+    ) -> Optional[Tuple[TestSummary, List[TestRun]]]:
+        """Executa os arquivos de teste de um objetivo concorrentemente.
+
+        Args:
+            objective_id: ID do objetivo.
+            base_path: Caminho base para testes (opcional). Se None, usa "tests".
+            deadline: Prazo global (time.monotonic) que limita o orçamento.
+
+        Returns:
+            Tupla (TestSummary, execuções desta rodada) ou None se falhar.
+        """
+        with tracing.span("objective", "runner", objective_id=objective_id):
+            prepared = self._prepare_objective(objective_id, base_path)
+            if prepared is None:
+                return None
+            objective, test_files = prepared
+            if self._semaphore is None:
+                self._semaphore = asyncio.Semaphore(self.concurrency)
+
+            self._log(f"🧪 Executando testes para: {objective.nome}")
+            run_id = str(uuid.uuid4())
+            run_started = time.perf_counter()
+            started: List[Tuple[Optional[float], Optional[float]]] = []
+            coverage: Dict[str, Set[int]] = {}
+            recorded = self.db.count_latest_results_by_file(objective_id)
+
+            def budget() -> Tuple[Optional[float], Optional[float]]:
+                # O orçamento do objetivo começa quando o primeiro arquivo inicia
+                if not started:
+                    started.append(self._budget(objective, deadline))
+                return started[0]
+
+            per_file = await asyncio.gather(
+                *(
+                    self._run_file(objective, run_id, test_file, budget, coverage, recorded)
+                    for test_file in test_files
+                )
+            )
+
+            test_runs = [test_run for runs in per_file for test_run in runs]
+            with tracing.span("persist", "runner", tests=len(test_runs)):
+                summary = TestSummary.from_test_runs(objective_id, test_runs)
+                self.db.prune_latest_test_results(
+                    objective_id, run_id, {run.test_file for run in test_runs}
+                )
+                self._record_summary(summary)
+                self._check_durations(test_runs)
+                self._store_coverage(objective_id, coverage)
+            self._record_metrics(objective_id, test_runs, time.perf_counter() - run_started)
+            return summary, test_runs
+
+    async def _run_file(
+        self,
+        objective: Objective,
+        run_id: str,
+        test_file: Path,
+        budget: Callable[[], Tuple[Optional[float], Optional[float]]],
+        coverage: Dict[str, Set[int]],
+        recorded: Dict[str, int],
+    ) -> List[TestRun]:
+        """Executa um arquivo, persistindo cada resultado ao chegar.
+
+        Testes que falharem são reexecutados (apenas seus node IDs) até
+        `retries` vezes, mantendo a vaga do semáforo. `recorded` traz os
+        testes por arquivo do último resultado, lidos antes da rodada.
+        """
+        test_runs: List[TestRun] = []
+
+        def publisher(attempt: int) -> Callable[[List[TestResult]], None]:
+            def publish(results: List[TestResult]) -> None:
+                for result in results:
+                    test_run = self._make_test_run(objective.id, run_id, test_file, result, attempt)
+                    self.db.save_test_run(test_run)
+                    test_runs.append(test_run)
+                    if self.on_result:
+                        self.on_result(objective, test_run)
+
+            return publish
+
+        assert self._semaphore is not None
+        async with self._semaphore:
+            test_timeout, objective_deadline = budget()
+            targets: Optional[List[str]] = None
+            for attempt in range(1, self.retries + 2):
+                timeout = self._file_timeout(
+                    test_timeout,
+                    objective_deadline,
+                    self._expected_tests(recorded, test_file, targets),
+                )
+                if timeout <= 0:
+                    if attempt == 1:
+                        publisher(attempt)([self._budget_exhausted(test_file)])
+                    break
+                if targets:
+                    self._log_retry(test_file, targets, attempt)
+                parser = PytestOutputParser()
+                coverage_out = self._coverage_file()
+                try:
+                    with tracing.span("pytest", "runner", file=test_file.name, attempt=attempt):
+                        results = await self._run_attempt(
+                            test_file,
+                            targets,
+                            timeout,
+                            test_timeout,
+                            parser,
+                            publisher(attempt),
+                            coverage_out,
+                        )
+                finally:
+                    self._collect_coverage(coverage_out, coverage)
+                if results is None:
+                    break
+                targets = self._retry_targets(results, parser)
+                if not targets:
+                    break
+        return test_runs
+
+    async def _run_attempt(
+        self,
+        test_file: Path,
+        node_ids: Optional[List[str]],
+        timeout: Optional[float],
+        test_timeout: Optional[float],
+        parser: PytestOutputParser,
+        publish: Callable[[List[TestResult]], None],
+        coverage_out: Optional[Path] = None,
+    ) -> Optional[List[TestResult]]:
+        """Executa o pytest uma vez, publicando os resultados em streaming.
+
+        Returns:
+            Resultados desta tentativa ou None se o processo não iniciou.
+        """
+        results: List[TestResult] = []
+
+        def collect(batch: List[TestResult]) -> None:
+            results.extend(batch)
+            publish(batch)
+
+        try:
+            process: "asyncio.subprocess.Process | _AsyncWarmProcess"
+            if self.workers is not None:
+                warm = await asyncio.to_thread(
+                    self._start_warm, test_file, node_ids, test_timeout, coverage_out
+                )
+                process = await _AsyncWarmProcess.connect(warm)
+            else:
+                process = await asyncio.create_subprocess_exec(
+                    *self._pytest_command(test_file, node_ids),
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.STDOUT,
+                    env=self._pytest_env(test_timeout, coverage_out),
+                    start_new_session=True,
+                    preexec_fn=self.limits.preexec(),
+                )
+        except OSError as e:
+            self._log(f"❌ Erro ao executar pytest: {e}")
+            return None
+        metrics.PYTEST_SPAWNS.inc()
+
+        capture = OutputCapture()
+        try:
+            await asyncio.wait_for(self._consume(process, parser, capture, collect), timeout)
+        except asyncio.TimeoutError:
+            self._kill_process_group(process.pid)
+            # O restante da saída, incluindo a linha do teste em andamento
+            await self._consume(process, parser, capture, collect)
+            self._log(f"⏱️  Timeout ao executar {test_file} ({timeout:.1f}s)")
+            collect(parser.close())
+            collect(
+                [
+                    self._interrupted_result(
+                        parser,
+                        capture,
+                        test_file,
+                        f"Timeout: arquivo interrompido após {timeout:.1f}s",
+                    )
+                ]
+            )
+            return results
+        except asyncio.CancelledError:
+            self._kill_process_group(process.pid)
+            await process.wait()
+            raise
+
+        collect(parser.close())
+        if process.returncode is not None and process.returncode < 0:
+            reason = self._signal_reason(test_file, process.returncode)
+            collect([self._interrupted_result(parser, capture, test_file, reason)])
+        return results
+
+    async def _consume(
+        self,
+        process: "asyncio.subprocess.Process | _AsyncWarmProcess",
+        parser: PytestOutputParser,
+        capture: OutputCapture,
+        publish: Callable[[List[TestResult]], None],
+    ) -> None:
+        """Lê a saída do processo em blocos até o fim da execução."""
+        assert process.stdout is not None
+        while True:
+            chunk = await process.stdout.read(READ_CHUNK_BYTES)
+            if not chunk:
+                break
+            publish(self._feed_lines(parser, capture, capture.feed(chunk)))
+        publish(self._feed_lines(parser, capture, capture.close()))
+        await process.wait()
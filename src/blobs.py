@@ -0,0 +1,193 @@
+"""Armazenamento de textos grandes comprimidos, endereçados pelo conteúdo."""
+
+import hashlib
+import os
+import re
+import sys
+import tempfile
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional, Set
+
+if sys.version_info >= (3, 14):
+    try:
+        from compression import zstd
+    except ImportError:  # pragma: no cover - Python compilado sem zstd
+        zstd = None  # type: ignore[assignment]
+else:  # pragma: no cover - depende da versão do Python
+    zstd = None
+
+# Diretório dos blobs, ao lado do banco do projeto (state/blobs)
+BLOB_DIR_NAME = "blobs"
+
+# Níveis de compressão (textos de log comprimem bem já nos níveis padrão)
+ZSTD_LEVEL = 3
+ZLIB_LEVEL = 6
+
+# Tamanho padrão das prévias de texto (ex.: error_message exibido a partir do banco)
+DEFAULT_PREVIEW_CHARS = 8 * 1024
+
+# Caracteres de textos decodificados mantidos em memória
+CACHE_CHARS = 4 * 1024 * 1024
+
+# Blobs mais novos que isto não são removidos pela coleta de lixo: podem
+# ter sido gravados por uma execução cuja linha ainda não chegou ao banco
+GC_GRACE_SECONDS = 3600
+
+# Referência de um blob: sha256 do conteúdo em hexadecimal
+_REF_RE = re.compile(r"[0-9a-f]{64}")
+
+# Início de um frame zstd; streams zlib começam com 0x78
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def truncate_middle(text: str, max_chars: int, note: str) -> str:
+    """Corta o meio do texto para caber em max_chars, indicando o corte.
+
+    Mantém um quarto do limite no início (local do teste) e o restante
+    no fim, onde ficam a exceção e a asserção que falhou.
+    """
+    if len(text) <= max_chars:
+        return text
+    head = max_chars // 4
+    tail = max_chars - head
+    omitted = len(text) - head - tail
+    return f"{text[:head]}\n[... {omitted} caracteres omitidos; {note} ...]\n{text[-tail:]}"
+
+
+def _compress(data: bytes) -> bytes:
+    if zstd is not None:
+        return zstd.compress(data, level=ZSTD_LEVEL)
+    return zlib.compress(data, ZLIB_LEVEL)
+
+
+def _decompress(data: bytes) -> bytes:
+    """Descomprime pelo formato do blob (zstd ou zlib), não pelo disponível agora."""
+    if data.startswith(_ZSTD_MAGIC):
+        if zstd is None:
+            raise ValueError("blob zstd requer Python 3.14+")
+        return zstd.decompress(data)
+    return zlib.decompress(data)
+
+
+@dataclass
+class BlobGcReport:
+    """Resultado da coleta de lixo do armazenamento."""
+
+    removed: int = 0
+    bytes_freed: int = 0
+
+
+class BlobStore:
+    """Textos (saídas e tracebacks) gravados comprimidos em arquivos.
+
+    Cada blob é identificado pelo sha256 do texto e gravado em
+    <raiz>/<2 primeiros dígitos>/<restante>, comprimido com zstd quando
+    disponível (Python 3.14+) ou zlib; textos idênticos, como a mesma
+    falha repetida a cada rodada, ocupam um único arquivo. A gravação
+    usa arquivo temporário + rename, então leitores nunca veem um blob
+    incompleto. Textos lidos ficam em um cache LRU limitado.
+    """
+
+    def __init__(self, root: Path) -> None:
+        """Inicializa o armazenamento (o diretório é criado na primeira gravação)."""
+        self.root = root
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cache_chars = 0
+
+    @classmethod
+    def for_database(cls, db_path: Path) -> "BlobStore":
+        """Armazenamento do projeto cujo banco está em db_path."""
+        return cls(db_path.parent / BLOB_DIR_NAME)
+
+    def _path(self, ref: str) -> Path:
+        return self.root / ref[:2] / ref[2:]
+
+    def put(self, text: str) -> str:
+        """Grava o texto (se ainda não existir) e retorna sua referência."""
+        data = text.encode("utf-8")
+        ref = hashlib.sha256(data).hexdigest()
+        path = self._path(ref)
+        try:
+            # Já existe: só renova o mtime, protegendo-o da coleta de lixo
+            os.utime(path)
+            return ref
+        except FileNotFoundError:
+            pass
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(_compress(data))
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        return ref
+
+    def exists(self, ref: str) -> bool:
+        """Indica se a referência está gravada."""
+        return bool(_REF_RE.fullmatch(ref)) and self._path(ref).is_file()
+
+    def get(self, ref: str) -> Optional[str]:
+        """Texto de uma referência, ou None se não houver (ou estiver corrompido)."""
+        cached = self._cache.get(ref)
+        if cached is not None:
+            self._cache.move_to_end(ref)
+            return cached
+        if not _REF_RE.fullmatch(ref):
+            return None
+        try:
+            text = _decompress(self._path(ref).read_bytes()).decode("utf-8", errors="replace")
+        except (OSError, ValueError, zlib.error):
+            return None
+        self._remember(ref, text)
+        return text
+
+    def _remember(self, ref: str, text: str) -> None:
+        if len(text) > CACHE_CHARS // 4:
+            return
+        self._cache[ref] = text
+        self._cache_chars += len(text)
+        while self._cache_chars > CACHE_CHARS:
+            _, evicted = self._cache.popitem(last=False)
+            self._cache_chars -= len(evicted)
+
+    def refs(self) -> Iterator[str]:
+        """Todas as referências gravadas."""
+        if not self.root.is_dir():
+            return
+        for bucket in self.root.iterdir():
+            if not bucket.is_dir():
+                continue
+            for entry in bucket.iterdir():
+                ref = bucket.name + entry.name
+                if _REF_RE.fullmatch(ref):
+                    yield ref
+
+    def gc(self, live: Set[str], grace_seconds: float = GC_GRACE_SECONDS) -> BlobGcReport:
+        """Remove blobs fora de `live` (e temporários abandonados) mais velhos que a carência."""
+        report = BlobGcReport()
+        if not self.root.is_dir():
+            return report
+        cutoff = time.time() - grace_seconds
+        for bucket in self.root.iterdir():
+            if not bucket.is_dir():
+                continue
+            for entry in os.scandir(bucket):
+                ref = bucket.name + entry.name
+                if ref in live or not (_REF_RE.fullmatch(ref) or entry.name.startswith(".tmp-")):
+                    continue
+                stat = entry.stat()
+                if stat.st_mtime > cutoff:
+                    continue
+                os.unlink(entry.path)
+                self._cache.pop(ref, None)
+                report.removed += 1
+                report.bytes_freed += stat.st_size
+            if not any(bucket.iterdir()):
+                bucket.rmdir()
+        return report
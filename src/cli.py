@@ -1,17 +1,40 @@
 """CLI principal do Vibe."""
 
+import json
+import re
+import subprocess
+from dataclasses import asdict
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, TextIO, Tuple
 
 import click
 
-from src import __version__
-from src.database import Database
+from src import __version__, dependencies
+from src.database import (
+    JUMP_BASELINE_RUNS,
+    OBJECT_CACHE_SIZE,
+    RETENTION_KEEP_LAST_KEY,
+    AmbiguousObjectiveIdError,
+    AmbiguousTestRunIdError,
+    Database,
+)
 from src.models import Objective, ObjectiveStatus, ObjectiveType, TestRun, TestStatus, TestSummary
 from src.project import init_project
-from src.validator import StructureValidator
-from src.test_generator import generate_tests_for_objective, map_objective_to_test_types
-from src.test_runner import TestRunner
+from src.test_generator import (
+    generate_tests_for_objective,
+    map_objective_to_test_types,
+    sync_tests_for_objective,
+)
+from src.validator import StructureValidator, affected_objectives, staged_paths
+
+if TYPE_CHECKING:
+    # Importados sob demanda: carregam o pytest e pesariam em todo comando
+    # (ex.: `project check --changed` no pre-commit)
+    from src.sharding import Shard
+    from src.test_runner import TestRunner
+    from src.worker_pool import WorkerPool
+    from src.workspace import ProjectRun, Workspace
 
 
 @click.group()
@@ -34,7 +57,11 @@ def project() -> None:
 
 @main.group()
 def objective() -> None:
-    """Gerenciamento de objetivos."""
+    """Gerenciamento de objetivos.
+
+    Comandos que recebem OBJECTIVE_ID aceitam o ID completo ou um prefixo
+    único, como o ID curto de 8 caracteres exibido por `objective list`.
+    """
     pass
 
 
@@ -44,57 +71,114 @@ def test() -> None:
     pass
 
 
+@main.group()
+def workspace() -> None:
+    """Workspace com vários projetos (índice em $VIBE_WORKSPACE)."""
+    pass
+
+
+@main.group()
+def db() -> None:
+    """Manutenção do banco de estado."""
+    pass
+
+
 @project.command(name="check")
 @click.argument("path", required=False, default=".")
-def project_check(path: str) -> None:
-    """Valida a estrutura canônica do projeto."""
+@click.argument("files", nargs=-1)
+@click.option("--full", is_flag=True, help="Ignorar o cache e reavaliar todas as regras")
+@click.option(
+    "--changed",
+    is_flag=True,
+    help="Verificar só os objetivos afetados por FILES (ou pelos arquivos staged no git)",
+)
+def project_check(path: str, files: Tuple[str, ...], full: bool, changed: bool) -> None:
+    """Valida a estrutura canônica do projeto.
+
+    Resultados por regra e objetivo ficam em cache no banco; apenas os
+    objetivos cujas entradas mudaram (arquivos de teste, status, sumário)
+    são reavaliados.
+
+    Com --changed, apenas as regras de integridade e saúde dos objetivos
+    com arquivos em tests/objectives/<id>/ entre FILES são verificadas
+    (sem FILES, usa os arquivos staged no git). Uso em pre-commit:
+    `vibe project check --changed . <arquivos>`.
+    """
     project_path = Path(path)
+    if files and not changed:
+        click.secho("❌ Arquivos só podem ser informados com --changed", fg="red")
+        raise SystemExit(1)
+    objective_ids = None
+    if changed:
+        if files:
+            paths = list(files)
+        else:
+            try:
+                paths = staged_paths(project_path)
+            except (OSError, subprocess.CalledProcessError) as e:
+                click.secho(f"❌ Não foi possível ler os arquivos staged do git: {e}", fg="red")
+                raise SystemExit(2) from e
+        objective_ids = affected_objectives(paths, project_path)
+        if not objective_ids:
+            click.secho("✓ Nenhum objetivo afetado pelas alterações.", fg="green")
+            raise SystemExit(0)
     validator = StructureValidator(project_path)
-    errors = validator.validate_canonical_structure()
-    
-    # Validar integridade dos objetivos
-    objective_errors = validator.validate_objectives_integrity()
-    errors.extend(objective_errors)
+    report = validator.run_checks(full=full, objective_ids=objective_ids)
+    errors = report.structure_errors + report.integrity_errors
     
     # Validar saúde dos testes
     click.echo("🧪 Validação de Testes")
     click.echo("")
     
-    health_problems = validator.check_test_health()
     warnings = []
     critical_errors = []
     
-    for problem in health_problems:
+    for problem in report.health_problems:
         if "marcado como CONCLUIDO" in problem:
             critical_errors.append(problem)
         else:
             warnings.append(problem)
+    # Testes que ficaram mais lentos (regressões de duração registradas pelo runner)
+    warnings.extend(report.performance_warnings)
     
     # Exibir status dos objetivos
-    db_path = project_path / "state" / "vibe.db"
-    if db_path.exists():
-        db = Database(db_path)
-        objectives = db.list_objectives()
-        
-        for obj in objectives:
-            summary = db.get_test_summary(obj.id)
-            if summary:
-                if summary.is_passing():
-                    click.secho(f"✅ Objetivo {obj.id[:8]}: {summary.passed}/{summary.total_tests} testes passando", fg="green")
-                else:
-                    rate = summary.success_rate() * 100
-                    click.secho(f"⚠️  Objetivo {obj.id[:8]}: {summary.passed}/{summary.total_tests} testes passando ({rate:.1f}%)", fg="yellow")
+    for obj in report.objectives:
+        summary = report.summaries.get(obj.id)
+        if summary:
+            if summary.is_passing():
+                click.secho(
+                    f"✅ Objetivo {obj.id[:8]}: "
+                    f"{summary.passed}/{summary.total_tests} testes passando",
+                    fg="green",
+                )
             else:
-                click.secho(f"⏸️  Objetivo {obj.id[:8]}: Testes não executados", fg="white")
-    
+                rate = summary.success_rate() * 100
+                click.secho(
+                    f"⚠️  Objetivo {obj.id[:8]}: "
+                    f"{summary.passed}/{summary.total_tests} testes passando ({rate:.1f}%)",
+                    fg="yellow",
+                )
+        else:
+            click.secho(f"⏸️  Objetivo {obj.id[:8]}: Testes não executados", fg="white")
+
+    if report.reused:
+        click.echo(
+            f"♻️  Cache: {report.reused} verificação(ões) reaproveitada(s), "
+            f"{report.evaluated} reavaliada(s)"
+        )
     click.echo("")
 
     # Combinar todos os erros
     all_errors = errors + critical_errors
-    
+
     if not all_errors and not warnings:
-        click.secho("✓ Estrutura válida!", fg="green")
-        click.secho("✓ Todos os objetivos têm testes.", fg="green")
+        if objective_ids is None:
+            click.secho("✓ Estrutura válida!", fg="green")
+            click.secho("✓ Todos os objetivos têm testes.", fg="green")
+        else:
+            click.secho(
+                f"✓ {len(report.objectives)} objetivo(s) afetado(s) têm testes.", fg="green"
+            )
         click.secho("✓ Saúde dos testes OK.", fg="green")
         raise SystemExit(0)
     else:
@@ -103,19 +187,19 @@ def project_check(path: str) -> None:
             click.echo("\nErros encontrados:")
             for error in all_errors:
                 click.echo(f"  • {error}")
-        
+
         if warnings:
             click.echo("\nAvisos:")
             for warning in warnings:
                 click.secho(f"  • {warning}", fg="yellow")
-        
+
         if critical_errors:
             click.echo(f"\nResultado: ❌ FALHOU (Problemas críticos: {len(critical_errors)})")
         elif all_errors:
             click.echo(f"\nResultado: ❌ FALHOU (Problemas: {len(all_errors)})")
         else:
             click.echo(f"\nResultado: ⚠️  AVISOS ({len(warnings)} avisos)")
-        
+
         if critical_errors or all_errors:
             raise SystemExit(1)
         else:
@@ -157,10 +241,72 @@ def project_init(path: str, force: bool) -> None:
 
 
 def _get_database() -> Database:
-    """Retorna instância do banco de dados padrão."""
+    """Retorna instância do banco de dados padrão.
+
+    A instância vive apenas durante o comando, então usa o cache de
+    objetivos e sumários para evitar leituras repetidas.
+    """
     db_path = Path("state/vibe.db")
     db_path.parent.mkdir(exist_ok=True)
-    return Database(db_path)
+    return Database(db_path, cache_size=OBJECT_CACHE_SIZE)
+
+
+def _find_objective(db: Database, objective_id: str) -> Optional[Objective]:
+    """Busca um objetivo pelo ID completo ou por um prefixo (ex.: o ID curto).
+
+    Exibe o erro (não encontrado ou prefixo ambíguo, com os candidatos)
+    e retorna None quando não há um único objetivo correspondente.
+    """
+    try:
+        resolved = db.resolve_objective_id(objective_id)
+    except AmbiguousObjectiveIdError as e:
+        click.secho(f"❌ Prefixo '{objective_id}' é ambíguo; corresponde a:", fg="red")
+        for candidate in e.candidates:
+            obj = db.get_objective(candidate)
+            click.echo(f"   {candidate}  {obj.nome if obj else ''}")
+        click.echo("   Informe mais caracteres do ID")
+        return None
+    objective = db.get_objective(resolved) if resolved else None
+    if not objective:
+        click.secho(f"❌ Objetivo '{objective_id}' não encontrado", fg="red")
+    return objective
+
+
+OUTPUT_FORMATS = ["text", "json", "ndjson"]
+
+
+def _format_option(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Adiciona a opção --format (text, json ou ndjson) a um comando."""
+    return click.option(
+        "--format",
+        "output_format",
+        type=click.Choice(OUTPUT_FORMATS),
+        default="text",
+        show_default=True,
+        help="Formato de saída (json: um documento; ndjson: um registro por linha)",
+    )(func)
+
+
+def _emit_records(records: Iterable[Dict[str, Any]], output_format: str) -> None:
+    """Emite registros em JSON (um array) ou NDJSON (streaming, um por linha)."""
+    if output_format == "ndjson":
+        for record in records:
+            click.echo(json.dumps(record, ensure_ascii=False))
+    else:
+        click.echo(json.dumps(list(records), ensure_ascii=False))
+
+
+def _test_result_record(
+    objective: Objective, summary: Optional[TestSummary], test_runs: Optional[List[TestRun]] = None
+) -> Dict[str, Any]:
+    """Monta o registro estruturado de resultados de testes de um objetivo."""
+    record: Dict[str, Any] = {
+        "objective": objective.to_dict(),
+        "summary": summary.to_dict() if summary else None,
+    }
+    if test_runs is not None:
+        record["test_runs"] = [run.to_dict() for run in test_runs]
+    return record
 
 
 @objective.command(name="new")
@@ -290,11 +436,221 @@ def objective_new() -> None:
     click.echo("   Implemente-os antes de marcar o objetivo como concluído.")
 
 
+@objective.command(name="generate-tests")
+@click.argument("objective_id")
+def objective_generate_tests(objective_id: str) -> None:
+    """Regenera testes para um objetivo existente.
+
+    Apenas arquivos cujo conteúdo mudaria são reescritos; arquivos
+    editados manualmente são preservados.
+    """
+    db = _get_database()
+    objective = _find_objective(db, objective_id)
+    if not objective:
+        raise SystemExit(1)
+
+    if not map_objective_to_test_types(objective):
+        click.secho("❌ Objetivo não possui tipos que gerem testes", fg="red")
+        raise SystemExit(1)
+
+    try:
+        report = sync_tests_for_objective(objective)
+    except OSError as e:
+        click.secho(f"❌ Falha ao gerar testes: {e}", fg="red")
+        raise SystemExit(2) from e
+
+    click.echo(f"📋 Testes do objetivo: {objective.nome}")
+    for name in report.created:
+        click.secho(f"   ➕ criado: {name}", fg="green")
+    for name in report.updated:
+        click.secho(f"   🔄 atualizado: {name}", fg="green")
+    for name in report.skipped:
+        click.echo(f"   ⏭️  inalterado: {name}")
+    for name in report.protected:
+        click.secho(f"   🔒 protegido (editado manualmente): {name}", fg="yellow")
+    click.echo(f"   Localização: tests/objectives/{objective.id}/")
+
+
+@objective.command(name="depend")
+@click.argument("objective_id")
+@click.argument("depends_on", nargs=-1, required=True)
+def objective_depend(objective_id: str, depends_on: Tuple[str, ...]) -> None:
+    """Declara que OBJECTIVE_ID depende dos objetivos DEPENDS_ON.
+
+    Dependências que formariam um ciclo são recusadas. O objetivo fica
+    BLOQUEADO enquanto alguma dependência falhar ou estiver bloqueada.
+    """
+    db = _get_database()
+    objective = _find_objective(db, objective_id)
+    if not objective:
+        raise SystemExit(1)
+    objective_id = objective.id
+
+    errors = 0
+    for dep_ref in depends_on:
+        dep = _find_objective(db, dep_ref)
+        if not dep:
+            errors += 1
+            continue
+        try:
+            added = dependencies.add_dependency(db, objective_id, dep.id)
+        except dependencies.DependencyCycleError as e:
+            click.secho(f"❌ {e}", fg="red")
+            errors += 1
+            continue
+        if added:
+            click.secho(f"🔗 {objective.nome} depende de {dep.nome}", fg="green")
+        else:
+            click.echo(f"⏭️  {objective.nome} já depende de {dep.nome}")
+
+    objective = db.get_objective(objective_id)
+    if objective and objective.status == ObjectiveStatus.BLOQUEADO:
+        click.secho("🔒 Objetivo bloqueado por dependência com falha", fg="yellow")
+    if errors:
+        raise SystemExit(1)
+
+
+@objective.command(name="undepend")
+@click.argument("objective_id")
+@click.argument("depends_on", nargs=-1, required=True)
+def objective_undepend(objective_id: str, depends_on: Tuple[str, ...]) -> None:
+    """Remove dependências de OBJECTIVE_ID."""
+    db = _get_database()
+    objective = _find_objective(db, objective_id)
+    if not objective:
+        raise SystemExit(1)
+    missing = 0
+    for dep_ref in depends_on:
+        # Prefixos são resolvidos entre as dependências atuais do objetivo
+        matches = [dep_id for dep_id in objective.dependencias if dep_id.startswith(dep_ref)]
+        if dep_ref in matches:
+            matches = [dep_ref]
+        if len(matches) > 1:
+            click.secho(
+                f"⚠️  Prefixo '{dep_ref}' é ambíguo entre as dependências: {', '.join(matches)}",
+                fg="yellow",
+            )
+            missing += 1
+            continue
+        dep_id = matches[0] if matches else dep_ref
+        if dependencies.remove_dependency(db, objective.id, dep_id):
+            click.secho(f"✂️  Dependência de '{dep_id}' removida", fg="green")
+        else:
+            click.secho(f"⚠️  '{dep_ref}' não era dependência deste objetivo", fg="yellow")
+            missing += 1
+    if missing:
+        raise SystemExit(1)
+
+
+IMPORT_BATCH_SIZE = 1000
+
+
+@objective.command(name="import")
+@click.argument("source", type=click.File("r", encoding="utf-8"), default="-")
+@click.option("--no-tests", is_flag=True, help="Não gerar testes para os objetivos importados")
+@click.option(
+    "--batch-size",
+    type=click.IntRange(min=1),
+    default=IMPORT_BATCH_SIZE,
+    show_default=True,
+    help="Objetivos inseridos por transação",
+)
+def objective_import(source: TextIO, no_tests: bool, batch_size: int) -> None:
+    """Importa objetivos de um arquivo JSONL (um objetivo por linha).
+
+    SOURCE é o caminho do arquivo ou '-' para ler da entrada padrão.
+    Objetivos com ID já existente são ignorados. Um lote com dependência
+    inexistente ou ciclo de dependências é recusado por inteiro.
+    """
+    db = _get_database()
+    imported = 0
+    duplicated = 0
+    invalid = 0
+    tests_failed = 0
+    batch: List[Objective] = []
+
+    def flush() -> None:
+        nonlocal imported, duplicated, invalid, tests_failed
+        try:
+            inserted = db.create_objectives(batch)
+        except ValueError as e:
+            # Dependência inexistente ou ciclo: o lote inteiro é descartado
+            invalid += len(batch)
+            click.secho(f"❌ Lote de {len(batch)} objetivo(s) recusado: {e}", fg="red", err=True)
+            batch.clear()
+            return
+        imported += len(inserted)
+        duplicated += len(batch) - len(inserted)
+        if not no_tests:
+            for obj in inserted:
+                if not generate_tests_for_objective(obj):
+                    tests_failed += 1
+        batch.clear()
+
+    for line_number, line in enumerate(source, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            data = json.loads(line)
+            if not isinstance(data, dict):
+                raise ValueError("registro não é um objeto JSON")
+            obj = Objective.from_dict(data)
+        except (ValueError, TypeError) as e:
+            invalid += 1
+            click.secho(f"❌ Linha {line_number}: JSON inválido ({e})", fg="red", err=True)
+            continue
+        errors = obj.validate()
+        if errors:
+            invalid += 1
+            click.secho(f"❌ Linha {line_number}: {'; '.join(errors)}", fg="red", err=True)
+            continue
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+
+    click.echo("📥 Importação concluída:")
+    click.echo(f"   ✅ Importados: {imported}")
+    click.echo(f"   ⏭️  Já existentes: {duplicated}")
+    click.echo(f"   ❌ Inválidos: {invalid}")
+    if tests_failed:
+        click.secho(f"   ⚠️  Falha ao gerar testes: {tests_failed}", fg="yellow")
+        click.echo("   Execute 'vibe objective generate-tests <ID>' para os objetivos afetados.")
+
+    if invalid or tests_failed:
+        raise SystemExit(1)
+
+
+@objective.command(name="export")
+@click.argument("target", type=click.File("w", encoding="utf-8"), default="-")
+def objective_export(target: TextIO) -> None:
+    """Exporta todos os objetivos em JSONL (um objetivo por linha).
+
+    TARGET é o caminho do arquivo ou '-' para escrever na saída padrão.
+    """
+    db = _get_database()
+    for obj in db.iter_objectives():
+        target.write(json.dumps(obj.to_dict(), ensure_ascii=False))
+        target.write("\n")
+
+
 @objective.command(name="list")
-@click.option("--status", type=click.Choice([s.value for s in ObjectiveStatus]), help="Filtrar por status")
-@click.option("--type", "type_filter", type=click.Choice([t.value for t in ObjectiveType]), help="Filtrar por tipo")
+@click.option(
+    "--status", type=click.Choice([s.value for s in ObjectiveStatus]), help="Filtrar por status"
+)
+@click.option(
+    "--type",
+    "type_filter",
+    type=click.Choice([t.value for t in ObjectiveType]),
+    help="Filtrar por tipo",
+)
 @click.option("--verbose", is_flag=True, help="Mostrar detalhes completos")
-def objective_list(status: str | None, type_filter: str | None, verbose: bool) -> None:
+@_format_option
+def objective_list(
+    status: str | None, type_filter: str | None, verbose: bool, output_format: str
+) -> None:
     """Lista todos os objetivos."""
     db = _get_database()
     objectives = db.list_objectives()
@@ -308,6 +664,10 @@ def objective_list(status: str | None, type_filter: str | None, verbose: bool) -
             continue
         filtered.append(obj)
 
+    if output_format != "text":
+        _emit_records((obj.to_dict() for obj in filtered), output_format)
+        return
+
     if not filtered:
         click.echo("📭 Nenhum objetivo encontrado.")
         click.echo("   Use 'vibe objective new' para criar um objetivo.")
@@ -346,6 +706,50 @@ def objective_list(status: str | None, type_filter: str | None, verbose: bool) -
             click.echo(f"  {short_id}  {nome_trunc}  {status_colored}  {tipos_str}")
 
 
+@objective.command(name="search")
+@click.argument("query", nargs=-1, required=True)
+@click.option(
+    "--limit",
+    type=click.IntRange(min=1),
+    default=20,
+    show_default=True,
+    help="Máximo de resultados",
+)
+@_format_option
+def objective_search(query: Tuple[str, ...], limit: int, output_format: str) -> None:
+    """Busca objetivos por nome, descrição, invariantes e saídas esperadas.
+
+    Todos os termos precisam aparecer; cada termo casa também como
+    prefixo ("autent" encontra "autenticação"). Resultados ordenados por
+    relevância.
+    """
+    db = _get_database()
+    hits = db.search_objectives(" ".join(query), limit=limit)
+
+    if output_format != "text":
+        _emit_records(
+            (
+                {**hit.objective.to_dict(), "score": hit.score, "snippet": hit.snippet}
+                for hit in hits
+            ),
+            output_format,
+        )
+        return
+
+    if not hits:
+        click.echo("📭 Nenhum objetivo encontrado.")
+        return
+
+    click.echo(f"🔎 {len(hits)} resultado(s):")
+    click.echo("")
+    for hit in hits:
+        obj = hit.objective
+        nome_trunc = obj.nome[:30] + "..." if len(obj.nome) > 30 else obj.nome.ljust(30)
+        click.echo(f"  {obj.id[:8]}  {nome_trunc}  {_color_status(obj.status)}")
+        if hit.snippet:
+            click.echo(f"            {hit.snippet}")
+
+
 def _color_status(status: ObjectiveStatus) -> str:
     """Retorna status colorido."""
     colors = {
@@ -359,62 +763,323 @@ def _color_status(status: ObjectiveStatus) -> str:
     return click.style(status.value, fg=color)
 
 
+# Ícone e cor de cada status de teste
+TEST_STATUS_STYLES = {
+    TestStatus.PASSED: ("✅", "green"),
+    TestStatus.FAILED: ("❌", "red"),
+    TestStatus.SKIPPED: ("⏭️", "yellow"),
+    TestStatus.ERROR: ("⚠️", "red"),
+}
+
+
+def _attempt_suffix(run: TestRun) -> str:
+    """Indica a tentativa de testes reexecutados após falha."""
+    return f" 🔁 tentativa {run.attempt}" if run.attempt > 1 else ""
+
+
+def _echo_progress(objective: Objective, run: TestRun) -> None:
+    """Exibe um teste assim que ele termina (execução com --jobs)."""
+    icon, color = TEST_STATUS_STYLES[run.status]
+    status_text = click.style(run.status.value, fg=color)
+    click.echo(
+        f"    {icon} {objective.nome} › {run.test_name} ... {status_text} ({run.duration:.2f}s)"
+        f"{_attempt_suffix(run)}"
+    )
+
+
+def _parse_shard(
+    ctx: click.Context, param: click.Parameter, value: Optional[str]
+) -> Optional["Shard"]:
+    """Converte a opção --shard "i/N" em Shard."""
+    from src.sharding import Shard
+
+    if value is None:
+        return None
+    try:
+        return Shard.parse(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e)) from None
+
+
 @test.command(name="run")
 @click.argument("objective_id", required=False)
 @click.option("--all", is_flag=True, help="Executar testes de todos os objetivos")
 @click.option("--verbose", "-v", is_flag=True, help="Mostrar output detalhado")
-def test_run(objective_id: Optional[str], all: bool, verbose: bool) -> None:
-    """Executa testes de um objetivo específico ou todos."""
+@click.option(
+    "--timeout",
+    "objective_timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    help="Orçamento de tempo por objetivo em segundos (o contrato do objetivo prevalece)",
+)
+@click.option(
+    "--test-timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    help="Tempo máximo por teste em segundos (o contrato do objetivo prevalece)",
+)
+@click.option(
+    "--deadline",
+    type=click.FloatRange(min=0, min_open=True),
+    help="Prazo global em segundos para --all",
+)
+@click.option(
+    "--cpu-limit", type=click.IntRange(min=1), help="Limite de CPU por processo de teste (segundos)"
+)
+@click.option(
+    "--memory-limit",
+    type=click.IntRange(min=1),
+    help="Limite de memória por processo de teste (MB)",
+)
+@click.option(
+    "--retries",
+    type=click.IntRange(min=0),
+    default=0,
+    show_default=True,
+    help="Reexecuções dos testes que falharem (apenas os testes com falha)",
+)
+@click.option(
+    "--fail-fast", is_flag=True, help="Com --all, parar após o primeiro objetivo com falha"
+)
+@click.option(
+    "--shard",
+    callback=_parse_shard,
+    metavar="I/N",
+    help="Executar apenas o shard I de N, balanceado pela duração histórica",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Processos pytest simultâneos; acima de 1 exibe o progresso teste a teste",
+)
+@click.option(
+    "--coverage",
+    is_flag=True,
+    help="Registrar as linhas do projeto executadas pelos testes de cada objetivo",
+)
+@click.option(
+    "--affected",
+    metavar="REF",
+    help="Executar apenas objetivos afetados pelas alterações desde a referência git REF",
+)
+@click.option(
+    "--max-error-chars",
+    type=click.IntRange(min=0),
+    help="Tamanho máximo da mensagem de erro exibida (padrão: 8192; 0 = sem limite); "
+    "o texto completo fica em state/blobs (vibe test log)",
+)
+@click.option(
+    "--metrics-file",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Gravar as métricas OpenMetrics da execução neste arquivo ao final (ex.: para o "
+    "textfile collector do node-exporter)",
+)
+@click.option(
+    "--warm-workers",
+    is_flag=True,
+    help="Reutilizar processos pytest pré-aquecidos (fork-server) entre arquivos e objetivos, "
+    "em vez de iniciar um interpretador por arquivo",
+)
+@click.option(
+    "--trace",
+    "trace_file",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Gravar os spans da execução (banco, busca de arquivos, pytest, parsing, "
+    "persistência) em JSON Chrome trace-event, para abrir no Perfetto",
+)
+@_format_option
+def test_run(
+    objective_id: Optional[str],
+    all: bool,
+    verbose: bool,
+    objective_timeout: Optional[float],
+    test_timeout: Optional[float],
+    deadline: Optional[float],
+    cpu_limit: Optional[int],
+    memory_limit: Optional[int],
+    retries: int,
+    fail_fast: bool,
+    shard: Optional["Shard"],
+    jobs: int,
+    coverage: bool,
+    affected: Optional[str],
+    max_error_chars: Optional[int],
+    metrics_file: Optional[Path],
+    warm_workers: bool,
+    trace_file: Optional[Path],
+    output_format: str,
+) -> None:
+    """Executa testes de um objetivo específico ou todos.
+
+    OBJECTIVE_ID pode ser o ID completo ou um prefixo único (ID curto).
+
+    Com --affected REF, executa (como --all) apenas os objetivos cuja
+    cobertura registrada com --coverage intersecta as linhas alteradas
+    desde REF, cujos testes mudaram ou que ainda não têm cobertura.
+    """
     # Validações
-    if not objective_id and not all:
+    if not objective_id and not all and not affected:
         click.secho("❌ É necessário fornecer um ID de objetivo ou usar --all", fg="red")
         click.echo("   Exemplo: vibe test run <ID>")
         click.echo("   Exemplo: vibe test run --all")
         raise SystemExit(1)
     
-    if objective_id and all:
-        click.secho("❌ Use apenas um: ID de objetivo OU --all, não ambos", fg="red")
+    if objective_id and (all or affected):
+        click.secho("❌ Use apenas um: ID de objetivo OU --all/--affected, não ambos", fg="red")
         raise SystemExit(1)
+    all = all or bool(affected)
+    structured = output_format != "text"
+    if trace_file is not None:
+        # Registrado primeiro: exporta por último, incluindo retenção e métricas
+        _start_trace(trace_file, structured)
     
     db = _get_database()
-    runner = TestRunner(db)
-    
+    objective: Optional[Objective] = None
     if objective_id:
-        # Verificar se objetivo existe
-        objective = db.get_objective(objective_id)
+        objective = _find_objective(db, objective_id)
         if not objective:
-            click.secho(f"❌ Objetivo '{objective_id}' não encontrado", fg="red")
             raise SystemExit(1)
-        
+        objective_id = objective.id
+    if all:
+        cycle = dependencies.find_cycle(db.get_dependency_graph())
+        if cycle:
+            click.secho(f"❌ {dependencies.DependencyCycleError(cycle)}", fg="red", err=structured)
+            click.echo(
+                "   Remova uma das arestas com: vibe objective undepend <ID> <DEP>", err=structured
+            )
+            raise SystemExit(2)
+
+    from src.async_runner import AsyncTestRunner
+    from src.impact import changed_lines, find_affected
+    from src.sharding import collect_units, select_shard
+    from src.test_runner import DEFAULT_MAX_ERROR_CHARS, RunLimits, TestRunner
+
+    limits = RunLimits(
+        test_timeout=test_timeout,
+        objective_timeout=objective_timeout,
+        cpu_seconds=cpu_limit,
+        memory_mb=memory_limit,
+    )
+    selection = None
+    if shard:
+        selection, estimated = select_shard(db, shard, objective_id=objective_id)
+        click.echo(
+            f"🔀 Shard {shard}: {len(selection)} arquivo(s), ~{estimated:.1f}s estimados",
+            err=structured,
+        )
+    if affected:
+        try:
+            impacted, uncovered = find_affected(db, changed_lines(affected))
+        except (OSError, subprocess.CalledProcessError) as e:
+            detail = getattr(e, "stderr", None) or e
+            click.secho(
+                f"❌ Não foi possível calcular o diff desde '{affected}': {detail}",
+                fg="red",
+                err=structured,
+            )
+            raise SystemExit(2) from e
+        click.echo(
+            f"🎯 {len(impacted)} objetivo(s) afetado(s) desde {affected}"
+            + (f" ({len(uncovered)} sem cobertura registrada)" if uncovered else ""),
+            err=structured,
+        )
+        units = {
+            unit
+            for objective in sorted(impacted)
+            for unit in collect_units(db, objective_id=objective)
+        }
+        selection = units if selection is None else selection & units
+    if max_error_chars is None:
+        max_error_chars = DEFAULT_MAX_ERROR_CHARS
+    workers = _start_workers(jobs, structured) if warm_workers else None
+    if jobs > 1:
+        runner: "TestRunner" = AsyncTestRunner(
+            db,
+            quiet=structured,
+            limits=limits,
+            concurrency=jobs,
+            on_result=None if structured else _echo_progress,
+            selection=selection,
+            retries=retries,
+            coverage=coverage,
+            max_error_chars=max_error_chars,
+            workers=workers,
+        )
+    else:
+        runner = TestRunner(
+            db,
+            quiet=structured,
+            limits=limits,
+            selection=selection,
+            retries=retries,
+            coverage=coverage,
+            max_error_chars=max_error_chars,
+            workers=workers,
+        )
+    # Política automática de retenção (vibe db compact --auto), ao final do comando
+    click.get_current_context().call_on_close(db.apply_retention_policy)
+    if metrics_file is not None:
+        # Registrado depois: executa antes da retenção, inclusive em saídas com erro
+        click.get_current_context().call_on_close(lambda: _write_metrics(db, metrics_file))
+    
+    if objective is not None:
         # Verificar se tem testes
-        test_dir = Path("tests") / "objectives" / objective_id
+        test_dir = Path("tests") / "objectives" / objective.id
         if not test_dir.exists():
             click.secho(f"⚠️  Objetivo '{objective.nome}' não tem diretório de testes", fg="yellow")
-            click.echo(f"   Execute: vibe objective generate-tests {objective_id}")
+            click.echo(f"   Execute: vibe objective generate-tests {objective.id}")
             raise SystemExit(1)
-        
+
+        if not runner.is_selected(objective.id):
+            click.echo(f"⏭️  Nenhum arquivo de '{objective.nome}' no shard {shard}", err=structured)
+            raise SystemExit(0)
+
+        if structured:
+            result = runner.execute_objective(objective.id)
+            if not result:
+                click.secho("❌ Falha ao executar testes", fg="red", err=True)
+                raise SystemExit(2)
+            record = _test_result_record(objective, result[0], result[1])
+            click.echo(json.dumps(record, ensure_ascii=False))
+            raise SystemExit(0 if result[0].is_passing() else 1)
+
         click.echo(f"🧪 Executando testes para objetivo: {objective.nome}")
         click.echo("")
-        
-        summary = runner.run_objective_tests(objective_id)
-        if not summary:
+
+        result = runner.execute_objective(objective.id)
+        if not result:
             click.secho("❌ Falha ao executar testes", fg="red")
             raise SystemExit(2)
-        
-        # Exibir resultados
-        _display_test_results(summary, verbose)
-        
+        summary, test_runs = result
+
+        # Exibir resultados desta rodada
+        _display_test_results(summary, test_runs, verbose)
+
         # Exit code baseado no resultado
         if summary.is_passing():
             raise SystemExit(0)
         else:
             raise SystemExit(1)
-    
+
+    elif structured:  # --all com saída estruturada
+        failing = 0
+
+        def records() -> Iterable[Dict[str, Any]]:
+            nonlocal failing
+            for obj, summary, runs in runner.iter_all_tests(deadline, fail_fast):
+                if not summary.is_passing():
+                    failing += 1
+                yield _test_result_record(obj, summary, runs)
+
+        _emit_records(records(), output_format)
+        raise SystemExit(0 if failing == 0 else 1)
+
     else:  # --all
         click.echo("🧪 Executando testes para todos os objetivos")
         click.echo("")
         
-        summaries = runner.run_all_tests()
+        summaries = runner.run_all_tests(deadline, fail_fast)
         
         if not summaries:
             click.echo("📭 Nenhum objetivo com testes encontrado")
@@ -452,49 +1117,337 @@ def test_run(objective_id: Optional[str], all: bool, verbose: bool) -> None:
             raise SystemExit(1)
 
 
-def _display_test_results(summary: TestSummary, verbose: bool) -> None:
-    """Exibe resultados de testes de forma formatada."""
+@test.command(name="merge")
+@click.argument("sources", nargs=-1, required=True, type=click.File("r", encoding="utf-8"))
+def test_merge(sources: Tuple[TextIO, ...]) -> None:
+    """Mescla resultados de shards no banco local.
+
+    Cada SOURCE é a saída de 'vibe test run --format ndjson' (ou json)
+    de um shard; use '-' para ler da entrada padrão. Os sumários são
+    recalculados a partir das execuções de todos os shards. Reimportar
+    o mesmo arquivo não duplica execuções.
+    """
     db = _get_database()
-    test_runs = db.get_test_runs(summary.objective_id)
-    
+    objectives: Dict[str, Objective] = {}
+    runs_by_objective: Dict[str, List[TestRun]] = {}
+    invalid = 0
+
+    for source in sources:
+        for line_number, line in enumerate(source, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                data = json.loads(line)
+                records = data if isinstance(data, list) else [data]
+                for record in records:
+                    if "test_runs" not in record:
+                        raise ValueError("registro sem test_runs")
+                    obj = Objective.from_dict(record["objective"])
+                    objectives.setdefault(obj.id, obj)
+                    runs_by_objective.setdefault(obj.id, []).extend(
+                        TestRun.from_dict(run) for run in record["test_runs"]
+                    )
+            except (ValueError, TypeError, KeyError) as e:
+                invalid += 1
+                click.secho(
+                    f"❌ {source.name}:{line_number}: registro inválido ({e})", fg="red", err=True
+                )
+
+    if not runs_by_objective:
+        click.echo("📭 Nenhum resultado para mesclar")
+        raise SystemExit(1 if invalid else 0)
+
+    # Objetivos criados em outra máquina passam a existir no banco local
+    missing = [obj for oid, obj in objectives.items() if not db.get_objective(oid)]
+    try:
+        db.create_objectives(missing)
+    except ValueError as e:
+        click.secho(f"❌ Objetivos dos resultados recusados: {e}", fg="red", err=True)
+        raise SystemExit(1) from e
+
+    imported = 0
+    failing = 0
+    click.echo(f"📥 Mesclando {len(sources)} arquivo(s) de resultados")
+    click.echo("")
+    for oid, runs in runs_by_objective.items():
+        imported += db.import_test_runs(runs)
+        summary = TestSummary.from_test_runs(oid, runs)
+        db.store_test_summary(summary)
+        if not summary.is_passing():
+            failing += 1
+        status = "✅" if summary.is_passing() else "❌"
+        click.echo(
+            f"  {status} {objectives[oid].nome}: "
+            f"{summary.passed}/{summary.total_tests} testes passando"
+        )
+
+    total = sum(len(runs) for runs in runs_by_objective.values())
+    click.echo("")
+    click.echo("📊 Mesclagem concluída:")
+    click.echo(f"   Objetivos: {len(runs_by_objective)}")
+    click.echo(f"   Execuções importadas: {imported}")
+    click.echo(f"   ⏭️  Já existentes: {total - imported}")
+    if invalid:
+        click.secho(f"   ❌ Registros inválidos: {invalid}", fg="red")
+    raise SystemExit(0 if failing == 0 and not invalid else 1)
+
+
+@test.command(name="log")
+@click.argument("test_run_id")
+def test_log(test_run_id: str) -> None:
+    """Exibe a saída completa (traceback) de uma execução de teste.
+
+    TEST_RUN_ID aceita o ID completo ou um prefixo, como o exibido nas
+    mensagens de erro cortadas. O texto é lido do armazenamento de blobs.
+    """
+    db = _get_database()
+    try:
+        resolved = db.resolve_test_run_id(test_run_id)
+    except AmbiguousTestRunIdError as e:
+        click.secho(f"❌ Prefixo '{test_run_id}' é ambíguo; corresponde a:", fg="red")
+        for candidate in e.candidates:
+            click.echo(f"   {candidate}")
+        click.echo("   Informe mais caracteres do ID")
+        raise SystemExit(1) from e
+    run = db.get_test_run(resolved) if resolved else None
+    if not run:
+        click.secho(f"❌ Execução '{test_run_id}' não encontrada", fg="red")
+        raise SystemExit(1)
+
+    icon, color = TEST_STATUS_STYLES[run.status]
+    click.echo(
+        f"{icon} {run.test_file} › {run.test_name} ... {click.style(run.status.value, fg=color)}"
+    )
+    click.echo(
+        f"   Objetivo: {run.objective_id[:8]} | Rodada: {run.run_id[:8] or '-'} | "
+        f"Tentativa: {run.attempt} | {run.run_at.strftime('%Y-%m-%d %H:%M:%S')}"
+    )
+    output = db.get_test_output(run)
+    if not output:
+        click.echo("📭 Execução sem saída registrada")
+        return
+    click.echo("")
+    click.echo(output)
+
+
+@test.command(name="flaky")
+@click.option(
+    "--window",
+    type=click.IntRange(min=2),
+    default=50,
+    show_default=True,
+    help="Execuções mais recentes analisadas por teste",
+)
+@click.option(
+    "--min-score",
+    type=click.FloatRange(min=0, max=1),
+    default=0.0,
+    show_default=True,
+    help="Score mínimo de instabilidade para exibir o teste",
+)
+@_format_option
+def test_flaky(window: int, min_score: float, output_format: str) -> None:
+    """Lista testes instáveis (alternam entre sucesso e falha) pelo histórico."""
+    db = _get_database()
+    flaky = db.get_flaky_tests(window=window, min_score=min_score)
+
+    if output_format != "text":
+        _emit_records((asdict(item) for item in flaky), output_format)
+        return
+
+    if not flaky:
+        click.echo("✅ Nenhum teste instável encontrado")
+        return
+
+    names = {obj.id: obj.nome for obj in db.list_objectives()}
+    click.echo(f"🎲 Testes instáveis ({len(flaky)}):")
+    click.echo("")
+    for item in flaky:
+        color = "red" if item.score >= 0.5 else "yellow"
+        click.echo(
+            f"  {click.style(f'{item.score:.2f}', fg=color)}  {item.objective_id[:8]} | "
+            f"{names.get(item.objective_id, '?')} › {item.test_name}"
+        )
+        click.echo(
+            f"        {item.flips} alternância(s) em {item.runs} execuções, "
+            f"{item.failures} falha(s), {item.retry_passes} aprovado(s) na retentativa"
+        )
+
+
+SINCE_UNITS = {"h": "hours", "d": "days", "w": "weeks"}
+
+
+def _parse_since(
+    ctx: click.Context, param: click.Parameter, value: Optional[str]
+) -> Optional[datetime]:
+    """Converte --since (ex.: 7d, 12h, 2w ou data ISO 2026-01-31) em datetime."""
+    if value is None:
+        return None
+    match = re.fullmatch(r"(\d+)([hdw])", value.strip())
+    if match:
+        return datetime.now() - timedelta(**{SINCE_UNITS[match.group(2)]: int(match.group(1))})
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise click.BadParameter(
+            "use um intervalo (7d, 12h, 2w) ou uma data ISO (2026-01-31)"
+        ) from None
+
+
+@test.command(name="trends")
+@click.argument("objective_id", required=False)
+@click.option(
+    "--since",
+    callback=_parse_since,
+    help="Considerar apenas execuções a partir de um intervalo (7d, 12h, 2w) ou data ISO",
+)
+@click.option(
+    "--window",
+    type=click.IntRange(min=1),
+    default=7,
+    show_default=True,
+    help="Dias com execuções na taxa de sucesso móvel",
+)
+@click.option(
+    "--last",
+    "last_runs",
+    type=click.IntRange(min=1),
+    default=20,
+    show_default=True,
+    help="Execuções mais recentes por teste nos percentis de duração",
+)
+@click.option(
+    "--threshold",
+    type=click.FloatRange(min=1, min_open=True),
+    default=1.5,
+    show_default=True,
+    help=f"Razão sobre a média das {JUMP_BASELINE_RUNS} execuções anteriores que caracteriza "
+    "um salto de duração",
+)
+@click.option(
+    "--top",
+    type=click.IntRange(min=1),
+    default=10,
+    show_default=True,
+    help="Testes exibidos nas seções de duração (texto)",
+)
+@_format_option
+def test_trends(
+    objective_id: Optional[str],
+    since: Optional[datetime],
+    window: int,
+    last_runs: int,
+    threshold: float,
+    top: int,
+    output_format: str,
+) -> None:
+    """Tendências do histórico: taxa de sucesso, durações e saltos de duração.
+
+    Sem OBJECTIVE_ID, considera todos os objetivos. A taxa de sucesso vem
+    da rollup diária (rápida com qualquer tamanho de histórico); durações
+    e saltos são calculados sobre test_runs com funções de janela.
+    """
+    db = _get_database()
+    if objective_id is not None:
+        objective = _find_objective(db, objective_id)
+        if not objective:
+            raise SystemExit(1)
+        objective_id = objective.id
+
+    pass_rates = db.get_pass_rate_trend(objective_id, since=since, window_days=window)
+    durations = db.get_duration_trends(objective_id, since=since, last_runs=last_runs)
+    jumps = db.get_duration_jumps(objective_id, since=since, threshold=threshold)
+
+    if output_format != "text":
+        records = [
+            *({"kind": "pass_rate", **asdict(rate)} for rate in pass_rates),
+            *({"kind": "duration", **asdict(trend)} for trend in durations),
+            *({"kind": "duration_jump", **asdict(jump)} for jump in jumps),
+        ]
+        _emit_records(records, output_format)
+        return
+
+    if not pass_rates:
+        click.echo("📭 Nenhuma execução no período")
+        return
+
+    names = {obj.id: obj.nome for obj in db.list_objectives()}
+    click.echo(f"📈 Taxa de sucesso por dia (móvel: últimos {window} dias com execuções):")
+    current = None
+    for rate in pass_rates:
+        if rate.objective_id != current:
+            current = rate.objective_id
+            click.echo("")
+            click.echo(f"  {current[:8]} | {names.get(current, '?')}")
+        color = "green" if rate.pass_rate == 1 else "yellow" if rate.pass_rate >= 0.8 else "red"
+        click.echo(
+            f"    {rate.day}  {click.style(f'{rate.pass_rate * 100:5.1f}%', fg=color)}  "
+            f"móvel {rate.rolling_pass_rate * 100:5.1f}%  "
+            f"{rate.passed}/{rate.runs - rate.skipped} execuções  {rate.duration_total:.2f}s"
+        )
+
+    click.echo("")
+    click.echo(f"⏱️  Testes mais lentos (p95 das últimas {last_runs} execuções):")
+    for trend in durations[:top]:
+        click.echo(
+            f"  p50 {trend.p50:7.3f}s  p95 {trend.p95:7.3f}s  máx {trend.max:7.3f}s  "
+            f"{trend.objective_id[:8]} | {trend.test_file} › {trend.test_name} "
+            f"({trend.runs} execuções)"
+        )
+
+    click.echo("")
+    if not jumps:
+        click.echo(f"✅ Nenhum salto de duração acima de {threshold:g}x")
+        return
+    click.echo(
+        f"🐢 Saltos de duração (≥ {threshold:g}x a média das {JUMP_BASELINE_RUNS} "
+        "execuções anteriores):"
+    )
+    for jump in jumps[:top]:
+        click.echo(
+            f"  {click.style(f'{jump.ratio:5.1f}x', fg='red')}  "
+            f"{jump.baseline:.3f}s → {jump.duration:.3f}s  "
+            f"{jump.run_at[:16].replace('T', ' ')}  {jump.objective_id[:8]} | "
+            f"{jump.test_file} › {jump.test_name}"
+        )
+
+
+def _display_test_results(summary: TestSummary, test_runs: List[TestRun], verbose: bool) -> None:
+    """Exibe resultados de uma rodada de testes de forma formatada."""
     if not test_runs:
         click.echo("📭 Nenhum teste executado")
         return
-    
+
     # Agrupar por arquivo
     by_file = {}
     for run in test_runs:
         if run.test_file not in by_file:
             by_file[run.test_file] = []
         by_file[run.test_file].append(run)
-    
+
     for test_file, runs in by_file.items():
         click.echo(f"  📄 {test_file}")
         for run in runs:
-            if run.status == TestStatus.PASSED:
-                icon = "✅"
-                color = "green"
-            elif run.status == TestStatus.FAILED:
-                icon = "❌"
-                color = "red"
-            elif run.status == TestStatus.SKIPPED:
-                icon = "⏭️"
-                color = "yellow"
-            else:  # ERROR
-                icon = "⚠️"
-                color = "red"
-            
+            icon, color = TEST_STATUS_STYLES[run.status]
             status_text = click.style(f"{run.status.value}", fg=color)
-            click.echo(f"    {icon} {run.test_name} ... {status_text} ({run.duration:.2f}s)")
-            
-            if verbose and run.status in [TestStatus.FAILED, TestStatus.ERROR] and run.error_message:
+            click.echo(
+                f"    {icon} {run.test_name} ... {status_text} "
+                f"({run.duration:.2f}s){_attempt_suffix(run)}"
+            )
+
+            if (
+                verbose
+                and run.status in [TestStatus.FAILED, TestStatus.ERROR]
+                and run.error_message
+            ):
                 # Mostrar detalhes do erro no modo verbose
                 click.echo("      " + "-" * 40)
-                for line in run.error_message.split('\n'):
+                for line in run.error_message.split("\n"):
                     if line.strip():
                         click.echo(f"      {line}")
                 click.echo("      " + "-" * 40)
-    
+
     click.echo("")
     click.echo("📊 Resultado:")
     click.echo(f"   Total: {summary.total_tests}")
@@ -502,7 +1455,7 @@ def _display_test_results(summary: TestSummary, verbose: bool) -> None:
     click.echo(f"   ❌ Falhou: {summary.failed}")
     click.echo(f"   ⏭️  Pulado: {summary.skipped}")
     click.echo(f"   ⚠️  Erro: {summary.error}")
-    
+
     success_rate = summary.success_rate() * 100
     if success_rate == 100:
         click.secho(f"   Taxa de sucesso: {success_rate:.1f}% 🎉", fg="green")
@@ -510,7 +1463,7 @@ def _display_test_results(summary: TestSummary, verbose: bool) -> None:
         click.secho(f"   Taxa de sucesso: {success_rate:.1f}%", fg="yellow")
     else:
         click.secho(f"   Taxa de sucesso: {success_rate:.1f}%", fg="red")
-    
+
     if summary.is_passing():
         click.secho("   Estado: ✅ APROVADO", fg="green")
     else:
@@ -521,7 +1474,10 @@ def _display_test_results(summary: TestSummary, verbose: bool) -> None:
 @click.argument("objective_id", required=False)
 @click.option("--all", is_flag=True, help="Status de todos os objetivos")
 @click.option("--verbose", "-v", is_flag=True, help="Mostrar detalhes dos testes")
-def objective_status(objective_id: Optional[str], all: bool, verbose: bool) -> None:
+@_format_option
+def objective_status(
+    objective_id: Optional[str], all: bool, verbose: bool, output_format: str
+) -> None:
     """Exibe status de testes de um ou todos os objetivos."""
     # Validações
     if not objective_id and not all:
@@ -529,26 +1485,41 @@ def objective_status(objective_id: Optional[str], all: bool, verbose: bool) -> N
         click.echo("   Exemplo: vibe objective status <ID>")
         click.echo("   Exemplo: vibe objective status --all")
         raise SystemExit(1)
-    
+
     if objective_id and all:
         click.secho("❌ Use apenas um: ID de objetivo OU --all, não ambos", fg="red")
         raise SystemExit(1)
-    
+
     db = _get_database()
-    
+
     if objective_id:
         # Status de um objetivo específico
-        objective = db.get_objective(objective_id)
+        objective = _find_objective(db, objective_id)
         if not objective:
-            click.secho(f"❌ Objetivo '{objective_id}' não encontrado", fg="red")
             raise SystemExit(1)
-        
+        objective_id = objective.id
+
         summary = db.get_test_summary(objective_id)
-        
+
+        if output_format != "text":
+            test_runs = None
+            if verbose:
+                test_runs = db.get_latest_test_results(objective_id)
+                db.load_error_previews(test_runs)
+            record = _test_result_record(objective, summary, test_runs)
+            click.echo(json.dumps(record, ensure_ascii=False))
+            return
+
         click.echo(f"📋 Objetivo: {objective.nome}")
         click.echo(f"   ID: {objective.id}")
         click.echo(f"   Status: {_color_status(objective.status)}")
         click.echo(f"   Tipo(s): {', '.join(t.value for t in objective.tipos)}")
+        if objective.dependencias:
+            names = []
+            for dep_id in objective.dependencias:
+                dep = db.get_objective(dep_id)
+                names.append(f"{dep.nome} ({dep_id[:8]})" if dep else dep_id[:8])
+            click.echo(f"   Depende de: {', '.join(names)}")
         click.echo("")
         
         if not summary:
@@ -589,7 +1560,7 @@ def objective_status(objective_id: Optional[str], all: bool, verbose: bool) -> N
         if verbose:
             click.echo("")
             click.echo("📄 Testes individuais:")
-            test_runs = db.get_test_runs(objective_id)
+            test_runs = db.get_latest_test_results(objective_id)
             for run in test_runs[:10]:  # Limitar a 10 para não poluir
                 if run.status == TestStatus.PASSED:
                     icon = "✅"
@@ -601,18 +1572,26 @@ def objective_status(objective_id: Optional[str], all: bool, verbose: bool) -> N
                     icon = "⚠️"
                 click.echo(f"   {icon} {run.test_file}::{run.test_name} ({run.duration:.2f}s)")
     
+    elif output_format != "text":  # --all com saída estruturada
+        summaries = db.get_test_summaries()
+        _emit_records(
+            (_test_result_record(obj, summaries.get(obj.id)) for obj in db.list_objectives()),
+            output_format,
+        )
+
     else:  # --all
         objectives = db.list_objectives()
         if not objectives:
             click.echo("📭 Nenhum objetivo encontrado")
             return
-        
+
         click.echo("📋 Status de todos os objetivos:")
         click.echo("")
-        
+
+        summaries = db.get_test_summaries()
         for obj in objectives:
-            summary = db.get_test_summary(obj.id)
-            
+            summary = summaries.get(obj.id)
+
             if not summary:
                 status_str = "⏸️  Não executado"
                 color = "white"
@@ -622,14 +1601,15 @@ def objective_status(objective_id: Optional[str], all: bool, verbose: bool) -> N
             else:
                 status_str = f"❌ {summary.passed}/{summary.total_tests}"
                 color = "red"
-            
+
             # Formatar nome truncado
             nome_trunc = obj.nome[:25] + "..." if len(obj.nome) > 25 else obj.nome.ljust(28)
-            
+
             # Tempo desde última execução
             time_info = ""
             if summary:
                 from datetime import datetime
+
                 now = datetime.now()
                 delta = now - summary.last_run
                 hours = delta.total_seconds() / 3600
@@ -640,8 +1620,283 @@ def objective_status(objective_id: Optional[str], all: bool, verbose: bool) -> N
                 else:
                     time_info = f"{int(hours / 24)}d"
                 time_info = f" | {time_info} atrás"
-            
-            click.echo(f"  {obj.id[:8]} | {nome_trunc} | {click.style(status_str, fg=color)}{time_info}")
+
+            click.echo(
+                f"  {obj.id[:8]} | {nome_trunc} | {click.style(status_str, fg=color)}{time_info}"
+            )
+
+
+@db.command(name="compact")
+@click.option(
+    "--keep",
+    type=click.IntRange(min=1),
+    default=10,
+    show_default=True,
+    help="Execuções mais recentes mantidas por teste",
+)
+@click.option("--no-vacuum", is_flag=True, help="Não executar VACUUM após a compactação")
+@click.option(
+    "--incremental", is_flag=True, help="Usar vacuum incremental em vez de VACUUM completo"
+)
+@click.option(
+    "--auto",
+    "auto_policy",
+    is_flag=True,
+    help="Salvar --keep como política automática aplicada após cada 'test run'",
+)
+@click.option("--disable-auto", is_flag=True, help="Desativar a política automática e sair")
+def db_compact(
+    keep: int, no_vacuum: bool, incremental: bool, auto_policy: bool, disable_auto: bool
+) -> None:
+    """Compacta o histórico de test_runs.
+
+    Mantém as últimas execuções de cada teste, remove as mais antigas (os
+    agregados diários de test_daily_rollup não são afetados) e preserva
+    eventos de auditoria (primeira execução e mudanças de status). Também
+    move para blobs os erros ainda gravados no banco e remove blobs que
+    nenhuma execução referencia.
+    """
+    database = _get_database()
+
+    if disable_auto:
+        database.set_setting(RETENTION_KEEP_LAST_KEY, None)
+        click.secho("✓ Política automática de retenção desativada", fg="green")
+        return
+
+    report = database.compact_test_runs(keep)
+    if not no_vacuum:
+        database.vacuum(incremental=incremental)
+        report.size_after = database.file_size()
+
+    if auto_policy:
+        database.set_setting(RETENTION_KEEP_LAST_KEY, str(keep))
+
+    click.echo("🗜️  Compactação concluída:")
+    click.echo(f"   Execuções removidas: {report.rows_deleted}")
+    click.echo(f"   Eventos de auditoria preservados: {report.audit_rows_kept}")
+    if report.errors_externalized:
+        click.echo(f"   Erros movidos para blobs: {report.errors_externalized}")
+    if report.blobs_removed:
+        click.echo(
+            f"   Blobs sem referência removidos: {report.blobs_removed} "
+            f"({report.blob_bytes_freed / 1024:.1f} KiB)"
+        )
+    click.echo(
+        f"   Tamanho: {report.size_before / 1024:.1f} KiB → {report.size_after / 1024:.1f} KiB"
+    )
+    if auto_policy:
+        click.secho(f"✓ Política automática ativa: manter {keep} execuções por teste", fg="green")
+
+
+def _start_workers(size: int, structured: bool) -> Optional["WorkerPool"]:
+    """Inicia o pool de workers pytest, encerrado ao fim do comando."""
+    from src.worker_pool import SUPPORTED, WorkerPool
+
+    if not SUPPORTED:
+        click.secho(
+            "⚠️  --warm-workers indisponível nesta plataforma; usando um processo por arquivo",
+            fg="yellow",
+            err=structured,
+        )
+        return None
+    pool = WorkerPool(size=size)
+    click.get_current_context().call_on_close(pool.close)
+    return pool
+
+
+def _start_trace(path: Path, structured: bool) -> None:
+    """Liga o rastreamento e agenda a exportação para o fim do comando."""
+    from src import tracing
+
+    def export() -> None:
+        spans = tracing.export(path)
+        click.echo(
+            f"🧭 Trace gravado em {path} ({spans} spans); abra em https://ui.perfetto.dev",
+            err=structured,
+        )
+
+    tracing.start()
+    click.get_current_context().call_on_close(export)
+
+
+def _write_metrics(db: Database, path: Optional[Path]) -> None:
+    """Emite as métricas do processo e do projeto em OpenMetrics (arquivo ou saída padrão)."""
+    from src import metrics
+
+    text = metrics.render(metrics.REGISTRY, metrics.project_registry(db))
+    if path is None:
+        click.echo(text, nl=False)
+    else:
+        metrics.write_textfile(path, text)
+
+
+@main.command(name="metrics")
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Gravar em arquivo (de forma atômica) em vez da saída padrão",
+)
+def metrics_command(output: Optional[Path]) -> None:
+    """Exibe métricas do projeto no formato de texto OpenMetrics.
+
+    Inclui o estado do projeto lido do banco (objetivos, últimos resultados,
+    totais do histórico, regressões de duração) e os contadores deste
+    processo. Contadores do runner (testes, durações, processos pytest) e
+    do validador vêm de `vibe test run --metrics-file`.
+    """
+    _write_metrics(_get_database(), output)
+
+
+def _get_workspace() -> "Workspace":
+    """Retorna o workspace sobre o índice configurado."""
+    from src.workspace import Workspace, index_path
+
+    path = index_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return Workspace(Database(path))
+
+
+@workspace.command(name="add")
+@click.argument("paths", nargs=-1, required=True, type=click.Path(file_okay=False))
+@click.option("--name", help="Nome do projeto no workspace (apenas com um caminho)")
+def workspace_add(paths: Tuple[str, ...], name: Optional[str]) -> None:
+    """Registra projetos no workspace."""
+    if name and len(paths) > 1:
+        click.secho("❌ --name só pode ser usado com um único caminho", fg="red")
+        raise SystemExit(1)
+    ws = _get_workspace()
+    errors = 0
+    for path in paths:
+        try:
+            project = ws.add(Path(path), name)
+        except ValueError as e:
+            click.secho(f"❌ {e}", fg="red")
+            errors += 1
+            continue
+        click.secho(f"➕ {project.name}: {project.root}", fg="green")
+    if errors:
+        raise SystemExit(1)
+
+
+@workspace.command(name="remove")
+@click.argument("name")
+def workspace_remove(name: str) -> None:
+    """Remove um projeto do workspace (o projeto em si não é alterado)."""
+    if not _get_workspace().db.unregister_project(name):
+        click.secho(f"❌ Projeto '{name}' não registrado", fg="red")
+        raise SystemExit(1)
+    click.secho(f"✓ Projeto '{name}' removido do workspace", fg="green")
+
+
+@workspace.command(name="list")
+@_format_option
+def workspace_list(output_format: str) -> None:
+    """Lista os projetos registrados."""
+    projects = _get_workspace().db.list_projects()
+    if output_format != "text":
+        _emit_records(
+            (
+                {"name": p.name, "root": p.root, "added_at": p.added_at.isoformat()}
+                for p in projects
+            ),
+            output_format,
+        )
+        return
+    if not projects:
+        click.echo("📭 Nenhum projeto registrado")
+        return
+    for project in projects:
+        click.echo(f"  {project.name} | {project.root}")
+
+
+def _run_workspace_command(command: str, jobs: Optional[int]) -> None:
+    """Executa um comando em todos os projetos e sai com 1 se algum falhar."""
+    from src.workspace import COMMANDS
+
+    ws = _get_workspace()
+    if not ws.db.list_projects():
+        click.echo("📭 Nenhum projeto registrado")
+        raise SystemExit(0)
+
+    def report(run: "ProjectRun") -> None:
+        icon = "✅" if run.exit_code == 0 else "❌"
+        click.echo(f"  {icon} {run.project} ({run.duration:.1f}s, exit {run.exit_code})")
+
+    click.echo(f"🗂️  vibe {' '.join(COMMANDS[command])} em todos os projetos")
+    runs = ws.run(command, jobs=jobs, on_done=report)
+    failing = [run for run in runs if run.exit_code != 0]
+    click.echo("")
+    click.echo(f"📊 {len(runs) - len(failing)}/{len(runs)} projeto(s) OK")
+    for run in failing:
+        click.echo(f"\n── {run.project} ──")
+        click.echo(run.output.rstrip())
+    raise SystemExit(1 if failing else 0)
+
+
+@workspace.command(name="check")
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    help="Projetos verificados em paralelo (padrão: número de CPUs)",
+)
+def workspace_check(jobs: Optional[int]) -> None:
+    """Executa `vibe project check` em todos os projetos."""
+    _run_workspace_command("check", jobs)
+
+
+@workspace.command(name="test")
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    help="Projetos testados em paralelo (padrão: número de CPUs)",
+)
+def workspace_test(jobs: Optional[int]) -> None:
+    """Executa `vibe test run --all` em todos os projetos."""
+    _run_workspace_command("test", jobs)
+
+
+@workspace.command(name="status")
+@_format_option
+def workspace_status(output_format: str) -> None:
+    """Situação dos objetivos de todos os projetos, lida dos bancos de cada um."""
+    ws = _get_workspace()
+    health = ws.health()
+    last_runs = ws.db.get_workspace_runs()
+    records = [
+        {
+            **asdict(item),
+            "check_exit_code": last_runs.get((item.project, "check")),
+            "test_exit_code": last_runs.get((item.project, "test")),
+        }
+        for item in health
+    ]
+    if output_format != "text":
+        _emit_records(records, output_format)
+        return
+    if not records:
+        click.echo("📭 Nenhum projeto com banco de dados encontrado")
+        return
+
+    def last(code: Optional[int]) -> str:
+        return "–" if code is None else ("✅" if code == 0 else "❌")
+
+    click.echo("🗂️  Status do workspace:")
+    click.echo("")
+    for record in records:
+        click.echo(
+            f"  {record['project'][:25].ljust(25)} | {record['objectives']} objetivo(s) | "
+            f"✅ {record['passing']} ❌ {record['failing']} "
+            f"⏸️  {record['objectives'] - record['tested']} | "
+            f"check {last(record['check_exit_code'])} test {last(record['test_exit_code'])}"
+        )
+    click.echo("")
+    click.echo(
+        f"📊 Total: {sum(r['objectives'] for r in records)} objetivo(s), "
+        f"{sum(r['failing'] for r in records)} com testes falhando"
+    )
 
 
 if __name__ == "__main__":
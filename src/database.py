@@ -1,44 +1,500 @@
 """Camada de persistência SQLite para objetivos."""
 
+import bisect
 import json
 import sqlite3
+import time
+from collections import OrderedDict
 from contextlib import contextmanager
+from dataclasses import asdict, dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Collection,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    cast,
+)
 
+from src import metrics, tracing
+from src.blobs import DEFAULT_PREVIEW_CHARS, BlobStore, truncate_middle
 from src.models import Objective, ObjectiveStatus, ObjectiveType
 
+if TYPE_CHECKING:
+    from src.models import TestRun, TestSummary
+
+# Parâmetros do INSERT em objectives, na ordem das colunas
+ObjectiveParams = Tuple[
+    str, str, str, str, str, str, str, str, str, str, str, Optional[float], Optional[float]
+]
+
+# Parâmetros do INSERT em test_runs e latest_test_results, na ordem das colunas
+TestRunParams = Tuple[str, str, str, str, str, str, Optional[str], float, str, int, Optional[str]]
+
+# Chave de configuração da política automática de retenção
+RETENTION_KEEP_LAST_KEY = "retention.keep_last"
+
+# Colunas de objectives indexadas pela busca textual, com o peso de cada uma no bm25
+SEARCH_COLUMNS = ("nome", "descricao", "invariantes", "saidas_esperadas")
+SEARCH_WEIGHTS = (10.0, 4.0, 2.0, 2.0)
+
+# Dias da rollup diária (contados a partir do mais recente) usados na
+# estimativa de duração dos arquivos de teste
+FILE_DURATION_WINDOW_DAYS = 14
+
+# Execuções anteriores cuja média é a referência dos saltos de duração
+JUMP_BASELINE_RUNS = 5
+
+# Detector de regressões de duração (mediana/MAD das últimas execuções aprovadas)
+REGRESSION_HISTORY_RUNS = 20
+REGRESSION_MIN_HISTORY = 5
+REGRESSION_MIN_SCORE = 3.5
+REGRESSION_MIN_RATIO = 1.2
+REGRESSION_MIN_DELTA = 0.05
+
+# Tamanho padrão do cache de objetivos e sumários usado pela CLI
+OBJECT_CACHE_SIZE = 512
+
+
+@dataclass
+class CompactionReport:
+    """Resultado da compactação do histórico de test_runs."""
+
+    rows_deleted: int = 0
+    audit_rows_kept: int = 0
+    errors_externalized: int = 0
+    blobs_removed: int = 0
+    blob_bytes_freed: int = 0
+    size_before: int = 0
+    size_after: int = 0
+
+
+@dataclass
+class FlakyTest:
+    """Instabilidade de um teste calculada a partir do histórico.
+
+    score é a fração de execuções consecutivas (tentativas incluídas)
+    em que o resultado alternou entre sucesso e falha.
+    """
+
+    objective_id: str
+    test_name: str
+    runs: int
+    failures: int
+    flips: int
+    retry_passes: int
+    score: float
+
+
+@dataclass
+class PassRateTrend:
+    """Execuções de um objetivo em um dia, com a taxa de sucesso móvel.
+
+    rolling_pass_rate considera o dia e os anteriores dentro da janela
+    pedida (ver Database.get_pass_rate_trend).
+    """
+
+    objective_id: str
+    day: str
+    runs: int
+    passed: int
+    failed: int
+    skipped: int
+    error: int
+    duration_total: float
+    pass_rate: float
+    rolling_pass_rate: float
+
+
+@dataclass
+class DurationTrend:
+    """Percentis de duração das últimas execuções de um teste."""
+
+    objective_id: str
+    test_file: str
+    test_name: str
+    runs: int
+    p50: float
+    p95: float
+    max: float
+    latest: float
+
+
+@dataclass
+class DurationJump:
+    """Execução cuja duração saltou em relação à média das anteriores."""
+
+    objective_id: str
+    test_file: str
+    test_name: str
+    run_id: str
+    run_at: str
+    duration: float
+    baseline: float
+    ratio: float
+
+
+@dataclass
+class DurationRegression:
+    """Teste cuja última execução aprovada ficou significativamente mais lenta.
+
+    score é o desvio robusto (duration - mediana) / (1,4826 × MAD) em
+    relação às execuções aprovadas anteriores (ver REGRESSION_*).
+    """
+
+    objective_id: str
+    test_file: str
+    test_name: str
+    test_run_id: str
+    run_at: str
+    duration: float
+    baseline_median: float
+    baseline_mad: float
+    score: float
+
+    @property
+    def ratio(self) -> float:
+        return self.duration / self.baseline_median if self.baseline_median else float("inf")
+
+
+@dataclass
+class CachedValidation:
+    """Resultado persistido de uma regra de validação para um sujeito.
+
+    fingerprint resume as entradas das quais o resultado dependeu; se
+    valid_until estiver definido, o resultado expira nesse instante.
+    """
+
+    subject: str
+    fingerprint: str
+    problems: List[str]
+    valid_until: Optional[datetime] = None
+
+
+@dataclass
+class WorkspaceProject:
+    """Projeto registrado no índice de um workspace."""
+
+    name: str
+    root: str
+    added_at: datetime
+
+
+@dataclass
+class ProjectHealth:
+    """Situação dos objetivos de um projeto, lida do seu próprio banco."""
+
+    project: str
+    objectives: int
+    tested: int
+    passing: int
+    failing: int
+
+
+@dataclass
+class SearchHit:
+    """Objetivo encontrado pela busca textual.
+
+    score é o bm25 do FTS5 (menor = mais relevante; 0.0 na busca por LIKE).
+    """
+
+    objective: Objective
+    score: float
+    snippet: str
+
+
+@dataclass
+class CacheStats:
+    """Contadores do cache de objetos de um Database."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fração das leituras atendidas pelo cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+# Marcador de ausência no cache (None é um valor válido)
+_MISSING = object()
+
+
+class _ObjectCache:
+    """Mapa de identidade limitado (LRU) para objetivos e sumários.
+
+    Chaves são tuplas (tipo, id). Valores podem ser None (ex.: objetivo
+    sem sumário), por isso leituras ausentes retornam `_MISSING`. Com
+    maxsize 0 o cache fica desativado e não conta acertos nem faltas.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[Tuple[str, str], Any]" = OrderedDict()
+
+    def get(self, key: Tuple[str, str]) -> Any:
+        if not self.maxsize:
+            return _MISSING
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.stats.misses += 1
+            return _MISSING
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def peek(self, key: Tuple[str, str]) -> Any:
+        """Valor em cache sem contar acesso nem alterar a ordem LRU."""
+        return self._entries.get(key, _MISSING)
+
+    def put(self, key: Tuple[str, str], value: Any) -> None:
+        if not self.maxsize:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def discard(self, key: Tuple[str, str]) -> None:
+        self._entries.pop(key, None)
+
+    def values(self, kind: str) -> List[Any]:
+        """Valores em cache de um tipo."""
+        return [value for (entry_kind, _), value in self._entries.items() if entry_kind == kind]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class AmbiguousIdError(ValueError):
+    """Prefixo de ID que corresponde a mais de um registro."""
+
+    def __init__(self, prefix: str, candidates: List[str]) -> None:
+        self.prefix = prefix
+        self.candidates = candidates
+        super().__init__(f"Prefixo '{prefix}' é ambíguo: corresponde a {', '.join(candidates)}")
+
+
+class AmbiguousObjectiveIdError(AmbiguousIdError):
+    """Prefixo de ID que corresponde a mais de um objetivo."""
+
+
+class AmbiguousTestRunIdError(AmbiguousIdError):
+    """Prefixo de ID que corresponde a mais de uma execução de teste."""
+
+
+def _fts_query(query: str) -> str:
+    """Converte a consulta do usuário em uma expressão FTS5.
+
+    Cada termo vira uma frase entre aspas com prefixo (`"termo"*`), de modo
+    que todos os termos precisam aparecer e a sintaxe do FTS5 (aspas,
+    operadores, parênteses) digitada pelo usuário não causa erro.
+    """
+    terms = [term.replace('"', '""') for term in query.split()]
+    return " ".join(f'"{term}"*' for term in terms if term.strip('"'))
+
+
+def _prefix_upper_bound(prefix: str) -> Optional[str]:
+    """Menor texto maior que todos os que começam com `prefix`.
+
+    Com ela, `id >= prefix AND id < limite` vira uma varredura por
+    intervalo no índice da chave primária. None se não houver limite
+    (último caractere já é o maior code point).
+    """
+    for index in range(len(prefix) - 1, -1, -1):
+        if ord(prefix[index]) < 0x10FFFF:
+            return prefix[:index] + chr(ord(prefix[index]) + 1)
+    return None
+
+
+def _encode_lines(lines: Iterable[int]) -> str:
+    """Compacta números de linha em intervalos: [1, 2, 3, 7, 9, 10] → "1-3,7,9-10"."""
+    ranges: List[str] = []
+    start = previous = None
+    for line in sorted(set(lines)):
+        if previous is not None and line == previous + 1:
+            previous = line
+            continue
+        if start is not None:
+            ranges.append(str(start) if start == previous else f"{start}-{previous}")
+        start = previous = line
+    if start is not None:
+        ranges.append(str(start) if start == previous else f"{start}-{previous}")
+    return ",".join(ranges)
+
+
+def _decode_lines(encoded: str) -> List[Tuple[int, int]]:
+    """Intervalos (início, fim) inclusivos de uma string de _encode_lines."""
+    ranges = []
+    for part in filter(None, encoded.split(",")):
+        start, _, end = part.partition("-")
+        ranges.append((int(start), int(end or start)))
+    return ranges
+
+
+def _has_line_in(sorted_lines: List[int], first: int, last: int) -> bool:
+    """Indica se alguma linha da lista ordenada está em [first, last]."""
+    index = bisect.bisect_left(sorted_lines, first)
+    return index < len(sorted_lines) and sorted_lines[index] <= last
+
+
+def _median(values: List[float]) -> float:
+    """Mediana de uma lista (não vazia) de valores."""
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def _slowdown(duration: float, history: List[float]) -> Optional[Tuple[float, float, float]]:
+    """Avalia se `duration` é uma lentidão significativa em relação a `history`.
+
+    Usa mediana e MAD (desvio absoluto mediano), que não se deixam levar
+    por execuções atípicas do próprio histórico. O desvio tem piso de 5%
+    da mediana, para que históricos muito estáveis (MAD ≈ 0) não marquem
+    qualquer oscilação; além do score, a duração precisa superar a mediana
+    por REGRESSION_MIN_RATIO e REGRESSION_MIN_DELTA segundos.
+
+    Returns:
+        (mediana, MAD, score) se for uma regressão, senão None.
+    """
+    if len(history) < REGRESSION_MIN_HISTORY:
+        return None
+    median = _median(history)
+    mad = _median([abs(value - median) for value in history])
+    spread = max(1.4826 * mad, 0.05 * median, 1e-6)
+    score = (duration - median) / spread
+    if (
+        score >= REGRESSION_MIN_SCORE
+        and duration >= median * REGRESSION_MIN_RATIO
+        and duration - median >= REGRESSION_MIN_DELTA
+    ):
+        return median, mad, score
+    return None
+
 
 class Database:
     """Gerenciamento de banco de dados SQLite para objetivos."""
 
-    def __init__(self, db_path: Path) -> None:
+    _INSERT_OBJECTIVE_SQL = """
+        INSERT INTO objectives (
+            id, nome, descricao, tipos,
+            entradas, saidas_esperadas,
+            efeitos_colaterais, invariantes,
+            status, created_at, updated_at,
+            timeout_teste, timeout_total
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+
+    _INSERT_TEST_RUN_SQL = """
+        INSERT INTO test_runs (
+            id, run_id, objective_id, test_file, test_name,
+            status, error_message, duration, run_at, attempt, output_ref
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+
+    # Importação idempotente: execuções com id já existente são ignoradas
+    _IMPORT_TEST_RUN_SQL = _INSERT_TEST_RUN_SQL.replace("INSERT INTO", "INSERT OR IGNORE INTO", 1)
+
+    _UPSERT_LATEST_SQL = """
+        INSERT INTO latest_test_results (
+            id, run_id, objective_id, test_file, test_name,
+            status, error_message, duration, run_at, attempt, output_ref
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(objective_id, test_file, test_name) DO UPDATE SET
+            id = excluded.id,
+            run_id = excluded.run_id,
+            status = excluded.status,
+            error_message = excluded.error_message,
+            duration = excluded.duration,
+            run_at = excluded.run_at,
+            attempt = excluded.attempt,
+            output_ref = excluded.output_ref
+        WHERE excluded.run_at >= latest_test_results.run_at
+    """
+
+    _PRUNE_LATEST_SQL = """
+        DELETE FROM latest_test_results
+        WHERE objective_id = ? AND test_file = ? AND run_id != ?
+    """
+
+    # Duração média de cada teste nos últimos FILE_DURATION_WINDOW_DAYS dias
+    # da rollup (parâmetro: deslocamento do dia inicial para date()).
+    # Materializar força a busca pelo índice de dia; sem estatísticas o
+    # planejador percorreria a rollup inteira.
+    _RECENT_TEST_DURATIONS_SQL = """
+        WITH recent AS MATERIALIZED (
+            SELECT objective_id, test_file, test_name, runs, duration_total
+            FROM test_daily_rollup
+            WHERE day >= date((SELECT MAX(day) FROM test_daily_rollup), ?)
+        )
+        SELECT objective_id, test_file, SUM(duration_total) / SUM(runs) AS test_duration
+        FROM recent
+        GROUP BY objective_id, test_file, test_name
+    """
+
+    def __init__(self, db_path: Path, cache_size: int = 0) -> None:
         """Inicializa a conexão com o banco e cria o schema se necessário.
 
         Args:
             db_path: Caminho para o arquivo SQLite.
+            cache_size: Máximo de objetivos e sumários mantidos em memória
+                (0 desativa). O cache só enxerga escritas feitas por esta
+                instância; use-o em instâncias de vida curta, como a de um
+                comando da CLI.
         """
         self.db_path = db_path
+        self.blobs = BlobStore.for_database(Path(db_path))
+        self._cache = _ObjectCache(cache_size)
         self._create_schema()
 
+    @property
+    def cache_stats(self) -> CacheStats:
+        """Acertos, faltas e descartes do cache de objetos."""
+        return self._cache.stats
+
     @contextmanager
-    def _connection(self):
-        """Context manager para conexões com o banco."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        try:
-            yield conn
-            conn.commit()
-        except Exception:
-            conn.rollback()
-            raise
-        finally:
-            conn.close()
+    def _connection(self, operation: str) -> Iterator[sqlite3.Connection]:
+        """Context manager para conexões com o banco.
+
+        Cada uso conta como uma operação nas métricas (src/metrics.py) e,
+        com o rastreamento ligado, vira um span (src/tracing.py), ambos
+        rotulados por `operation` (o nome do método do Database).
+        """
+        started = time.perf_counter()
+        with tracing.span(f"db.{operation}", "db"):
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.close()
+                metrics.DB_OPERATIONS.inc(operation=operation)
+                metrics.DB_OPERATION_DURATION.observe(
+                    time.perf_counter() - started, operation=operation
+                )
 
     def _create_schema(self) -> None:
         """Cria as tabelas se não existirem."""
-        with self._connection() as conn:
+        with self._connection("_create_schema") as conn:
             # Tabela objectives
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS objectives (
@@ -52,9 +508,27 @@ class Database:
                     invariantes TEXT,
                     status TEXT NOT NULL,
                     created_at TEXT NOT NULL,
-                    updated_at TEXT NOT NULL
+                    updated_at TEXT NOT NULL,
+                    timeout_teste REAL,
+                    timeout_total REAL
                 )
             """)
+            self._add_missing_columns(
+                conn, "objectives", {"timeout_teste": "REAL", "timeout_total": "REAL"}
+            )
+            self.fts_enabled = self._create_search_index(conn)
+            # Dependências entre objetivos (arestas objetivo → dependência)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS objective_dependencies (
+                    objective_id TEXT NOT NULL,
+                    depends_on TEXT NOT NULL,
+                    PRIMARY KEY (objective_id, depends_on)
+                ) WITHOUT ROWID
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_objective_dependencies_reverse
+                ON objective_dependencies (depends_on, objective_id)
+            """)
             # Tabela test_runs
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS test_runs (
@@ -66,9 +540,134 @@ class Database:
                     error_message TEXT,
                     duration REAL,
                     run_at TEXT NOT NULL,
+                    run_id TEXT,
+                    attempt INTEGER NOT NULL DEFAULT 1,
+                    output_ref TEXT,
                     FOREIGN KEY (objective_id) REFERENCES objectives(id)
                 )
             """)
+            self._add_missing_columns(
+                conn,
+                "test_runs",
+                {"run_id": "TEXT", "attempt": "INTEGER NOT NULL DEFAULT 1", "output_ref": "TEXT"},
+            )
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_test_runs_test
+                ON test_runs (objective_id, test_file, test_name, run_at)
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_test_runs_run
+                ON test_runs (objective_id, run_id)
+            """)
+            # Último resultado de cada teste, mantido a cada execução salva
+            has_latest = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'latest_test_results'"
+            ).fetchone()
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS latest_test_results (
+                    objective_id TEXT NOT NULL,
+                    test_file TEXT NOT NULL,
+                    test_name TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    run_id TEXT,
+                    status TEXT NOT NULL,
+                    error_message TEXT,
+                    duration REAL,
+                    run_at TEXT NOT NULL,
+                    attempt INTEGER NOT NULL DEFAULT 1,
+                    output_ref TEXT,
+                    PRIMARY KEY (objective_id, test_file, test_name)
+                )
+            """)
+            self._add_missing_columns(
+                conn,
+                "latest_test_results",
+                {"attempt": "INTEGER NOT NULL DEFAULT 1", "output_ref": "TEXT"},
+            )
+            if not has_latest:
+                # Bancos antigos: preencher a partir do histórico existente
+                conn.execute("""
+                    INSERT INTO latest_test_results (
+                        objective_id, test_file, test_name, id, run_id,
+                        status, error_message, duration, run_at, attempt, output_ref
+                    )
+                    SELECT objective_id, test_file, test_name, id, run_id,
+                           status, error_message, duration, run_at, attempt, output_ref
+                    FROM (
+                        SELECT *, ROW_NUMBER() OVER (
+                            PARTITION BY objective_id, test_file, test_name
+                            ORDER BY run_at DESC, rowid DESC
+                        ) AS rn
+                        FROM test_runs
+                    )
+                    WHERE rn = 1
+                """)
+            self._create_daily_rollup(conn)
+            # Configurações persistentes (ex.: política de retenção)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS settings (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )
+            """)
+            # Regressões de duração em aberto (uma por teste), ver update_duration_regressions
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS duration_regressions (
+                    objective_id TEXT NOT NULL,
+                    test_file TEXT NOT NULL,
+                    test_name TEXT NOT NULL,
+                    test_run_id TEXT NOT NULL,
+                    run_at TEXT NOT NULL,
+                    duration REAL NOT NULL,
+                    baseline_median REAL NOT NULL,
+                    baseline_mad REAL NOT NULL,
+                    score REAL NOT NULL,
+                    PRIMARY KEY (objective_id, test_file, test_name)
+                ) WITHOUT ROWID
+            """)
+            # Resultados de validação de `vibe project check` por regra e sujeito
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS validation_cache (
+                    rule TEXT NOT NULL,
+                    subject TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    problems TEXT NOT NULL,
+                    valid_until TEXT,
+                    PRIMARY KEY (rule, subject)
+                ) WITHOUT ROWID
+            """)
+            # Índice de workspace: projetos registrados e última execução de cada comando
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS workspace_projects (
+                    name TEXT PRIMARY KEY,
+                    root TEXT NOT NULL UNIQUE,
+                    added_at TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS workspace_runs (
+                    project TEXT NOT NULL,
+                    command TEXT NOT NULL,
+                    exit_code INTEGER NOT NULL,
+                    duration REAL NOT NULL,
+                    finished_at TEXT NOT NULL,
+                    output TEXT NOT NULL,
+                    PRIMARY KEY (project, command)
+                ) WITHOUT ROWID
+            """)
+            # Linhas de código executadas pelos testes de cada objetivo (intervalos "1-3,7")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS objective_coverage (
+                    objective_id TEXT NOT NULL,
+                    source_file TEXT NOT NULL,
+                    lines TEXT NOT NULL,
+                    PRIMARY KEY (objective_id, source_file)
+                ) WITHOUT ROWID
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_objective_coverage_file
+                ON objective_coverage (source_file, objective_id)
+            """)
             # Tabela test_summary
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS test_summary (
@@ -84,6 +683,149 @@ class Database:
                 )
             """)
 
+    def _create_search_index(self, conn: sqlite3.Connection) -> bool:
+        """Cria o índice FTS5 de objetivos e os triggers que o sincronizam.
+
+        O índice usa objectives como tabela de conteúdo externo (o texto
+        não é duplicado). Bancos antigos são indexados na criação.
+
+        Returns:
+            False se o SQLite não tiver suporte a FTS5 (a busca usa LIKE).
+        """
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'objectives_fts'"
+        ).fetchone()
+        if not exists:
+            try:
+                conn.execute(f"""
+                    CREATE VIRTUAL TABLE objectives_fts USING fts5(
+                        {", ".join(SEARCH_COLUMNS)},
+                        content = 'objectives',
+                        content_rowid = 'rowid',
+                        tokenize = 'unicode61 remove_diacritics 2',
+                        prefix = '2 3'
+                    )
+                """)
+            except sqlite3.OperationalError:
+                return False
+            conn.execute("INSERT INTO objectives_fts (objectives_fts) VALUES ('rebuild')")
+        columns = ", ".join(SEARCH_COLUMNS)
+        new_values = ", ".join(f"new.{column}" for column in SEARCH_COLUMNS)
+        old_values = ", ".join(f"old.{column}" for column in SEARCH_COLUMNS)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS objectives_fts_insert AFTER INSERT ON objectives BEGIN
+                INSERT INTO objectives_fts (rowid, {columns}) VALUES (new.rowid, {new_values});
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS objectives_fts_delete AFTER DELETE ON objectives BEGIN
+                INSERT INTO objectives_fts (objectives_fts, rowid, {columns})
+                VALUES ('delete', old.rowid, {old_values});
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS objectives_fts_update
+            AFTER UPDATE OF {columns} ON objectives BEGIN
+                INSERT INTO objectives_fts (objectives_fts, rowid, {columns})
+                VALUES ('delete', old.rowid, {old_values});
+                INSERT INTO objectives_fts (rowid, {columns}) VALUES (new.rowid, {new_values});
+            END
+        """)
+        return True
+
+    def _create_daily_rollup(self, conn: sqlite3.Connection) -> None:
+        """Cria test_daily_rollup e o trigger que a mantém a cada execução gravada.
+
+        A rollup cobre todo o histórico e não é alterada pela compactação,
+        que só remove linhas de test_runs. Bancos antigos são preenchidos
+        a partir de test_runs e da antiga test_run_daily (agregados das
+        execuções já compactadas), que é removida em seguida.
+        """
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'test_daily_rollup'"
+        ).fetchone()
+        legacy = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'test_run_daily'"
+        ).fetchone()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS test_daily_rollup (
+                objective_id TEXT NOT NULL,
+                test_file TEXT NOT NULL,
+                test_name TEXT NOT NULL,
+                day TEXT NOT NULL,
+                runs INTEGER NOT NULL,
+                passed INTEGER NOT NULL,
+                failed INTEGER NOT NULL,
+                skipped INTEGER NOT NULL,
+                error INTEGER NOT NULL,
+                duration_total REAL NOT NULL,
+                duration_max REAL NOT NULL,
+                PRIMARY KEY (objective_id, test_file, test_name, day)
+            ) WITHOUT ROWID
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_test_daily_rollup_day
+            ON test_daily_rollup (day, objective_id)
+        """)
+        if not exists:
+            compacted = (
+                """
+                    SELECT objective_id, test_file, test_name, day, runs, passed, failed,
+                           skipped, error, duration_total, duration_max
+                    FROM test_run_daily
+                    UNION ALL"""
+                if legacy
+                else ""
+            )
+            conn.execute(f"""
+                INSERT INTO test_daily_rollup
+                SELECT objective_id, test_file, test_name, day,
+                       SUM(runs), SUM(passed), SUM(failed), SUM(skipped), SUM(error),
+                       SUM(duration_total), MAX(duration_max)
+                FROM ({compacted}
+                    SELECT objective_id, test_file, test_name, substr(run_at, 1, 10) AS day,
+                           1 AS runs, status = 'PASSED' AS passed, status = 'FAILED' AS failed,
+                           status = 'SKIPPED' AS skipped, status = 'ERROR' AS error,
+                           COALESCE(duration, 0.0) AS duration_total,
+                           COALESCE(duration, 0.0) AS duration_max
+                    FROM test_runs
+                )
+                GROUP BY objective_id, test_file, test_name, day
+            """)
+        if legacy:
+            # As execuções compactadas depois da criação da rollup já foram
+            # contadas pelo trigger quando gravadas
+            conn.execute("DROP TABLE test_run_daily")
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS test_daily_rollup_insert AFTER INSERT ON test_runs BEGIN
+                INSERT INTO test_daily_rollup (
+                    objective_id, test_file, test_name, day, runs,
+                    passed, failed, skipped, error, duration_total, duration_max
+                ) VALUES (
+                    new.objective_id, new.test_file, new.test_name, substr(new.run_at, 1, 10), 1,
+                    new.status = 'PASSED', new.status = 'FAILED', new.status = 'SKIPPED',
+                    new.status = 'ERROR', COALESCE(new.duration, 0.0), COALESCE(new.duration, 0.0)
+                )
+                ON CONFLICT(objective_id, test_file, test_name, day) DO UPDATE SET
+                    runs = runs + 1,
+                    passed = passed + excluded.passed,
+                    failed = failed + excluded.failed,
+                    skipped = skipped + excluded.skipped,
+                    error = error + excluded.error,
+                    duration_total = duration_total + excluded.duration_total,
+                    duration_max = MAX(duration_max, excluded.duration_max);
+            END
+        """)
+
+    def _add_missing_columns(
+        self, conn: sqlite3.Connection, table: str, columns: Dict[str, str]
+    ) -> None:
+        """Adiciona colunas novas a uma tabela criada por versões anteriores."""
+        existing = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+        for name, ddl in columns.items():
+            if name not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}")
+
     def create_objective(self, objective: Objective) -> bool:
         """Insere um novo objetivo no banco.
 
@@ -92,32 +834,119 @@ class Database:
 
         Returns:
             True se sucesso, False se falhar.
+
+        Raises:
+            ValueError: Se as dependências não existirem ou formarem um ciclo.
         """
         try:
-            with self._connection() as conn:
-                conn.execute("""
-                    INSERT INTO objectives (
-                        id, nome, descricao, tipos,
-                        entradas, saidas_esperadas,
-                        efeitos_colaterais, invariantes,
-                        status, created_at, updated_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    objective.id,
-                    objective.nome,
-                    objective.descricao,
-                    json.dumps([t.value for t in objective.tipos]),
-                    json.dumps(objective.entradas),
-                    json.dumps(objective.saidas_esperadas),
-                    json.dumps(objective.efeitos_colaterais),
-                    json.dumps(objective.invariantes),
-                    objective.status.value,
-                    objective.created_at.isoformat(),
-                    objective.updated_at.isoformat(),
-                ))
-            return True
+            with self._connection("create_objective") as conn:
+                conn.execute(self._INSERT_OBJECTIVE_SQL, self._objective_params(objective))
+                self._insert_dependencies(conn, [objective])
         except sqlite3.Error:
             return False
+        self._cache.put(("objective", objective.id), objective)
+        return True
+
+    def create_objectives(self, objectives: Iterable[Objective]) -> List[Objective]:
+        """Insere vários objetivos em uma única transação.
+
+        Objetivos cujo ID já existe no banco (ou que se repetem no lote)
+        são ignorados.
+
+        Args:
+            objectives: Objetivos a serem persistidos.
+
+        Returns:
+            Lista dos objetivos efetivamente inseridos.
+
+        Raises:
+            ValueError: Se alguma dependência não existir (no banco ou no
+                lote) ou formar um ciclo; nenhum objetivo do lote é gravado.
+        """
+        pending = {obj.id: obj for obj in objectives}
+        if not pending:
+            return []
+        with self._connection("create_objectives") as conn:
+            existing: Set[str] = set()
+            ids = list(pending)
+            # Respeita o limite de parâmetros do SQLite
+            for start in range(0, len(ids), 500):
+                chunk = ids[start : start + 500]
+                placeholders = ", ".join("?" * len(chunk))
+                cursor = conn.execute(
+                    f"SELECT id FROM objectives WHERE id IN ({placeholders})", chunk
+                )
+                existing.update(row["id"] for row in cursor)
+            inserted = [obj for obj_id, obj in pending.items() if obj_id not in existing]
+            conn.executemany(
+                self._INSERT_OBJECTIVE_SQL,
+                (self._objective_params(obj) for obj in inserted),
+            )
+            self._insert_dependencies(conn, inserted)
+        return inserted
+
+    def _objective_params(self, objective: Objective) -> ObjectiveParams:
+        """Converte um objetivo nos parâmetros do INSERT."""
+        return (
+            objective.id,
+            objective.nome,
+            objective.descricao,
+            json.dumps([t.value for t in objective.tipos]),
+            json.dumps(objective.entradas),
+            json.dumps(objective.saidas_esperadas),
+            json.dumps(objective.efeitos_colaterais),
+            json.dumps(objective.invariantes),
+            objective.status.value,
+            objective.created_at.isoformat(),
+            objective.updated_at.isoformat(),
+            objective.timeout_teste,
+            objective.timeout_total,
+        )
+
+    def _find_ids(self, table: str, prefix: str, limit: int) -> List[str]:
+        """IDs de `table` que começam com `prefix`, em ordem.
+
+        Usa uma varredura por intervalo no índice da chave primária
+        (`id >= ? AND id < ?`): O(log n + limit), sem percorrer a tabela.
+        """
+        if not prefix:
+            return []
+        upper = _prefix_upper_bound(prefix)
+        with self._connection("_find_ids") as conn:
+            if upper is None:
+                rows = conn.execute(
+                    f"SELECT id FROM {table} WHERE id >= ? ORDER BY id LIMIT ?", (prefix, limit)
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    f"SELECT id FROM {table} WHERE id >= ? AND id < ? ORDER BY id LIMIT ?",
+                    (prefix, upper, limit),
+                ).fetchall()
+        return [row["id"] for row in rows if row["id"].startswith(prefix)]
+
+    def find_objective_ids(self, prefix: str, limit: int = 2) -> List[str]:
+        """IDs de objetivos que começam com `prefix`, em ordem."""
+        return self._find_ids("objectives", prefix, limit)
+
+    def resolve_objective_id(self, prefix: str, max_candidates: int = 5) -> Optional[str]:
+        """Resolve um ID completo ou prefixo (ex.: os 8 caracteres exibidos).
+
+        Um ID idêntico ao valor informado tem precedência sobre IDs mais
+        longos com o mesmo prefixo.
+
+        Returns:
+            ID completo, ou None se nenhum objetivo corresponder.
+
+        Raises:
+            AmbiguousObjectiveIdError: Se o prefixo corresponder a mais de um
+                objetivo (com até `max_candidates` candidatos).
+        """
+        candidates = self.find_objective_ids(prefix, limit=max_candidates)
+        if not candidates:
+            return None
+        if len(candidates) == 1 or candidates[0] == prefix:
+            return candidates[0]
+        raise AmbiguousObjectiveIdError(prefix, candidates)
 
     def get_objective(self, objective_id: str) -> Optional[Objective]:
         """Recupera um objetivo pelo ID.
@@ -126,9 +955,13 @@ class Database:
             objective_id: ID do objetivo.
 
         Returns:
-            Objetivo se encontrado, None caso contrário.
+            Objetivo se encontrado, None caso contrário. Com o cache ativo,
+            leituras repetidas retornam a mesma instância.
         """
-        with self._connection() as conn:
+        cached = self._cache.get(("objective", objective_id))
+        if cached is not _MISSING:
+            return cast(Optional[Objective], cached)
+        with self._connection("get_objective") as conn:
             cursor = conn.execute(
                 "SELECT * FROM objectives WHERE id = ?",
                 (objective_id,)
@@ -136,7 +969,10 @@ class Database:
             row = cursor.fetchone()
             if row is None:
                 return None
-            return self._row_to_objective(row)
+            objective = self._row_to_objective(row)
+            self._attach_dependencies(conn, [objective])
+        self._cache.put(("objective", objective_id), objective)
+        return objective
 
     def list_objectives(self) -> List[Objective]:
         """Lista todos os objetivos armazenados.
@@ -144,12 +980,88 @@ class Database:
         Returns:
             Lista de objetivos ordenados por created_at (mais recente primeiro).
         """
-        with self._connection() as conn:
+        with self._connection("list_objectives") as conn:
             cursor = conn.execute(
                 "SELECT * FROM objectives ORDER BY created_at DESC"
             )
             rows = cursor.fetchall()
-            return [self._row_to_objective(row) for row in rows]
+            objectives = [self._row_to_objective(row) for row in rows]
+            graph = self._dependency_graph(conn)
+        for objective in objectives:
+            objective.dependencias = graph.get(objective.id, [])
+            self._cache.put(("objective", objective.id), objective)
+        return objectives
+
+    def iter_objectives(self, batch_size: int = 1000) -> Iterator[Objective]:
+        """Itera sobre todos os objetivos sem carregá-los de uma vez.
+
+        Args:
+            batch_size: Quantidade de linhas lidas do cursor por vez.
+
+        Yields:
+            Objetivos na ordem de inserção (sem ordenação em memória).
+        """
+        with self._connection("iter_objectives") as conn:
+            cursor = conn.execute("SELECT * FROM objectives ORDER BY rowid")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                objectives = [self._row_to_objective(row) for row in rows]
+                self._attach_dependencies(conn, objectives)
+                yield from objectives
+
+    def search_objectives(self, query: str, limit: int = 20) -> List[SearchHit]:
+        """Busca objetivos por texto em nome, descrição, invariantes e saídas.
+
+        Todos os termos precisam aparecer (como palavra ou prefixo de
+        palavra, sem diferenciar acentos). Com FTS5 os resultados vêm
+        ordenados por relevância (bm25, com o nome pesando mais); sem
+        FTS5, por nome, usando LIKE.
+
+        Args:
+            query: Termos da busca.
+            limit: Máximo de resultados.
+
+        Returns:
+            Objetivos encontrados, do mais relevante ao menos.
+        """
+        terms = query.split()
+        if not terms:
+            return []
+        with self._connection("search_objectives") as conn:
+            if self.fts_enabled:
+                weights = ", ".join(str(weight) for weight in SEARCH_WEIGHTS)
+                cursor = conn.execute(
+                    f"""
+                    SELECT o.*,
+                           bm25(objectives_fts, {weights}) AS score,
+                           snippet(objectives_fts, -1, '[', ']', '…', 12) AS snippet
+                    FROM objectives_fts
+                    JOIN objectives o ON o.rowid = objectives_fts.rowid
+                    WHERE objectives_fts MATCH ?
+                    ORDER BY score
+                    LIMIT ?
+                """,
+                    (_fts_query(query), limit),
+                )
+            else:
+                condition = " OR ".join(f"{column} LIKE ? ESCAPE '\\'" for column in SEARCH_COLUMNS)
+                params: List[Any] = []
+                for term in terms:
+                    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                    params.extend([f"%{escaped}%"] * len(SEARCH_COLUMNS))
+                cursor = conn.execute(
+                    "SELECT *, 0.0 AS score, substr(descricao, 1, 80) AS snippet FROM objectives "
+                    f"WHERE {' AND '.join(f'({condition})' for _ in terms)} ORDER BY nome LIMIT ?",
+                    [*params, limit],
+                )
+            rows = cursor.fetchall()
+            hits = [
+                SearchHit(self._row_to_objective(row), row["score"], row["snippet"]) for row in rows
+            ]
+            self._attach_dependencies(conn, [hit.objective for hit in hits])
+            return hits
 
     def update_objective(self, objective: Objective) -> bool:
         """Atualiza um objetivo existente.
@@ -159,9 +1071,12 @@ class Database:
 
         Returns:
             True se sucesso, False se falhar.
+
+        Raises:
+            ValueError: Se as dependências não existirem ou formarem um ciclo.
         """
         try:
-            with self._connection() as conn:
+            with self._connection("update_objective") as conn:
                 conn.execute("""
                     UPDATE objectives SET
                         nome = ?,
@@ -172,23 +1087,38 @@ class Database:
                         efeitos_colaterais = ?,
                         invariantes = ?,
                         status = ?,
-                        updated_at = ?
+                        updated_at = ?,
+                        timeout_teste = ?,
+                        timeout_total = ?
                     WHERE id = ?
-                """, (
-                    objective.nome,
-                    objective.descricao,
-                    json.dumps([t.value for t in objective.tipos]),
-                    json.dumps(objective.entradas),
-                    json.dumps(objective.saidas_esperadas),
-                    json.dumps(objective.efeitos_colaterais),
-                    json.dumps(objective.invariantes),
-                    objective.status.value,
-                    objective.updated_at.isoformat(),
-                    objective.id,
-                ))
-            return True
+                """,
+                    (
+                        objective.nome,
+                        objective.descricao,
+                        json.dumps([t.value for t in objective.tipos]),
+                        json.dumps(objective.entradas),
+                        json.dumps(objective.saidas_esperadas),
+                        json.dumps(objective.efeitos_colaterais),
+                        json.dumps(objective.invariantes),
+                        objective.status.value,
+                        objective.updated_at.isoformat(),
+                        objective.timeout_teste,
+                        objective.timeout_total,
+                        objective.id,
+                    ),
+                )
+                conn.execute(
+                    "DELETE FROM objective_dependencies WHERE objective_id = ?", (objective.id,)
+                )
+                self._insert_dependencies(conn, [objective])
         except sqlite3.Error:
+            self._cache.discard(("objective", objective.id))
             return False
+        except ValueError:
+            self._cache.discard(("objective", objective.id))
+            raise
+        self._cache.put(("objective", objective.id), objective)
+        return True
 
     def delete_objective(self, objective_id: str) -> bool:
         """Remove um objetivo do banco.
@@ -200,14 +1130,172 @@ class Database:
             True se sucesso, False se falhar.
         """
         try:
-            with self._connection() as conn:
+            with self._connection("delete_objective") as conn:
+                conn.execute("DELETE FROM objectives WHERE id = ?", (objective_id,))
                 conn.execute(
-                    "DELETE FROM objectives WHERE id = ?",
-                    (objective_id,)
+                    "DELETE FROM objective_dependencies WHERE objective_id = ? OR depends_on = ?",
+                    (objective_id, objective_id),
+                )
+                conn.execute(
+                    "DELETE FROM objective_coverage WHERE objective_id = ?", (objective_id,)
                 )
-            return True
         except sqlite3.Error:
             return False
+        self._cache.discard(("objective", objective_id))
+        self._cache.discard(("summary", objective_id))
+        for cached in self._cache.values("objective"):
+            if objective_id in cached.dependencias:
+                cached.dependencias.remove(objective_id)
+        return True
+
+    # Dependências entre objetivos
+    def _insert_dependencies(
+        self, conn: sqlite3.Connection, objectives: Iterable[Objective]
+    ) -> None:
+        """Grava as arestas de dependência dos objetivos informados.
+
+        Os objetivos já devem estar gravados na mesma transação, para que
+        dependências entre objetivos de um mesmo lote sejam aceitas.
+
+        Raises:
+            UnknownDependencyError: Se uma dependência não existir.
+            DependencyCycleError: Se as novas arestas fecharem um ciclo.
+        """
+        from src.dependencies import DependencyCycleError, UnknownDependencyError, find_cycle
+
+        edges = [(obj.id, dep) for obj in objectives for dep in obj.dependencias]
+        if not edges:
+            return
+        targets = list({dep for _, dep in edges})
+        found: Set[str] = set()
+        for start in range(0, len(targets), 500):
+            chunk = targets[start : start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            cursor = conn.execute(f"SELECT id FROM objectives WHERE id IN ({placeholders})", chunk)
+            found.update(row["id"] for row in cursor)
+        for objective_id, dep in edges:
+            if dep not in found:
+                raise UnknownDependencyError(objective_id, dep)
+        conn.executemany(
+            "INSERT OR IGNORE INTO objective_dependencies (objective_id, depends_on) VALUES (?, ?)",
+            edges,
+        )
+        # O grafo gravado não tem ciclos: um ciclo novo passa por estas arestas
+        cycle = find_cycle(self._dependency_graph(conn))
+        if cycle:
+            raise DependencyCycleError(cycle)
+
+    def _attach_dependencies(self, conn: sqlite3.Connection, objectives: List[Objective]) -> None:
+        """Preenche `dependencias` dos objetivos com uma consulta por bloco de IDs."""
+        by_id = {obj.id: obj for obj in objectives}
+        ids = list(by_id)
+        for start in range(0, len(ids), 500):
+            chunk = ids[start : start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            cursor = conn.execute(
+                "SELECT objective_id, depends_on FROM objective_dependencies "
+                f"WHERE objective_id IN ({placeholders}) ORDER BY objective_id, depends_on",
+                chunk,
+            )
+            for row in cursor:
+                by_id[row["objective_id"]].dependencias.append(row["depends_on"])
+
+    def _dependency_graph(self, conn: sqlite3.Connection) -> Dict[str, List[str]]:
+        """Lê todas as arestas de dependência."""
+        cursor = conn.execute(
+            "SELECT objective_id, depends_on FROM objective_dependencies "
+            "ORDER BY objective_id, depends_on"
+        )
+        graph: Dict[str, List[str]] = {}
+        for row in cursor:
+            graph.setdefault(row["objective_id"], []).append(row["depends_on"])
+        return graph
+
+    def get_dependency_graph(self) -> Dict[str, List[str]]:
+        """Retorna todas as arestas: {objective_id: [dependências]}."""
+        with self._connection("get_dependency_graph") as conn:
+            return self._dependency_graph(conn)
+
+    def get_dependents(self, objective_id: str) -> List[str]:
+        """Lista os objetivos que dependem diretamente do objetivo informado."""
+        with self._connection("get_dependents") as conn:
+            cursor = conn.execute(
+                "SELECT objective_id FROM objective_dependencies "
+                "WHERE depends_on = ? ORDER BY objective_id",
+                (objective_id,),
+            )
+            return [row["objective_id"] for row in cursor]
+
+    def depends_on(self, objective_id: str, target_id: str) -> bool:
+        """Indica se objective_id depende, direta ou indiretamente, de target_id."""
+        with self._connection("depends_on") as conn:
+            row = conn.execute(
+                """
+                WITH RECURSIVE reach(id) AS (
+                    SELECT depends_on FROM objective_dependencies WHERE objective_id = ?
+                    UNION
+                    SELECT d.depends_on FROM objective_dependencies d
+                    JOIN reach ON d.objective_id = reach.id
+                )
+                SELECT 1 FROM reach WHERE id = ? LIMIT 1
+            """,
+                (objective_id, target_id),
+            ).fetchone()
+            return row is not None
+
+    def add_dependency(self, objective_id: str, depends_on: str) -> bool:
+        """Registra que objective_id depende de depends_on.
+
+        Não verifica ciclos; use src.dependencies.add_dependency.
+
+        Returns:
+            True se a aresta foi criada, False se já existia.
+        """
+        with self._connection("add_dependency") as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO objective_dependencies (objective_id, depends_on) "
+                "VALUES (?, ?)",
+                (objective_id, depends_on),
+            )
+            added = cursor.rowcount > 0
+        cached = self._cache.peek(("objective", objective_id))
+        if added and cached not in (_MISSING, None):
+            bisect.insort(cached.dependencias, depends_on)
+        return added
+
+    def remove_dependency(self, objective_id: str, depends_on: str) -> bool:
+        """Remove uma aresta de dependência.
+
+        Returns:
+            True se a aresta existia.
+        """
+        with self._connection("remove_dependency") as conn:
+            cursor = conn.execute(
+                "DELETE FROM objective_dependencies WHERE objective_id = ? AND depends_on = ?",
+                (objective_id, depends_on),
+            )
+            removed = cursor.rowcount > 0
+        cached = self._cache.peek(("objective", objective_id))
+        if removed and cached not in (_MISSING, None) and depends_on in cached.dependencias:
+            cached.dependencias.remove(depends_on)
+        return removed
+
+    def set_objective_status(self, objective_id: str, status: ObjectiveStatus) -> bool:
+        """Altera apenas o status (e updated_at) de um objetivo."""
+        updated_at = datetime.now()
+        try:
+            with self._connection("set_objective_status") as conn:
+                conn.execute(
+                    "UPDATE objectives SET status = ?, updated_at = ? WHERE id = ?",
+                    (status.value, updated_at.isoformat(), objective_id),
+                )
+        except sqlite3.Error:
+            return False
+        cached = self._cache.peek(("objective", objective_id))
+        if cached not in (_MISSING, None):
+            cached.status = status
+            cached.updated_at = updated_at
+        return True
 
     def _row_to_objective(self, row: sqlite3.Row) -> Objective:
         """Converte uma linha SQLite em um objeto Objective."""
@@ -233,113 +1321,724 @@ class Database:
             status=status,
             created_at=datetime.fromisoformat(data["created_at"]),
             updated_at=datetime.fromisoformat(data["updated_at"]),
+            timeout_teste=data["timeout_teste"],
+            timeout_total=data["timeout_total"],
         )
         return obj
 
     # Métodos para test_runs
+    def _test_run_params(self, test_run: "TestRun") -> TestRunParams:
+        """Converte uma execução nos parâmetros de INSERT.
+
+        O texto do erro vai para o armazenamento de blobs e a linha guarda
+        só a referência (error_message fica NULL). Execuções importadas de
+        outra máquina cujo blob não existe aqui têm o texto disponível
+        (a prévia) regravado localmente.
+        """
+        error_message = test_run.error_message
+        output_ref = test_run.output_ref
+        if error_message and not (output_ref and self.blobs.exists(output_ref)):
+            output_ref = self.blobs.put(error_message)
+        if output_ref:
+            error_message = None
+        return (
+            test_run.id,
+            test_run.run_id,
+            test_run.objective_id,
+            test_run.test_file,
+            test_run.test_name,
+            test_run.status.value,
+            error_message,
+            test_run.duration,
+            test_run.run_at.isoformat(),
+            test_run.attempt,
+            output_ref,
+        )
+
     def save_test_run(self, test_run: "TestRun") -> bool:
-        """Salva uma execução de teste no banco."""
+        """Salva uma execução de teste no banco e atualiza o último resultado."""
         try:
-            with self._connection() as conn:
-                conn.execute("""
-                    INSERT INTO test_runs (
-                        id, objective_id, test_file, test_name,
-                        status, error_message, duration, run_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    test_run.id,
-                    test_run.objective_id,
-                    test_run.test_file,
-                    test_run.test_name,
-                    test_run.status.value,
-                    test_run.error_message,
-                    test_run.duration,
-                    test_run.run_at.isoformat(),
-                ))
+            with self._connection("save_test_run") as conn:
+                params = self._test_run_params(test_run)
+                conn.execute(self._INSERT_TEST_RUN_SQL, params)
+                conn.execute(self._UPSERT_LATEST_SQL, params)
             return True
         except sqlite3.Error:
             return False
 
-    def get_test_runs(self, objective_id: str) -> List["TestRun"]:
-        """Recupera todas as execuções de teste de um objetivo."""
-        from src.models import TestRun, TestStatus
-        with self._connection() as conn:
+    def save_test_runs(self, test_runs: List["TestRun"]) -> bool:
+        """Salva uma rodada de execuções em uma única transação.
+
+        Além de gravar o histórico, substitui em latest_test_results os
+        resultados dos arquivos executados: testes que deixaram de existir
+        nesses arquivos são removidos da visão de últimos resultados.
+
+        Args:
+            test_runs: Execuções de uma mesma rodada (mesmo run_id).
+
+        Returns:
+            True se sucesso, False se falhar.
+        """
+        if not test_runs:
+            return True
+        try:
+            with self._connection("save_test_runs") as conn:
+                params = [self._test_run_params(run) for run in test_runs]
+                conn.executemany(self._INSERT_TEST_RUN_SQL, params)
+                conn.executemany(self._UPSERT_LATEST_SQL, params)
+                files = {(run.objective_id, run.test_file, run.run_id) for run in test_runs}
+                conn.executemany(self._PRUNE_LATEST_SQL, files)
+            return True
+        except sqlite3.Error:
+            return False
+
+    def prune_latest_test_results(
+        self, objective_id: str, run_id: str, test_files: Iterable[str]
+    ) -> bool:
+        """Remove dos últimos resultados testes que não rodaram na rodada.
+
+        Usado quando as execuções são salvas uma a uma (save_test_run):
+        ao final da rodada, testes dos arquivos executados que não
+        produziram resultado com este run_id deixam latest_test_results.
+
+        Args:
+            objective_id: ID do objetivo.
+            run_id: Rodada que acabou de terminar.
+            test_files: Arquivos executados nesta rodada.
+
+        Returns:
+            True se sucesso, False se falhar.
+        """
+        try:
+            with self._connection("prune_latest_test_results") as conn:
+                conn.executemany(
+                    self._PRUNE_LATEST_SQL,
+                    [(objective_id, test_file, run_id) for test_file in set(test_files)],
+                )
+            return True
+        except sqlite3.Error:
+            return False
+
+    def import_test_runs(self, test_runs: List["TestRun"]) -> int:
+        """Importa execuções produzidas em outra máquina (ex.: shards de CI).
+
+        Execuções já presentes (mesmo id) são ignoradas, o que torna a
+        importação idempotente. latest_test_results só é atualizada por
+        execuções mais recentes que as já registradas.
+
+        Args:
+            test_runs: Execuções a importar.
+
+        Returns:
+            Número de execuções efetivamente inseridas.
+        """
+        inserted = []
+        with self._connection("import_test_runs") as conn:
+            for run in test_runs:
+                params = self._test_run_params(run)
+                cursor = conn.execute(self._IMPORT_TEST_RUN_SQL, params)
+                if cursor.rowcount:
+                    inserted.append(run)
+                    conn.execute(self._UPSERT_LATEST_SQL, params)
+            # Testes que sumiram do arquivo saem da visão de últimos resultados
+            oldest: Dict[Tuple[str, str, str], datetime] = {}
+            for run in inserted:
+                key = (run.objective_id, run.test_file, run.run_id)
+                oldest[key] = min(oldest.get(key, run.run_at), run.run_at)
+            conn.executemany(
+                self._PRUNE_LATEST_SQL + " AND run_at < ?",
+                [key + (run_at.isoformat(),) for key, run_at in oldest.items()],
+            )
+        return len(inserted)
+
+    def get_flaky_tests(self, window: int = 50, min_score: float = 0.0) -> List[FlakyTest]:
+        """Calcula a instabilidade de cada (objetivo, teste) no histórico.
+
+        Considera as `window` execuções mais recentes de cada teste
+        (SKIPPED ignorados), em ordem cronológica e de tentativa, e conta
+        as alternâncias entre PASSED e falha (FAILED/ERROR).
+
+        Args:
+            window: Execuções mais recentes analisadas por teste.
+            min_score: Score mínimo para o teste ser reportado.
+
+        Returns:
+            Testes com pelo menos uma alternância, do mais instável ao menos.
+        """
+        with self._connection("get_flaky_tests") as conn:
             cursor = conn.execute(
-                "SELECT * FROM test_runs WHERE objective_id = ? ORDER BY run_at DESC",
-                (objective_id,)
+                """
+                SELECT objective_id, test_name,
+                       COUNT(*) AS runs,
+                       SUM(outcome = 'F') AS failures,
+                       SUM(flip) AS flips,
+                       SUM(attempt > 1 AND outcome = 'P') AS retry_passes,
+                       CAST(SUM(flip) AS REAL) / (COUNT(*) - 1) AS score
+                FROM (
+                    SELECT objective_id, test_name, attempt, outcome,
+                           COALESCE(LAG(outcome) OVER (
+                               PARTITION BY objective_id, test_name
+                               ORDER BY run_at, attempt
+                           ) != outcome, 0) AS flip
+                    FROM (
+                        SELECT objective_id, test_name, attempt, run_at,
+                               CASE WHEN status = 'PASSED' THEN 'P' ELSE 'F' END AS outcome,
+                               ROW_NUMBER() OVER (
+                                   PARTITION BY objective_id, test_name
+                                   ORDER BY run_at DESC, attempt DESC
+                               ) AS rn
+                        FROM test_runs
+                        WHERE status != 'SKIPPED'
+                    )
+                    WHERE rn <= ?
+                )
+                GROUP BY objective_id, test_name
+                HAVING flips > 0 AND score >= ?
+                ORDER BY score DESC, flips DESC, objective_id, test_name
+            """,
+                (window, min_score),
             )
-            rows = cursor.fetchall()
-            runs = []
-            for row in rows:
-                data = dict(row)
-                runs.append(TestRun(
-                    id=data["id"],
-                    objective_id=data["objective_id"],
-                    test_file=data["test_file"],
-                    test_name=data["test_name"],
-                    status=TestStatus(data["status"]),
-                    error_message=data["error_message"],
-                    duration=data["duration"],
-                    run_at=datetime.fromisoformat(data["run_at"]),
-                ))
-            return runs
+            return [FlakyTest(**dict(row)) for row in cursor]
+
+    # Tendências do histórico (vibe test trends)
+    def get_pass_rate_trend(
+        self,
+        objective_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        window_days: int = 7,
+    ) -> List[PassRateTrend]:
+        """Taxa de sucesso diária por objetivo, lida da rollup diária.
+
+        O custo depende do número de dias e testes, não do tamanho de
+        test_runs. A taxa móvel soma o dia e os `window_days - 1` dias
+        com execuções anteriores a ele (testes SKIPPED não entram no
+        denominador).
+
+        Args:
+            objective_id: Restringe a um objetivo.
+            since: Considera apenas dias a partir desta data.
+            window_days: Dias (com execuções) da taxa móvel.
+        """
+        conditions, params = [], []
+        if objective_id is not None:
+            conditions.append("objective_id = ?")
+            params.append(objective_id)
+        if since is not None:
+            conditions.append("day >= ?")
+            params.append(since.date().isoformat())
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._connection("get_pass_rate_trend") as conn:
+            cursor = conn.execute(
+                f"""
+                SELECT *,
+                       COALESCE(CAST(passed AS REAL) / NULLIF(runs - skipped, 0), 0.0) AS pass_rate,
+                       COALESCE(
+                           CAST(SUM(passed) OVER recent AS REAL)
+                           / NULLIF(SUM(runs - skipped) OVER recent, 0),
+                           0.0
+                       ) AS rolling_pass_rate
+                FROM (
+                    SELECT objective_id, day, SUM(runs) AS runs, SUM(passed) AS passed,
+                           SUM(failed) AS failed, SUM(skipped) AS skipped, SUM(error) AS error,
+                           SUM(duration_total) AS duration_total
+                    FROM test_daily_rollup
+                    {where}
+                    GROUP BY objective_id, day
+                )
+                WINDOW recent AS (
+                    PARTITION BY objective_id ORDER BY day
+                    ROWS BETWEEN ? PRECEDING AND CURRENT ROW
+                )
+                ORDER BY objective_id, day
+            """,
+                (*params, max(window_days, 1) - 1),
+            )
+            return [PassRateTrend(**dict(row)) for row in cursor]
+
+    def get_duration_trends(
+        self,
+        objective_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        last_runs: int = 20,
+    ) -> List[DurationTrend]:
+        """Percentis p50/p95 de duração das últimas `last_runs` execuções de cada teste.
+
+        Percentis por posição (nearest-rank) calculados com funções de
+        janela; execuções SKIPPED são ignoradas.
+        """
+        conditions, params = ["status != 'SKIPPED'", "duration IS NOT NULL"], []
+        if objective_id is not None:
+            conditions.append("objective_id = ?")
+            params.append(objective_id)
+        if since is not None:
+            conditions.append("run_at >= ?")
+            params.append(since.isoformat())
+        with self._connection("get_duration_trends") as conn:
+            cursor = conn.execute(
+                f"""
+                SELECT objective_id, test_file, test_name, n AS runs,
+                       MAX(CASE WHEN pos = MAX(1, (n * 50 + 99) / 100) THEN duration END) AS p50,
+                       MAX(CASE WHEN pos = MAX(1, (n * 95 + 99) / 100) THEN duration END) AS p95,
+                       MAX(duration) AS max,
+                       MAX(CASE WHEN recency = 1 THEN duration END) AS latest
+                FROM (
+                    SELECT *,
+                           ROW_NUMBER() OVER (
+                               PARTITION BY objective_id, test_file, test_name ORDER BY duration
+                           ) AS pos,
+                           COUNT(*) OVER (PARTITION BY objective_id, test_file, test_name) AS n
+                    FROM (
+                        SELECT objective_id, test_file, test_name, duration,
+                               ROW_NUMBER() OVER (
+                                   PARTITION BY objective_id, test_file, test_name
+                                   ORDER BY run_at DESC, rowid DESC
+                               ) AS recency
+                        FROM test_runs
+                        WHERE {' AND '.join(conditions)}
+                    )
+                    WHERE recency <= ?
+                )
+                GROUP BY objective_id, test_file, test_name
+                ORDER BY p95 DESC, objective_id, test_file, test_name
+            """,
+                (*params, last_runs),
+            )
+            return [DurationTrend(**dict(row)) for row in cursor]
+
+    def get_duration_jumps(
+        self,
+        objective_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        baseline_runs: int = JUMP_BASELINE_RUNS,
+        threshold: float = 1.5,
+        min_delta: float = 0.1,
+    ) -> List[DurationJump]:
+        """Execuções cuja duração saltou em relação às anteriores do mesmo teste.
+
+        A referência é a média das `baseline_runs` execuções anteriores
+        (janela deslizante); um salto exige referência com pelo menos
+        `baseline_runs` execuções, duração >= threshold × referência e
+        diferença de pelo menos `min_delta` segundos. A referência pode
+        usar execuções anteriores a `since`.
+
+        Returns:
+            Saltos do maior para o menor (ratio).
+        """
+        conditions, params = ["status != 'SKIPPED'", "duration IS NOT NULL"], []
+        if objective_id is not None:
+            conditions.append("objective_id = ?")
+            params.append(objective_id)
+        with self._connection("get_duration_jumps") as conn:
+            cursor = conn.execute(
+                f"""
+                SELECT objective_id, test_file, test_name, run_id, run_at, duration, baseline,
+                       duration / baseline AS ratio
+                FROM (
+                    SELECT objective_id, test_file, test_name, COALESCE(run_id, '') AS run_id,
+                           run_at, duration,
+                           AVG(duration) OVER previous AS baseline,
+                           COUNT(duration) OVER previous AS baseline_count
+                    FROM test_runs
+                    WHERE {' AND '.join(conditions)}
+                    WINDOW previous AS (
+                        PARTITION BY objective_id, test_file, test_name
+                        ORDER BY run_at, rowid
+                        ROWS BETWEEN ? PRECEDING AND 1 PRECEDING
+                    )
+                )
+                WHERE baseline_count >= ? AND baseline > 0 AND run_at >= ?
+                  AND duration >= baseline * ? AND duration - baseline >= ?
+                ORDER BY ratio DESC, run_at DESC
+            """,
+                (
+                    *params,
+                    baseline_runs,
+                    baseline_runs,
+                    since.isoformat() if since else "",
+                    threshold,
+                    min_delta,
+                ),
+            )
+            return [DurationJump(**dict(row)) for row in cursor]
+
+    def get_test_run_totals(self) -> Dict[str, Dict[str, float]]:
+        """Totais do histórico por objetivo, lidos da rollup diária.
+
+        Returns:
+            {objective_id: {"runs", "PASSED", "FAILED", "SKIPPED", "ERROR", "duration_total"}}.
+        """
+        with self._connection("get_test_run_totals") as conn:
+            cursor = conn.execute("""
+                SELECT objective_id, SUM(runs) AS runs, SUM(passed) AS passed,
+                       SUM(failed) AS failed, SUM(skipped) AS skipped, SUM(error) AS error,
+                       SUM(duration_total) AS duration_total
+                FROM test_daily_rollup
+                GROUP BY objective_id
+                ORDER BY objective_id
+            """)
+            return {
+                row["objective_id"]: {
+                    "runs": row["runs"],
+                    "PASSED": row["passed"],
+                    "FAILED": row["failed"],
+                    "SKIPPED": row["skipped"],
+                    "ERROR": row["error"],
+                    "duration_total": row["duration_total"],
+                }
+                for row in cursor
+            }
+
+    # Regressões de duração
+    def update_duration_regressions(self, test_runs: List["TestRun"]) -> List[DurationRegression]:
+        """Compara as execuções de uma rodada com o histórico e atualiza as regressões.
+
+        Para cada teste, avalia a última tentativa da rodada, se aprovada,
+        contra as REGRESSION_HISTORY_RUNS execuções aprovadas anteriores
+        (busca por intervalo em idx_test_runs_test, sem percorrer o
+        histórico). Uma lentidão significativa grava ou substitui a
+        regressão do teste; uma duração normal a encerra. Execuções que
+        falharam não alteram o estado.
+
+        Returns:
+            Regressões detectadas nesta rodada.
+        """
+        latest: Dict[Tuple[str, str, str], "TestRun"] = {}
+        for run in test_runs:
+            key = (run.objective_id, run.test_file, run.test_name)
+            if key not in latest or run.attempt >= latest[key].attempt:
+                latest[key] = run
+        from src.models import TestStatus
+
+        found: List[DurationRegression] = []
+        recovered: List[Tuple[str, str, str]] = []
+        with self._connection("update_duration_regressions") as conn:
+            for key, run in latest.items():
+                if run.status != TestStatus.PASSED or run.duration is None:
+                    continue
+                history = [
+                    row[0]
+                    for row in conn.execute(
+                        """
+                    SELECT duration FROM test_runs
+                    WHERE objective_id = ? AND test_file = ? AND test_name = ? AND run_at < ?
+                      AND status = 'PASSED' AND duration IS NOT NULL
+                    ORDER BY run_at DESC
+                    LIMIT ?
+                """,
+                        (*key, run.run_at.isoformat(), REGRESSION_HISTORY_RUNS),
+                    )
+                ]
+                slowdown = _slowdown(run.duration, history)
+                if slowdown is None:
+                    recovered.append(key)
+                else:
+                    found.append(
+                        DurationRegression(
+                            *key, run.id, run.run_at.isoformat(), run.duration, *slowdown
+                        )
+                    )
+            conn.executemany(
+                """
+                DELETE FROM duration_regressions
+                WHERE objective_id = ? AND test_file = ? AND test_name = ?
+            """,
+                recovered,
+            )
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO duration_regressions (
+                    objective_id, test_file, test_name, test_run_id, run_at,
+                    duration, baseline_median, baseline_mad, score
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+                [tuple(asdict(item).values()) for item in found],
+            )
+        return found
+
+    def get_duration_regressions(
+        self, objective_ids: Optional[Collection[str]] = None
+    ) -> Dict[str, List[DurationRegression]]:
+        """Regressões de duração em aberto, agrupadas por objetivo (da maior para a menor)."""
+        with self._connection("get_duration_regressions") as conn:
+            cursor = conn.execute("""
+                SELECT * FROM duration_regressions
+                ORDER BY objective_id, score DESC, test_file, test_name
+            """)
+            regressions: Dict[str, List[DurationRegression]] = {}
+            for row in cursor:
+                if objective_ids is None or row["objective_id"] in objective_ids:
+                    regressions.setdefault(row["objective_id"], []).append(
+                        DurationRegression(**dict(row))
+                    )
+            return regressions
+
+    def get_file_durations(self) -> Dict[Tuple[str, str], float]:
+        """Duração estimada de cada arquivo de teste por rodada.
+
+        Soma, por arquivo, a duração média de cada teste nos últimos
+        FILE_DURATION_WINDOW_DAYS dias, lida de test_daily_rollup (sem
+        percorrer test_runs). A janela termina no dia mais recente da
+        rollup, e não na data atual, para que projetos parados há algum
+        tempo mantenham a estimativa.
+
+        Returns:
+            Dicionário {(objective_id, test_file): segundos}.
+        """
+        with self._connection("get_file_durations") as conn:
+            cursor = conn.execute(
+                f"""
+                SELECT objective_id, test_file, SUM(test_duration) AS duration
+                FROM ({self._RECENT_TEST_DURATIONS_SQL})
+                GROUP BY objective_id, test_file
+            """,
+                (f"-{FILE_DURATION_WINDOW_DAYS - 1} days",),
+            )
+            return {(row["objective_id"], row["test_file"]): row["duration"] for row in cursor}
+
+    def get_objective_durations(self) -> Dict[str, float]:
+        """Duração estimada da rodada de cada objetivo.
+
+        Mesma estimativa de get_file_durations, somada por objetivo no
+        próprio SQLite.
+
+        Returns:
+            Dicionário {objective_id: segundos}.
+        """
+        with self._connection("get_objective_durations") as conn:
+            cursor = conn.execute(
+                f"""
+                SELECT objective_id, SUM(test_duration) AS duration
+                FROM ({self._RECENT_TEST_DURATIONS_SQL})
+                GROUP BY objective_id
+            """,
+                (f"-{FILE_DURATION_WINDOW_DAYS - 1} days",),
+            )
+            return {row["objective_id"]: row["duration"] for row in cursor}
+
+    def _row_to_test_run(self, row: sqlite3.Row) -> "TestRun":
+        """Converte uma linha de test_runs/latest_test_results em TestRun.
+
+        Não lê o armazenamento de blobs: execuções com output_ref voltam com
+        error_message None. Use load_error_previews() para exibir a prévia
+        ou get_test_output() para o texto completo.
+        """
+        from src.models import TestRun, TestStatus
+        return TestRun(
+            id=row["id"],
+            run_id=row["run_id"] or "",
+            objective_id=row["objective_id"],
+            test_file=row["test_file"],
+            test_name=row["test_name"],
+            status=TestStatus(row["status"]),
+            error_message=row["error_message"],
+            duration=row["duration"],
+            run_at=datetime.fromisoformat(row["run_at"]),
+            attempt=row["attempt"],
+            output_ref=row["output_ref"],
+        )
+
+    def load_error_previews(self, test_runs: List["TestRun"]) -> None:
+        """Preenche error_message com a prévia (início e fim) do blob.
+
+        Só as execuções com output_ref e sem mensagem carregada são
+        alteradas; cada blob é lido uma única vez mesmo que várias execuções
+        o referenciem.
+        """
+        texts: Dict[str, Optional[str]] = {}
+        for run in test_runs:
+            ref = run.output_ref
+            if not ref or run.error_message is not None:
+                continue
+            if ref not in texts:
+                texts[ref] = self.blobs.get(ref)
+            text = texts[ref]
+            if text is None:
+                run.error_message = f"[saída {ref[:12]} indisponível no armazenamento de blobs]"
+            else:
+                run.error_message = truncate_middle(
+                    text, DEFAULT_PREVIEW_CHARS, f"texto completo: vibe test log {run.id[:8]}"
+                )
+
+    def get_test_run(self, test_run_id: str) -> Optional["TestRun"]:
+        """Recupera uma execução de teste pelo ID."""
+        with self._connection("get_test_run") as conn:
+            row = conn.execute("SELECT * FROM test_runs WHERE id = ?", (test_run_id,)).fetchone()
+            return self._row_to_test_run(row) if row else None
+
+    def resolve_test_run_id(self, prefix: str, max_candidates: int = 5) -> Optional[str]:
+        """Resolve um ID completo ou prefixo de execução de teste.
+
+        Raises:
+            AmbiguousTestRunIdError: Se o prefixo corresponder a mais de uma
+                execução (com até `max_candidates` candidatos).
+        """
+        candidates = self._find_ids("test_runs", prefix, max_candidates)
+        if not candidates:
+            return None
+        if len(candidates) == 1 or candidates[0] == prefix:
+            return candidates[0]
+        raise AmbiguousTestRunIdError(prefix, candidates)
+
+    def get_test_output(self, test_run: "TestRun") -> Optional[str]:
+        """Texto completo do erro de uma execução, lido do blob sob demanda.
+
+        Returns:
+            O texto do blob; a mensagem gravada na linha (bancos antigos ou
+            blob indisponível); ou None se a execução não tiver saída.
+        """
+        if test_run.output_ref:
+            text = self.blobs.get(test_run.output_ref)
+            if text is not None:
+                return text
+        return test_run.error_message
+
+    def get_test_runs(self, objective_id: str, run_id: Optional[str] = None) -> List["TestRun"]:
+        """Recupera as execuções de teste de um objetivo.
+
+        Args:
+            objective_id: ID do objetivo.
+            run_id: Se informado, retorna apenas as execuções dessa rodada.
+
+        Returns:
+            Execuções ordenadas da mais recente para a mais antiga.
+        """
+        with self._connection("get_test_runs") as conn:
+            if run_id is None:
+                cursor = conn.execute(
+                    "SELECT * FROM test_runs WHERE objective_id = ? ORDER BY run_at DESC",
+                    (objective_id,),
+                )
+            else:
+                cursor = conn.execute(
+                    "SELECT * FROM test_runs WHERE objective_id = ? AND run_id = ? "
+                    "ORDER BY run_at DESC",
+                    (objective_id, run_id),
+                )
+            return [self._row_to_test_run(row) for row in cursor.fetchall()]
 
     def get_latest_test_run(self, objective_id: str) -> Optional["TestRun"]:
         """Recupera a execução mais recente de um objetivo."""
-        runs = self.get_test_runs(objective_id)
-        return runs[0] if runs else None
+        with self._connection("get_latest_test_run") as conn:
+            row = conn.execute(
+                "SELECT * FROM test_runs WHERE objective_id = ? ORDER BY run_at DESC LIMIT 1",
+                (objective_id,),
+            ).fetchone()
+            return self._row_to_test_run(row) if row else None
+
+    def get_latest_test_results(self, objective_id: str) -> List["TestRun"]:
+        """Recupera o último resultado de cada teste de um objetivo.
+
+        Lê a tabela latest_test_results (um registro por teste), sem
+        percorrer o histórico.
+
+        Returns:
+            Execuções ordenadas por arquivo e nome do teste.
+        """
+        with self._connection("get_latest_test_results") as conn:
+            cursor = conn.execute(
+                "SELECT * FROM latest_test_results WHERE objective_id = ? "
+                "ORDER BY test_file, test_name",
+                (objective_id,),
+            )
+            return [self._row_to_test_run(row) for row in cursor.fetchall()]
+
+    def count_latest_results_by_file(self, objective_id: str) -> Dict[str, int]:
+        """Quantidade de testes no último resultado de cada arquivo do objetivo.
+
+        Agrega pela chave primária de latest_test_results, sem carregar as
+        execuções.
+        """
+        with self._connection("count_latest_results_by_file") as conn:
+            cursor = conn.execute(
+                "SELECT test_file, COUNT(*) FROM latest_test_results "
+                "WHERE objective_id = ? GROUP BY test_file",
+                (objective_id,),
+            )
+            return {test_file: count for test_file, count in cursor}
 
     # Métodos para test_summary
     def save_test_summary(self, summary: "TestSummary") -> bool:
         """Salva um sumário de testes no banco."""
         try:
-            with self._connection() as conn:
-                conn.execute("""
+            with self._connection("save_test_summary") as conn:
+                conn.execute(
+                    """
                     INSERT INTO test_summary (
                         id, objective_id, total_tests, passed,
                         failed, skipped, error, last_run
                     ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    summary.id,
-                    summary.objective_id,
-                    summary.total_tests,
-                    summary.passed,
-                    summary.failed,
-                    summary.skipped,
-                    summary.error,
-                    summary.last_run.isoformat(),
-                ))
+                """,
+                    (
+                        summary.id,
+                        summary.objective_id,
+                        summary.total_tests,
+                        summary.passed,
+                        summary.failed,
+                        summary.skipped,
+                        summary.error,
+                        summary.last_run.isoformat(),
+                    ),
+                )
             return True
         except sqlite3.Error:
             return False
+        finally:
+            # O sumário mais recente passa a depender do last_run gravado
+            self._cache.discard(("summary", summary.objective_id))
 
     def get_test_summary(self, objective_id: str) -> Optional["TestSummary"]:
         """Recupera o sumário de testes de um objetivo."""
-        from src.models import TestSummary
-        with self._connection() as conn:
+        cached = self._cache.get(("summary", objective_id))
+        if cached is not _MISSING:
+            return cast(Optional["TestSummary"], cached)
+        with self._connection("get_test_summary") as conn:
             cursor = conn.execute(
                 "SELECT * FROM test_summary WHERE objective_id = ? ORDER BY last_run DESC LIMIT 1",
                 (objective_id,)
             )
             row = cursor.fetchone()
-            if row is None:
-                return None
-            data = dict(row)
-            return TestSummary(
-                id=data["id"],
-                objective_id=data["objective_id"],
-                total_tests=data["total_tests"],
-                passed=data["passed"],
-                failed=data["failed"],
-                skipped=data["skipped"],
-                error=data["error"],
-                last_run=datetime.fromisoformat(data["last_run"]),
-            )
+        summary = self._row_to_test_summary(row) if row is not None else None
+        self._cache.put(("summary", objective_id), summary)
+        return summary
+
+    def get_test_summaries(self) -> Dict[str, "TestSummary"]:
+        """Recupera o sumário mais recente de cada objetivo em uma consulta.
+
+        Returns:
+            Dicionário {objective_id: TestSummary}.
+        """
+        with self._connection("get_test_summaries") as conn:
+            cursor = conn.execute("""
+                SELECT * FROM (
+                    SELECT *, ROW_NUMBER() OVER (
+                        PARTITION BY objective_id ORDER BY last_run DESC
+                    ) AS rn
+                    FROM test_summary
+                ) WHERE rn = 1
+            """)
+            summaries = {row["objective_id"]: self._row_to_test_summary(row) for row in cursor}
+        for objective_id, summary in summaries.items():
+            self._cache.put(("summary", objective_id), summary)
+        return summaries
+
+    def _row_to_test_summary(self, row: sqlite3.Row) -> "TestSummary":
+        """Converte uma linha de test_summary em TestSummary."""
+        from src.models import TestSummary
+        return TestSummary(
+            id=row["id"],
+            objective_id=row["objective_id"],
+            total_tests=row["total_tests"],
+            passed=row["passed"],
+            failed=row["failed"],
+            skipped=row["skipped"],
+            error=row["error"],
+            last_run=datetime.fromisoformat(row["last_run"]),
+        )
 
     def update_test_summary(self, objective_id: str, summary: "TestSummary") -> bool:
         """Atualiza um sumário existente."""
         try:
-            with self._connection() as conn:
+            with self._connection("update_test_summary") as conn:
                 conn.execute("""
                     UPDATE test_summary SET
                         total_tests = ?,
@@ -361,3 +2060,416 @@ class Database:
             return True
         except sqlite3.Error:
             return False
+        finally:
+            self._cache.discard(("summary", objective_id))
+
+    def store_test_summary(self, summary: "TestSummary") -> bool:
+        """Salva o sumário do objetivo, atualizando o existente se houver."""
+        if self.get_test_summary(summary.objective_id):
+            return self.update_test_summary(summary.objective_id, summary)
+        return self.save_test_summary(summary)
+
+    # Cobertura por objetivo
+    def store_objective_coverage(
+        self, objective_id: str, coverage: Mapping[str, Iterable[int]]
+    ) -> None:
+        """Substitui a cobertura registrada de um objetivo.
+
+        Args:
+            objective_id: ID do objetivo.
+            coverage: Linhas executadas por arquivo (caminho relativo ao projeto).
+        """
+        with self._connection("store_objective_coverage") as conn:
+            conn.execute("DELETE FROM objective_coverage WHERE objective_id = ?", (objective_id,))
+            conn.executemany(
+                "INSERT INTO objective_coverage (objective_id, source_file, lines) "
+                "VALUES (?, ?, ?)",
+                (
+                    (objective_id, source_file, _encode_lines(lines))
+                    for source_file, lines in coverage.items()
+                ),
+            )
+
+    def get_objective_coverage(self, objective_id: str) -> Dict[str, List[Tuple[int, int]]]:
+        """Cobertura de um objetivo: {arquivo: [(início, fim), ...]}."""
+        with self._connection("get_objective_coverage") as conn:
+            cursor = conn.execute(
+                "SELECT source_file, lines FROM objective_coverage WHERE objective_id = ?",
+                (objective_id,),
+            )
+            return {row["source_file"]: _decode_lines(row["lines"]) for row in cursor}
+
+    def get_covered_objectives(self) -> Set[str]:
+        """IDs dos objetivos com cobertura registrada."""
+        with self._connection("get_covered_objectives") as conn:
+            cursor = conn.execute("SELECT DISTINCT objective_id FROM objective_coverage")
+            return {row["objective_id"] for row in cursor}
+
+    def get_objectives_covering(self, changes: Dict[str, Optional[Set[int]]]) -> Set[str]:
+        """Objetivos cuja cobertura intersecta as linhas alteradas.
+
+        Args:
+            changes: Linhas alteradas por arquivo; None significa o arquivo
+                inteiro (ex.: arquivo removido ou renomeado).
+
+        Returns:
+            IDs dos objetivos afetados.
+        """
+        affected: Set[str] = set()
+        files = list(changes)
+        sorted_changes = {
+            name: sorted(lines) if lines is not None else None for name, lines in changes.items()
+        }
+        with self._connection("get_objectives_covering") as conn:
+            # Respeita o limite de parâmetros do SQLite
+            for start in range(0, len(files), 500):
+                chunk = files[start : start + 500]
+                cursor = conn.execute(
+                    "SELECT objective_id, source_file, lines FROM objective_coverage "
+                    f"WHERE source_file IN ({', '.join('?' * len(chunk))})",
+                    chunk,
+                )
+                for row in cursor:
+                    if row["objective_id"] in affected:
+                        continue
+                    changed = sorted_changes[row["source_file"]]
+                    if changed is None or any(
+                        _has_line_in(changed, first, last)
+                        for first, last in _decode_lines(row["lines"])
+                    ):
+                        affected.add(row["objective_id"])
+        return affected
+
+    # Cache de validação
+    def get_validation_results(
+        self, rule: str, subjects: Optional[Iterable[str]] = None
+    ) -> Dict[str, CachedValidation]:
+        """Recupera os resultados em cache de uma regra.
+
+        Args:
+            rule: Nome da regra.
+            subjects: Restringe a consulta a estes sujeitos (opcional).
+
+        Returns:
+            Dicionário {sujeito: CachedValidation}.
+        """
+        query = (
+            "SELECT subject, fingerprint, problems, valid_until FROM validation_cache "
+            "WHERE rule = ?"
+        )
+        params: List[str] = [rule]
+        if subjects is not None:
+            params.extend(subjects)
+            query += f" AND subject IN ({', '.join('?' * (len(params) - 1)) or 'NULL'})"
+        with self._connection("get_validation_results") as conn:
+            cursor = conn.execute(query, params)
+            return {
+                row["subject"]: CachedValidation(
+                    subject=row["subject"],
+                    fingerprint=row["fingerprint"],
+                    problems=json.loads(row["problems"]),
+                    valid_until=(
+                        datetime.fromisoformat(row["valid_until"]) if row["valid_until"] else None
+                    ),
+                )
+                for row in cursor
+            }
+
+    def save_validation_results(
+        self, rule: str, results: Iterable[CachedValidation], stale_subjects: Iterable[str] = ()
+    ) -> None:
+        """Grava resultados de uma regra e remove sujeitos que não existem mais."""
+        with self._connection("save_validation_results") as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO validation_cache "
+                "(rule, subject, fingerprint, problems, valid_until) VALUES (?, ?, ?, ?, ?)",
+                (
+                    (
+                        rule,
+                        result.subject,
+                        result.fingerprint,
+                        json.dumps(result.problems, ensure_ascii=False),
+                        result.valid_until.isoformat() if result.valid_until else None,
+                    )
+                    for result in results
+                ),
+            )
+            conn.executemany(
+                "DELETE FROM validation_cache WHERE rule = ? AND subject = ?",
+                ((rule, subject) for subject in stale_subjects),
+            )
+
+    # Índice de workspace
+    def register_project(self, name: str, root: Path) -> bool:
+        """Registra um projeto no workspace.
+
+        Returns:
+            True se registrado, False se o nome ou a raiz já existirem.
+        """
+        try:
+            with self._connection("register_project") as conn:
+                conn.execute(
+                    "INSERT INTO workspace_projects (name, root, added_at) VALUES (?, ?, ?)",
+                    (name, str(root), datetime.now().isoformat()),
+                )
+            return True
+        except sqlite3.IntegrityError:
+            return False
+
+    def unregister_project(self, name: str) -> bool:
+        """Remove um projeto (e suas execuções) do workspace."""
+        with self._connection("unregister_project") as conn:
+            cursor = conn.execute("DELETE FROM workspace_projects WHERE name = ?", (name,))
+            conn.execute("DELETE FROM workspace_runs WHERE project = ?", (name,))
+            return cursor.rowcount > 0
+
+    def list_projects(self) -> List[WorkspaceProject]:
+        """Lista os projetos registrados, em ordem de nome."""
+        with self._connection("list_projects") as conn:
+            cursor = conn.execute(
+                "SELECT name, root, added_at FROM workspace_projects ORDER BY name"
+            )
+            return [
+                WorkspaceProject(row["name"], row["root"], datetime.fromisoformat(row["added_at"]))
+                for row in cursor
+            ]
+
+    def record_workspace_runs(self, runs: Iterable[Tuple[str, str, int, float, str]]) -> None:
+        """Grava a última execução de cada (projeto, comando).
+
+        Args:
+            runs: Tuplas (projeto, comando, exit code, duração, saída).
+        """
+        finished_at = datetime.now().isoformat()
+        with self._connection("record_workspace_runs") as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO workspace_runs "
+                "(project, command, exit_code, duration, finished_at, output) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (project, command, exit_code, duration, finished_at, output)
+                    for project, command, exit_code, duration, output in runs
+                ),
+            )
+
+    def get_workspace_runs(self) -> Dict[Tuple[str, str], int]:
+        """Exit code da última execução de cada (projeto, comando)."""
+        with self._connection("get_workspace_runs") as conn:
+            cursor = conn.execute("SELECT project, command, exit_code FROM workspace_runs")
+            return {(row["project"], row["command"]): row["exit_code"] for row in cursor}
+
+    def get_projects_health(self, shards: Iterable[Tuple[str, Path]]) -> List[ProjectHealth]:
+        """Consulta a situação dos objetivos de vários projetos de uma vez.
+
+        Os bancos dos projetos (shards) são anexados com ATTACH em lotes
+        do tamanho máximo permitido pelo SQLite, e cada lote é lido com
+        uma única consulta UNION ALL. Shards inexistentes são ignorados.
+
+        Args:
+            shards: Pares (nome do projeto, caminho do banco do projeto).
+
+        Returns:
+            Situação de cada projeto com banco existente, na ordem recebida.
+        """
+        existing = [(name, path) for name, path in shards if path.exists()]
+        health: List[ProjectHealth] = []
+        with self._connection("get_projects_health") as conn:
+            chunk_size = max(1, conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED))
+            for start in range(0, len(existing), chunk_size):
+                chunk = existing[start : start + chunk_size]
+                selects = []
+                attached = 0
+                try:
+                    for index, (_, path) in enumerate(chunk):
+                        conn.execute(f"ATTACH DATABASE ? AS shard{index}", (str(path),))
+                        attached += 1
+                        selects.append(f"""
+                            SELECT ? AS project,
+                                   COUNT(*) AS objectives,
+                                   COUNT(s.objective_id) AS tested,
+                                   COALESCE(
+                                       SUM(s.total_tests > 0 AND s.failed + s.error = 0), 0
+                                   ) AS passing,
+                                   COALESCE(SUM(s.failed + s.error > 0), 0) AS failing
+                            FROM shard{index}.objectives o
+                            LEFT JOIN (
+                                SELECT objective_id, total_tests, failed, error, MAX(last_run)
+                                FROM shard{index}.test_summary
+                                GROUP BY objective_id
+                            ) s ON s.objective_id = o.id
+                        """)
+                    cursor = conn.execute(" UNION ALL ".join(selects), [name for name, _ in chunk])
+                    rows = {row["project"]: ProjectHealth(**dict(row)) for row in cursor}
+                    health.extend(rows[name] for name, _ in chunk)
+                finally:
+                    for index in range(attached):
+                        conn.execute(f"DETACH DATABASE shard{index}")
+        return health
+
+    # Configurações
+    def get_setting(self, key: str) -> Optional[str]:
+        """Recupera o valor de uma configuração persistente."""
+        with self._connection("get_setting") as conn:
+            row = conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+            return row["value"] if row else None
+
+    def set_setting(self, key: str, value: Optional[str]) -> None:
+        """Grava (ou remove, se value for None) uma configuração persistente."""
+        with self._connection("set_setting") as conn:
+            if value is None:
+                conn.execute("DELETE FROM settings WHERE key = ?", (key,))
+            else:
+                conn.execute(
+                    "INSERT INTO settings (key, value) VALUES (?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                    (key, value),
+                )
+
+    # Retenção e compactação de test_runs
+    def compact_test_runs(self, keep_last: int) -> CompactionReport:
+        """Remove execuções antigas do histórico detalhado.
+
+        Para cada teste (objective_id, test_file, test_name) mantém as
+        `keep_last` execuções mais recentes. Execuções mais antigas são
+        removidas, exceto eventos relevantes para auditoria, que são
+        sempre preservados:
+
+        - a primeira execução registrada do teste;
+        - execuções cujo status difere da execução anterior (transições).
+
+        Os agregados diários continuam em test_daily_rollup, mantida pelo
+        trigger de inserção; a compactação não a altera.
+
+        Erros ainda gravados na própria linha (bancos anteriores ao
+        armazenamento de blobs) são movidos para blobs, e blobs que não são
+        mais referenciados por nenhuma execução são removidos.
+
+        Args:
+            keep_last: Quantidade de execuções recentes mantidas por teste.
+
+        Returns:
+            CompactionReport com as quantidades processadas.
+        """
+        if keep_last < 1:
+            raise ValueError("keep_last deve ser pelo menos 1")
+        report = CompactionReport(size_before=self.file_size())
+        with self._connection("compact_test_runs") as conn:
+            conn.execute("DROP TABLE IF EXISTS temp.compact_candidates")
+            conn.execute(
+                """
+                CREATE TEMP TABLE compact_candidates AS
+                SELECT rid, (prev_status IS NULL OR prev_status != status) AS audit
+                FROM (
+                    SELECT rowid AS rid, status,
+                           ROW_NUMBER() OVER (
+                               PARTITION BY objective_id, test_file, test_name
+                               ORDER BY run_at DESC, rowid DESC
+                           ) AS rn,
+                           LAG(status) OVER (
+                               PARTITION BY objective_id, test_file, test_name
+                               ORDER BY run_at, rowid
+                           ) AS prev_status
+                    FROM test_runs
+                )
+                WHERE rn > ?
+            """,
+                (keep_last,),
+            )
+            report.audit_rows_kept = conn.execute(
+                "SELECT COUNT(*) FROM temp.compact_candidates WHERE audit"
+            ).fetchone()[0]
+
+            cursor = conn.execute("""
+                DELETE FROM test_runs WHERE rowid IN (
+                    SELECT rid FROM temp.compact_candidates WHERE NOT audit
+                )
+            """)
+            report.rows_deleted = cursor.rowcount
+            conn.execute("DROP TABLE temp.compact_candidates")
+            report.errors_externalized = self._externalize_errors(conn)
+            live = {row[0] for row in conn.execute("""
+                    SELECT output_ref FROM test_runs WHERE output_ref IS NOT NULL
+                    UNION
+                    SELECT output_ref FROM latest_test_results WHERE output_ref IS NOT NULL
+                """)}
+        gc = self.blobs.gc(live)
+        report.blobs_removed = gc.removed
+        report.blob_bytes_freed = gc.bytes_freed
+        report.size_after = self.file_size()
+        return report
+
+    def _externalize_errors(self, conn: sqlite3.Connection, batch_size: int = 500) -> int:
+        """Move para blobs os erros gravados inline, em lotes de `batch_size` linhas.
+
+        Returns:
+            Quantidade de linhas de test_runs alteradas.
+        """
+        moved = 0
+        for table in ("test_runs", "latest_test_results"):
+            last = 0
+            while True:
+                rows = conn.execute(
+                    f"""
+                    SELECT rowid AS rid, error_message FROM {table}
+                    WHERE rowid > ? AND error_message IS NOT NULL AND output_ref IS NULL
+                    ORDER BY rowid LIMIT ?
+                """,
+                    (last, batch_size),
+                ).fetchall()
+                if not rows:
+                    break
+                conn.executemany(
+                    f"UPDATE {table} SET output_ref = ?, error_message = NULL WHERE rowid = ?",
+                    [(self.blobs.put(row["error_message"]), row["rid"]) for row in rows],
+                )
+                if table == "test_runs":
+                    moved += len(rows)
+                last = rows[-1]["rid"]
+        return moved
+
+    def vacuum(self, incremental: bool = False) -> None:
+        """Devolve ao sistema de arquivos o espaço livre do banco.
+
+        Args:
+            incremental: Se True, usa PRAGMA incremental_vacuum. Na primeira
+                vez o banco é convertido para auto_vacuum=INCREMENTAL, o que
+                exige um VACUUM completo.
+        """
+        with self._connection("vacuum") as conn:
+            if not incremental:
+                conn.execute("VACUUM")
+                return
+            mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+            if mode != 2:
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.execute("VACUUM")
+            else:
+                # O pragma libera uma página por passo da instrução, e
+                # execute() (mesmo com fetchall) dá um único passo porque
+                # ele não retorna colunas; executescript roda até o fim
+                conn.executescript("PRAGMA incremental_vacuum;")
+
+    def apply_retention_policy(self) -> Optional[CompactionReport]:
+        """Aplica a política automática de retenção, se configurada.
+
+        Usa a configuração `retention.keep_last` e libera espaço com
+        vacuum incremental para não bloquear o banco por muito tempo.
+
+        Returns:
+            CompactionReport se a política estiver ativa, None caso contrário.
+        """
+        keep_last = self.get_setting(RETENTION_KEEP_LAST_KEY)
+        if not keep_last:
+            return None
+        report = self.compact_test_runs(int(keep_last))
+        if report.rows_deleted:
+            self.vacuum(incremental=True)
+            report.size_after = self.file_size()
+        return report
+
+    def file_size(self) -> int:
+        """Tamanho em bytes do arquivo do banco."""
+        try:
+            return Path(self.db_path).stat().st_size
+        except OSError:
+            return 0
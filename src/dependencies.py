@@ -0,0 +1,169 @@
+"""Grafo de dependências entre objetivos e cálculo do status BLOQUEADO."""
+
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.database import Database
+from src.models import Objective, ObjectiveStatus
+
+# Status de um objetivo que impedem o avanço dos seus dependentes
+UNSATISFIED_STATUSES = (ObjectiveStatus.BLOQUEADO, ObjectiveStatus.FALHOU)
+
+# Status que passam a BLOQUEADO quando uma dependência não está satisfeita
+BLOCKABLE_STATUSES = (ObjectiveStatus.DEFINIDO, ObjectiveStatus.ATIVO)
+
+
+class DependencyCycleError(ValueError):
+    """As dependências entre objetivos formam um ciclo."""
+
+    def __init__(self, cycle: List[str]) -> None:
+        self.cycle = cycle
+        super().__init__("Ciclo de dependências: " + " → ".join(oid[:8] for oid in cycle))
+
+
+class UnknownDependencyError(ValueError):
+    """Uma dependência aponta para um objetivo inexistente."""
+
+    def __init__(self, objective_id: str, depends_on: str) -> None:
+        self.objective_id = objective_id
+        self.depends_on = depends_on
+        super().__init__(f"Dependência inexistente: {objective_id[:8]} → {depends_on[:8]}")
+
+
+def find_cycle(graph: Dict[str, List[str]]) -> Optional[List[str]]:
+    """Procura um ciclo no grafo {objetivo: [dependências]}.
+
+    Returns:
+        Caminho do ciclo (o primeiro nó se repete no fim) ou None.
+    """
+    visiting, done = set(), set()
+    for root in sorted(graph):
+        if root in done:
+            continue
+        path: List[str] = [root]
+        stack = [iter(graph.get(root, []))]
+        visiting.add(root)
+        while stack:
+            node = next(stack[-1], None)
+            if node is None:
+                stack.pop()
+                finished = path.pop()
+                visiting.discard(finished)
+                done.add(finished)
+            elif node in visiting:
+                return path[path.index(node) :] + [node]
+            elif node not in done:
+                visiting.add(node)
+                path.append(node)
+                stack.append(iter(graph.get(node, [])))
+    return None
+
+
+def topological_levels(ids: Iterable[str], graph: Dict[str, List[str]]) -> List[List[str]]:
+    """Agrupa objetivos em níveis: cada nível depende apenas dos anteriores.
+
+    Objetivos de um mesmo nível são independentes entre si e podem rodar
+    em paralelo. Dependências fora de `ids` são ignoradas.
+
+    Raises:
+        DependencyCycleError: Se houver ciclo entre os objetivos.
+    """
+    nodes = list(dict.fromkeys(ids))
+    selected = set(nodes)
+    pending = {oid: {dep for dep in graph.get(oid, []) if dep in selected} for oid in nodes}
+    dependents: Dict[str, List[str]] = {}
+    for oid, deps in pending.items():
+        for dep in deps:
+            dependents.setdefault(dep, []).append(oid)
+
+    levels: List[List[str]] = []
+    current = [oid for oid in nodes if not pending[oid]]
+    placed = 0
+    while current:
+        levels.append(current)
+        placed += len(current)
+        following = []
+        for oid in current:
+            for dependent in dependents.get(oid, []):
+                pending[dependent].discard(oid)
+                if not pending[dependent]:
+                    following.append(dependent)
+        ready = set(following)
+        current = [oid for oid in nodes if oid in ready]
+    if placed < len(nodes):
+        remaining = {oid: sorted(deps) for oid, deps in pending.items() if deps}
+        raise DependencyCycleError(find_cycle(remaining) or sorted(remaining))
+    return levels
+
+
+def add_dependency(db: Database, objective_id: str, depends_on: str) -> bool:
+    """Registra uma dependência, recusando ciclos, e atualiza o bloqueio.
+
+    Returns:
+        True se a aresta foi criada, False se já existia.
+
+    Raises:
+        DependencyCycleError: Se a aresta fechar um ciclo.
+    """
+    if objective_id == depends_on or db.depends_on(depends_on, objective_id):
+        graph = db.get_dependency_graph()
+        graph.setdefault(objective_id, []).append(depends_on)
+        raise DependencyCycleError(find_cycle(graph) or [objective_id, objective_id])
+    added = db.add_dependency(objective_id, depends_on)
+    update_blocking(db, [objective_id])
+    return added
+
+
+def remove_dependency(db: Database, objective_id: str, depends_on: str) -> bool:
+    """Remove uma dependência e atualiza o bloqueio do objetivo."""
+    removed = db.remove_dependency(objective_id, depends_on)
+    update_blocking(db, [objective_id])
+    return removed
+
+
+def unsatisfied_dependencies(db: Database, objective: Objective) -> List[Objective]:
+    """Dependências que impedem o objetivo de avançar.
+
+    Uma dependência não está satisfeita se está BLOQUEADO/FALHOU ou se
+    sua última execução de testes falhou.
+    """
+    unsatisfied = []
+    for dep_id in objective.dependencias:
+        dep = db.get_objective(dep_id)
+        if dep is None:
+            continue
+        summary = db.get_test_summary(dep_id)
+        if dep.status in UNSATISFIED_STATUSES or (summary is not None and not summary.is_passing()):
+            unsatisfied.append(dep)
+    return unsatisfied
+
+
+def update_blocking(
+    db: Database, objective_ids: Iterable[str]
+) -> List[Tuple[str, ObjectiveStatus]]:
+    """Recalcula o status BLOQUEADO a partir dos objetivos informados.
+
+    O cálculo é incremental: só os objetivos informados são avaliados e,
+    quando um deles muda de status, seus dependentes entram na fila.
+    Objetivos desbloqueados voltam para DEFINIDO.
+
+    Returns:
+        Mudanças aplicadas, como (objective_id, novo status).
+    """
+    changes: List[Tuple[str, ObjectiveStatus]] = []
+    queue = deque(objective_ids)
+    while queue:
+        objective = db.get_objective(queue.popleft())
+        if objective is None:
+            continue
+        blocked = bool(unsatisfied_dependencies(db, objective))
+        if blocked and objective.status in BLOCKABLE_STATUSES:
+            new_status = ObjectiveStatus.BLOQUEADO
+        elif not blocked and objective.status == ObjectiveStatus.BLOQUEADO:
+            new_status = ObjectiveStatus.DEFINIDO
+        else:
+            continue
+        db.set_objective_status(objective.id, new_status)
+        changes.append((objective.id, new_status))
+        queue.extend(db.get_dependents(objective.id))
+    return changes
@@ -0,0 +1,129 @@
+"""Análise de impacto: objetivos afetados por alterações no código."""
+
+import re
+import subprocess
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+from src.database import Database
+from src.validator import affected_objectives
+
+# Cabeçalho de hunk do diff unificado: @@ -início[,qtd] +início[,qtd] @@
+_HUNK_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+# Linhas alteradas por arquivo; None significa o arquivo inteiro
+ChangedLines = Dict[str, Optional[Set[int]]]
+
+
+def parse_diff(diff: str) -> ChangedLines:
+    """Extrai as linhas alteradas de um diff unificado (`git diff -U0`).
+
+    Cada hunk marca as linhas removidas (numeração antiga) e as
+    adicionadas (numeração nova) do arquivo; inserções puras marcam as
+    linhas vizinhas. Arquivos removidos, renomeados (caminho antigo) ou
+    binários contam como alterados por inteiro.
+    """
+    changes: ChangedLines = {}
+    old_path: Optional[str] = None
+    new_path: Optional[str] = None
+
+    def mark(path: Optional[str], lines: range) -> None:
+        if path is None:
+            return
+        marked = changes.setdefault(path, set())
+        if marked is not None:
+            marked.update(lines)
+
+    for line in diff.splitlines():
+        if line.startswith("diff --git "):
+            old_path = new_path = None
+        elif line.startswith("--- "):
+            old_path = None if line == "--- /dev/null" else line[6:]
+        elif line.startswith("+++ "):
+            new_path = None if line == "+++ /dev/null" else line[6:]
+            if old_path is not None and old_path != new_path:
+                changes[old_path] = None
+        else:
+            match = _HUNK_RE.match(line)
+            if not match:
+                continue
+            old_start, old_count, new_start, new_count = (
+                int(group) if group is not None else 1 for group in match.groups()
+            )
+            if old_count:
+                mark(old_path, range(old_start, old_start + old_count))
+            else:
+                mark(old_path, range(old_start, old_start + 2))
+            if new_count:
+                mark(new_path, range(new_start, new_start + new_count))
+    return changes
+
+
+def changed_lines(ref: str, cwd: Path = Path(".")) -> ChangedLines:
+    """Linhas alteradas entre `ref` e a árvore de trabalho (relativas a cwd).
+
+    Raises:
+        OSError: Se o git não estiver disponível.
+        subprocess.CalledProcessError: Se a referência for inválida.
+    """
+    result = subprocess.run(
+        [
+            "git",
+            "-c",
+            "core.quotePath=false",
+            "diff",
+            "-U0",
+            "-M",
+            "--no-color",
+            "--no-ext-diff",
+            "--relative",
+            ref,
+        ],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    changes = parse_diff(result.stdout)
+    # Binários não têm "---"/"+++": marcar pelo nome listado pelo git
+    binary = subprocess.run(
+        [
+            "git",
+            "-c",
+            "core.quotePath=false",
+            "diff",
+            "--numstat",
+            "--no-renames",
+            "--relative",
+            ref,
+        ],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for row in binary.stdout.splitlines():
+        added, removed, path = row.split("\t", 2)
+        if added == "-" and removed == "-":
+            changes[path] = None
+    return changes
+
+
+def find_affected(
+    db: Database, changes: ChangedLines, cwd: Path = Path(".")
+) -> Tuple[Set[str], Set[str]]:
+    """Objetivos afetados pelas alterações.
+
+    Um objetivo é afetado se sua cobertura registrada intersecta as
+    linhas alteradas ou se seus próprios testes (tests/objectives/<id>/)
+    mudaram. Objetivos sem cobertura registrada também são incluídos,
+    já que não há como descartá-los.
+
+    Returns:
+        Tupla (afetados, afetados apenas por não terem cobertura).
+    """
+    affected = db.get_objectives_covering(changes)
+    affected |= affected_objectives((str(cwd / path) for path in changes), cwd)
+    existing = {obj.id for obj in db.list_objectives()}
+    uncovered = existing - db.get_covered_objectives() - affected
+    return (affected & existing) | uncovered, uncovered
@@ -0,0 +1,313 @@
+"""Métricas do Vibe no formato de texto OpenMetrics (Prometheus).
+
+Contadores e histogramas ficam em um registro do processo (REGISTRY),
+atualizados pelo TestRunner, pelo Database e pelo StructureValidator.
+`vibe metrics` acrescenta métricas do estado do projeto lidas do banco;
+o arquivo gerado pode ser lido pelo textfile collector do node-exporter.
+"""
+
+import bisect
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from src.database import Database
+
+# Limites (segundos) dos histogramas de duração
+DURATION_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    300.0,
+)
+
+# Limites (segundos) do histograma de operações no banco, em geral abaixo de 1 ms
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Valores de rótulos: tupla na ordem de `labelnames`
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    """Família de métricas com rótulos."""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# TYPE {self.name} {self.type_name}", f"# HELP {self.name} {self.documentation}"]
+        lines.extend(self.samples())
+        return lines
+
+
+class Counter(_Metric):
+    """Contador monotônico (amostras com sufixo _total)."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterable[str]:
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}_total{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """Valor instantâneo (ex.: estado atual do projeto)."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def samples(self) -> Iterable[str]:
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    """Histograma com limites fixos (buckets cumulativos, _sum e _count)."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DURATION_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Por rótulos: [contagem por bucket (não cumulativa) + overflow, soma]
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def count(self, **labels: str) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def samples(self) -> Iterable[str]:
+        for key, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts, strict=True):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                labels = _format_labels(self.labelnames, key, f'le="{le}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total[0])}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class Registry:
+    """Conjunto de famílias de métricas renderizado em OpenMetrics."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            if type(existing) is not type(metric):
+                raise ValueError(f"Métrica '{metric.name}' já registrada com outro tipo")
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DURATION_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))  # type: ignore[return-value]
+
+    def render_lines(self) -> List[str]:
+        """Linhas de todas as famílias (sem o marcador # EOF)."""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return lines
+
+
+# Registro do processo e métricas mantidas pelos componentes
+REGISTRY = Registry()
+
+TESTS = REGISTRY.counter(
+    "vibe_tests",
+    "Testes executados (tentativas incluídas) por objetivo e status",
+    ("objective", "status"),
+)
+TEST_DURATION = REGISTRY.histogram("vibe_test_duration_seconds", "Duração de cada teste executado")
+OBJECTIVE_RUN_DURATION = REGISTRY.histogram(
+    "vibe_objective_run_seconds", "Duração da execução dos testes de um objetivo"
+)
+PYTEST_SPAWNS = REGISTRY.counter("vibe_pytest_spawns", "Processos pytest iniciados pelo runner")
+PYTEST_WORKER_REPLACEMENTS = REGISTRY.counter(
+    "vibe_pytest_worker_replacements", "Workers pytest pré-aquecidos substituídos após encerrarem"
+)
+DB_OPERATIONS = REGISTRY.counter(
+    "vibe_db_operations",
+    "Operações no banco (uma conexão/transação) por método do Database",
+    ("operation",),
+)
+DB_OPERATION_DURATION = REGISTRY.histogram(
+    "vibe_db_operation_seconds",
+    "Duração das operações no banco (conexão, consultas e commit) por método do Database",
+    ("operation",),
+    buckets=DB_BUCKETS,
+)
+VALIDATOR_SCAN_DURATION = REGISTRY.histogram(
+    "vibe_validator_scan_seconds", "Duração das verificações do StructureValidator", ("check",)
+)
+VALIDATOR_EVALUATIONS = REGISTRY.counter(
+    "vibe_validator_evaluations",
+    "Regras avaliadas pelo validador, reavaliadas ou vindas do cache",
+    ("result",),
+)
+
+
+def project_registry(db: "Database") -> Registry:
+    """Métricas do estado do projeto lidas do banco.
+
+    Os totais vêm da rollup diária (todo o histórico, inclusive execuções
+    já compactadas) e por isso se comportam como contadores.
+    """
+    registry = Registry()
+    info = registry.gauge(
+        "vibe_objective_info", "Objetivos do projeto", ("objective", "name", "status")
+    )
+    latest = registry.gauge(
+        "vibe_objective_latest_tests",
+        "Testes por status na última execução de cada objetivo",
+        ("objective", "status"),
+    )
+    history = registry.counter(
+        "vibe_test_runs_history",
+        "Execuções registradas no histórico por objetivo e status",
+        ("objective", "status"),
+    )
+    history_seconds = registry.counter(
+        "vibe_test_runs_history_seconds",
+        "Tempo total das execuções registradas por objetivo",
+        ("objective",),
+    )
+    regressions = registry.gauge(
+        "vibe_duration_regressions",
+        "Testes com regressão de duração em aberto por objetivo",
+        ("objective",),
+    )
+    db_size = registry.gauge("vibe_db_size_bytes", "Tamanho do arquivo do banco")
+
+    for objective in db.list_objectives():
+        info.set(1, objective=objective.id, name=objective.nome, status=objective.status.value)
+    for objective_id, summary in db.get_test_summaries().items():
+        for status, value in (
+            ("PASSED", summary.passed),
+            ("FAILED", summary.failed),
+            ("SKIPPED", summary.skipped),
+            ("ERROR", summary.error),
+        ):
+            latest.set(value, objective=objective_id, status=status)
+    for objective_id, totals in db.get_test_run_totals().items():
+        for status in ("PASSED", "FAILED", "SKIPPED", "ERROR"):
+            history.inc(totals[status], objective=objective_id, status=status)
+        history_seconds.inc(totals["duration_total"], objective=objective_id)
+    for objective_id, items in db.get_duration_regressions().items():
+        regressions.set(len(items), objective=objective_id)
+    db_size.set(db.file_size())
+    return registry
+
+
+def render(*registries: Registry) -> str:
+    """Texto OpenMetrics das famílias de todos os registros, terminado por # EOF."""
+    lines: List[str] = []
+    for registry in registries:
+        lines.extend(registry.render_lines())
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(path: Path, text: str) -> None:
+    """Grava o arquivo de métricas de forma atômica (o coletor nunca lê um arquivo pela metade)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as tmp:
+            tmp.write(text)
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
@@ -3,7 +3,7 @@
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 import uuid
 
 
@@ -46,6 +46,11 @@ class Objective:
     status: ObjectiveStatus = ObjectiveStatus.DEFINIDO
     created_at: datetime = field(default_factory=datetime.now)
     updated_at: datetime = field(default_factory=datetime.now)
+    # Orçamentos de execução dos testes (segundos). None usa o padrão do runner.
+    timeout_teste: Optional[float] = None
+    timeout_total: Optional[float] = None
+    # IDs dos objetivos dos quais este depende (persistidos em objective_dependencies)
+    dependencias: List[str] = field(default_factory=list)
 
     def to_dict(self) -> dict:
         """Converte o objetivo para um dicionário serializável."""
@@ -61,36 +66,44 @@ class Objective:
             "status": self.status.value,
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat(),
+            "timeout_teste": self.timeout_teste,
+            "timeout_total": self.timeout_total,
+            "dependencias": self.dependencias,
         }
 
     @classmethod
     def from_dict(cls, data: dict) -> "Objective":
         """Cria um objetivo a partir de um dicionário."""
-        obj = cls()
-        obj.id = data.get("id", str(uuid.uuid4()))
-        obj.nome = data.get("nome", "")
-        obj.descricao = data.get("descricao", "")
         # Converte strings de volta para ObjectiveType
-        tipos_raw = data.get("tipos", [])
-        obj.tipos = [ObjectiveType(t) for t in tipos_raw if t in [e.value for e in ObjectiveType]]
-        obj.entradas = data.get("entradas", [])
-        obj.saidas_esperadas = data.get("saidas_esperadas", [])
-        obj.efeitos_colaterais = data.get("efeitos_colaterais", [])
-        obj.invariantes = data.get("invariantes", [])
+        valid_tipos = {e.value for e in ObjectiveType}
+        tipos = [ObjectiveType(t) for t in data.get("tipos", []) if t in valid_tipos]
         # Status
         status_raw = data.get("status", ObjectiveStatus.DEFINIDO.value)
         try:
-            obj.status = ObjectiveStatus(status_raw)
+            status = ObjectiveStatus(status_raw)
         except ValueError:
-            obj.status = ObjectiveStatus.DEFINIDO
-        # Datetimes
+            status = ObjectiveStatus.DEFINIDO
+        # Datetimes (evita gerar defaults que seriam descartados)
         created_at_raw = data.get("created_at")
-        if created_at_raw:
-            obj.created_at = datetime.fromisoformat(created_at_raw)
+        created_at = datetime.fromisoformat(created_at_raw) if created_at_raw else datetime.now()
         updated_at_raw = data.get("updated_at")
-        if updated_at_raw:
-            obj.updated_at = datetime.fromisoformat(updated_at_raw)
-        return obj
+        updated_at = datetime.fromisoformat(updated_at_raw) if updated_at_raw else datetime.now()
+        return cls(
+            id=data.get("id") or str(uuid.uuid4()),
+            nome=data.get("nome", ""),
+            descricao=data.get("descricao", ""),
+            tipos=tipos,
+            entradas=data.get("entradas", []),
+            saidas_esperadas=data.get("saidas_esperadas", []),
+            efeitos_colaterais=data.get("efeitos_colaterais", []),
+            invariantes=data.get("invariantes", []),
+            status=status,
+            created_at=created_at,
+            updated_at=updated_at,
+            timeout_teste=_optional_float(data.get("timeout_teste")),
+            timeout_total=_optional_float(data.get("timeout_total")),
+            dependencias=list(data.get("dependencias", [])),
+        )
 
     def validate(self) -> List[str]:
         """Valida os campos obrigatórios do objetivo.
@@ -105,9 +118,22 @@ class Objective:
             errors.append("Descrição não pode ser vazia")
         if not self.tipos:
             errors.append("Pelo menos um tipo deve ser selecionado")
+        for name in ("timeout_teste", "timeout_total"):
+            value = getattr(self, name)
+            if value is not None and value <= 0:
+                errors.append(f"{name} deve ser positivo")
+        if self.id in self.dependencias:
+            errors.append("Objetivo não pode depender de si mesmo")
         return errors
 
 
+def _optional_float(value: Any) -> Optional[float]:
+    """Converte um valor opcional para float (None permanece None)."""
+    if value is None:
+        return None
+    return float(value)
+
+
 # Modelos para tracking de testes
 class TestStatus(str, Enum):
     """Status de execução de um teste."""
@@ -120,7 +146,16 @@ class TestStatus(str, Enum):
 
 @dataclass
 class TestRun:
-    """Registro de execução de um teste individual."""
+    """Registro de execução de um teste individual.
+
+    Execuções de uma mesma rodada de um objetivo compartilham o mesmo run_id.
+    Testes reexecutados após falha geram um registro por tentativa
+    (attempt 1, 2, ...); o resultado do teste na rodada é o da última.
+    O texto do erro é gravado comprimido no blob store (src/blobs.py) e
+    referenciado por output_ref; error_message traz uma prévia, cortada
+    no meio quando longa. Execuções lidas do banco vêm sem a prévia
+    (ver Database.load_error_previews).
+    """
 
     id: str = field(default_factory=lambda: str(uuid.uuid4()))
     objective_id: str = ""
@@ -130,11 +165,15 @@ class TestRun:
     error_message: Optional[str] = None
     duration: float = 0.0
     run_at: datetime = field(default_factory=datetime.now)
+    run_id: str = ""
+    attempt: int = 1
+    output_ref: Optional[str] = None
 
     def to_dict(self) -> dict:
         """Converte para dicionário serializável."""
         return {
             "id": self.id,
+            "run_id": self.run_id,
             "objective_id": self.objective_id,
             "test_file": self.test_file,
             "test_name": self.test_name,
@@ -142,6 +181,8 @@ class TestRun:
             "error_message": self.error_message,
             "duration": self.duration,
             "run_at": self.run_at.isoformat(),
+            "attempt": self.attempt,
+            "output_ref": self.output_ref,
         }
 
     @classmethod
@@ -149,6 +190,7 @@ class TestRun:
         """Cria a partir de um dicionário."""
         obj = cls()
         obj.id = data.get("id", str(uuid.uuid4()))
+        obj.run_id = data.get("run_id", "")
         obj.objective_id = data.get("objective_id", "")
         obj.test_file = data.get("test_file", "")
         obj.test_name = data.get("test_name", "")
@@ -162,6 +204,8 @@ class TestRun:
         run_at_raw = data.get("run_at")
         if run_at_raw:
             obj.run_at = datetime.fromisoformat(run_at_raw)
+        obj.attempt = int(data.get("attempt", 1))
+        obj.output_ref = data.get("output_ref")
         return obj
 
 
@@ -178,6 +222,37 @@ class TestSummary:
     error: int = 0
     last_run: datetime = field(default_factory=datetime.now)
 
+    @classmethod
+    def from_test_runs(cls, objective_id: str, test_runs: Iterable[TestRun]) -> "TestSummary":
+        """Agrega execuções de teste em um sumário.
+
+        Cada teste conta uma vez, pelo resultado da última tentativa.
+        last_run é o horário da execução mais recente (ou agora, se vazio).
+        """
+        final: Dict[Tuple[str, str, str], TestRun] = {}
+        for test_run in test_runs:
+            key = (test_run.run_id, test_run.test_file, test_run.test_name)
+            if key not in final or test_run.attempt >= final[key].attempt:
+                final[key] = test_run
+
+        summary = cls(objective_id=objective_id)
+        last_run: Optional[datetime] = None
+        for test_run in final.values():
+            summary.total_tests += 1
+            if test_run.status == TestStatus.PASSED:
+                summary.passed += 1
+            elif test_run.status == TestStatus.FAILED:
+                summary.failed += 1
+            elif test_run.status == TestStatus.SKIPPED:
+                summary.skipped += 1
+            elif test_run.status == TestStatus.ERROR:
+                summary.error += 1
+            if last_run is None or test_run.run_at > last_run:
+                last_run = test_run.run_at
+        if last_run is not None:
+            summary.last_run = last_run
+        return summary
+
     def is_passing(self) -> bool:
         """Retorna True se todos os testes passaram."""
         return self.failed == 0 and self.error == 0 and self.total_tests > 0
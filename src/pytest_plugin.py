@@ -0,0 +1,225 @@
+"""Plugin pytest carregado pelo TestRunner nos processos de teste.
+
+O runner executa este arquivo como script (`python pytest_plugin.py ...`),
+o que equivale a `python -m pytest ...` com o plugin registrado, sem
+depender de o pacote `src` do Vibe ser importável no projeto testado
+(que costuma ter o próprio `src/`). A configuração chega por variáveis
+de ambiente definidas pelo runner:
+
+- VIBE_TEST_TIMEOUT: tempo máximo (segundos) de cada teste; setup e
+  chamada dividem esse orçamento e o teardown tem um limite igual próprio.
+- VIBE_COVERAGE_OUT: se definida, registra (com sys.settrace) as linhas
+  executadas dos arquivos do projeto e as grava em JSON nesse caminho,
+  como {caminho relativo: [linhas]}, ao final da sessão.
+
+Ao final de cada teste (após o teardown) o plugin escreve na saída uma
+linha `##vibe-result {json}` com nome, status, duração total e erro,
+permitindo ao runner persistir o resultado assim que ele é produzido.
+Erros enormes têm o meio cortado para que a linha não passe de
+RESULT_LINE_LIMIT caracteres, o limite de linha lido pelo runner.
+"""
+
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from types import FrameType
+from typing import Any, Callable, Dict, Generator, Iterator, Optional, Set
+
+import pytest
+
+# Marcador usado pelo runner para classificar o teste como ERROR
+TIMEOUT_MARKER = "VibeTestTimeout"
+
+# Prefixo das linhas estruturadas emitidas por teste concluído
+RESULT_PREFIX = "##vibe-result "
+
+# Tamanho máximo de uma linha de resultado (o erro ocupa até a metade)
+RESULT_LINE_LIMIT = 1024 * 1024
+
+_config: Optional[pytest.Config] = None
+_pending: Dict[str, Dict[str, Any]] = {}
+# Prazo (time.monotonic) do teste em andamento, de VIBE_TEST_TIMEOUT
+_deadlines: Dict[str, float] = {}
+
+# Linhas executadas por arquivo; None marca arquivos fora do projeto
+_coverage: Dict[str, Optional[Set[int]]] = {}
+_project_root = os.getcwd() + os.sep
+# Código que não pertence ao projeto testado, mesmo se estiver sob a raiz
+_excluded_prefixes = tuple(
+    os.path.join(prefix, "")
+    for prefix in {sys.prefix, sys.base_prefix, os.path.join(os.getcwd(), "tests")}
+) + (os.path.abspath(__file__),)
+
+
+class VibeTestTimeoutError(Exception):
+    """Teste interrompido por exceder o tempo máximo permitido."""
+
+
+def _test_timeout() -> float:
+    """Lê o timeout por teste do ambiente (0 desativa)."""
+    try:
+        return max(0.0, float(os.environ.get("VIBE_TEST_TIMEOUT", "0")))
+    except ValueError:
+        return 0.0
+
+
+@contextmanager
+def _time_limit(seconds: float, phase: str) -> Iterator[None]:
+    """Interrompe o bloco com VibeTestTimeoutError após `seconds` segundos."""
+    if seconds <= 0 or not hasattr(signal, "setitimer"):
+        yield
+        return
+
+    def _on_timeout(signum: int, frame: Any) -> None:
+        raise VibeTestTimeoutError(f"{TIMEOUT_MARKER}: {phase} excedeu {_test_timeout():g}s")
+
+    previous = signal.signal(signal.SIGALRM, _on_timeout)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_setup(item: pytest.Item) -> Generator[None, Any, None]:
+    """Inicia o orçamento de VIBE_TEST_TIMEOUT, compartilhado por setup e chamada."""
+    timeout = _test_timeout()
+    if timeout:
+        _deadlines[item.nodeid] = time.monotonic() + timeout
+    with _time_limit(timeout, "setup"):
+        yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item: pytest.Item) -> Generator[None, Any, None]:
+    """Interrompe a chamada do teste no que restar do orçamento após o setup."""
+    deadline = _deadlines.get(item.nodeid)
+    # setitimer(0) desarmaria o alarme: o orçamento esgotado vira 1 ms
+    remaining = max(deadline - time.monotonic(), 0.001) if deadline is not None else 0.0
+    with _time_limit(remaining, "teste"):
+        yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_teardown(item: pytest.Item) -> Generator[None, Any, None]:
+    """Limita o teardown a VIBE_TEST_TIMEOUT próprio (a limpeza roda mesmo após um timeout)."""
+    _deadlines.pop(item.nodeid, None)
+    with _time_limit(_test_timeout(), "teardown"):
+        yield
+
+
+def _lines_for(filename: str) -> Optional[Set[int]]:
+    """Conjunto de linhas do arquivo ou None se ele não deve ser rastreado."""
+    try:
+        return _coverage[filename]
+    except KeyError:
+        path = os.path.abspath(filename)
+        tracked = (
+            path.startswith(_project_root)
+            and path.endswith(".py")
+            and not path.startswith(_excluded_prefixes)
+            and "site-packages" not in path
+        )
+        lines: Optional[Set[int]] = set() if tracked else None
+        _coverage[filename] = lines
+        return lines
+
+
+def _trace(frame: FrameType, event: str, arg: Any) -> Optional[Callable[..., Any]]:
+    """Tracer global: só acompanha linha a linha as funções do projeto."""
+    lines = _lines_for(frame.f_code.co_filename)
+    if lines is None:
+        return None
+    lines.add(frame.f_lineno)
+
+    def _trace_lines(frame: FrameType, event: str, arg: Any) -> Callable[..., Any]:
+        if event == "line":
+            lines.add(frame.f_lineno)
+        return _trace_lines
+
+    return _trace_lines
+
+
+def _write_coverage(path: str) -> None:
+    """Grava as linhas executadas, com caminhos relativos à raiz do projeto."""
+    data = {
+        os.path.relpath(os.path.abspath(filename), _project_root).replace(os.sep, "/"): sorted(
+            lines
+        )
+        for filename, lines in _coverage.items()
+        if lines
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Guarda a configuração e inicia a coleta de cobertura, se pedida."""
+    global _config
+    _config = config
+    if os.environ.get("VIBE_COVERAGE_OUT"):
+        threading.settrace(_trace)
+        sys.settrace(_trace)
+
+
+def pytest_unconfigure(config: pytest.Config) -> None:
+    """Encerra a coleta de cobertura e grava o resultado."""
+    path = os.environ.get("VIBE_COVERAGE_OUT")
+    if path:
+        sys.settrace(None)
+        threading.settrace(None)
+        _write_coverage(path)
+
+
+def _fit_error(error: str) -> str:
+    """Corta o meio do erro até que, serializado, caiba em metade da linha."""
+    while len(json.dumps(error)) > RESULT_LINE_LIMIT // 2:
+        keep = len(error) // 2
+        error = error[: keep // 4] + "\n[...]\n" + error[-(keep - keep // 4) :]
+    return error
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_runtest_logreport(report: pytest.TestReport) -> None:
+    """Acumula as fases do teste e emite o resultado estruturado no teardown."""
+    state = _pending.setdefault(report.nodeid, {"status": "PASSED", "duration": 0.0, "errors": []})
+    state["duration"] += report.duration
+    if report.failed:
+        if TIMEOUT_MARKER in report.longreprtext or report.when != "call":
+            state["status"] = "ERROR"
+        elif state["status"] != "ERROR":
+            state["status"] = "FAILED"
+        state["errors"].append(report.longreprtext)
+    elif report.skipped and state["status"] == "PASSED":
+        state["status"] = "SKIPPED"
+
+    if report.when != "teardown":
+        return
+    del _pending[report.nodeid]
+    error = "\n".join(state["errors"])
+    line = RESULT_PREFIX + json.dumps(
+        {
+            "nodeid": report.nodeid,
+            "name": report.nodeid.split("::")[-1],
+            "status": state["status"],
+            "duration": round(state["duration"], 6),
+            "error": _fit_error(error) if error else None,
+        }
+    )
+    reporter = _config.pluginmanager.get_plugin("terminalreporter") if _config else None
+    if reporter is not None:
+        reporter.write_line(line)
+    else:
+        print(line, flush=True)
+
+
+if __name__ == "__main__":
+    # Como `python -m pytest`: o diretório atual (e não o deste arquivo) no sys.path
+    sys.path[0] = os.getcwd()
+    sys.exit(pytest.main(sys.argv[1:], plugins=[sys.modules[__name__]]))
@@ -0,0 +1,158 @@
+"""Servidor de processos pytest pré-aquecidos (fork-server).
+
+Executado pelo WorkerPool (src/worker_pool.py) como script
+(`python pytest_server.py FD`), como o plugin, sem depender de o pacote
+`src` do Vibe ser importável no projeto testado. Ao iniciar, importa o
+pytest, seus plugins internos, os plugins instalados (entry points
+pytest11) e o plugin do Vibe; depois atende pedidos no socket FD, um
+por vez, com um fork por pedido. O filho já começa com tudo importado e
+roda `pytest.main` em uma sessão própria; nada do que ele carrega
+(conftest, módulos de teste, estado global) volta ao servidor.
+
+Protocolo (linhas JSON no socket):
+
+- pedido: {"args": [...], "env": {...}, "cpu_seconds": N, "memory_mb": N},
+  acompanhado (SCM_RIGHTS) do descritor onde o filho escreve stdout e
+  stderr;
+- respostas: {"pid": N} logo após o fork e, ao fim do filho,
+  {"returncode": N} (código negativo = sinal).
+
+O servidor termina quando o socket é fechado.
+"""
+
+import importlib
+import importlib.util
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - indisponível no Windows
+    resource = None  # type: ignore[assignment]
+
+PLUGIN_PATH = Path(__file__).resolve().with_name("pytest_plugin.py")
+
+# Tamanho máximo de um pedido (argumentos e ambiente)
+MAX_REQUEST_BYTES = 1024 * 1024
+
+
+def _warm_up() -> Tuple[Any, ModuleType]:
+    """Importa o pytest, seus plugins e o plugin do Vibe."""
+    import pytest
+    from _pytest.config import default_plugins
+
+    for name in default_plugins:
+        try:
+            importlib.import_module(f"_pytest.{name}")
+        except ImportError:
+            pass
+    try:
+        from importlib.metadata import entry_points
+
+        for entry_point in entry_points(group="pytest11"):
+            try:
+                entry_point.load()
+            except Exception:
+                # O pytest reporta o erro no filho, ao carregar o plugin
+                pass
+    except ImportError:  # pragma: no cover
+        pass
+
+    # Nome próprio: não colide com um `pytest_plugin` do projeto testado
+    spec = importlib.util.spec_from_file_location("vibe_pytest_plugin", PLUGIN_PATH)
+    assert spec is not None and spec.loader is not None
+    plugin = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = plugin
+    spec.loader.exec_module(plugin)
+    return pytest, plugin
+
+
+def _receive(sock: socket.socket, buffer: bytearray) -> Optional[Tuple[Dict[str, Any], List[int]]]:
+    """Lê um pedido e seus descritores (None quando o socket é fechado)."""
+    fds: List[int] = []
+    while b"\n" not in buffer:
+        data, received, _, _ = socket.recv_fds(sock, 64 * 1024, 4)
+        fds.extend(received)
+        if not data:
+            for fd in fds:
+                os.close(fd)
+            return None
+        buffer.extend(data)
+        if len(buffer) > MAX_REQUEST_BYTES:
+            raise ValueError("pedido excede o tamanho máximo")
+    line, _, rest = bytes(buffer).partition(b"\n")
+    buffer[:] = rest
+    return json.loads(line), fds
+
+
+def _send(sock: socket.socket, message: Dict[str, Any]) -> None:
+    sock.sendall(json.dumps(message).encode() + b"\n")
+
+
+def _run_child(
+    sock: socket.socket, request: Dict[str, Any], output: int, pytest: Any, plugin: ModuleType
+) -> None:
+    """Executa o pytest no processo filho e termina (não retorna)."""
+    code = 1
+    try:
+        sock.close()
+        os.setsid()
+        os.dup2(output, 1)
+        os.dup2(output, 2)
+        os.close(output)
+        os.environ.update(request.get("env") or {})
+        if resource is not None:
+            cpu_seconds = request.get("cpu_seconds")
+            memory_mb = request.get("memory_mb")
+            if cpu_seconds:
+                resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds))
+            if memory_mb:
+                limit = memory_mb * 1024 * 1024
+                resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        code = int(pytest.main(list(request["args"]), plugins=[plugin]))
+    except BaseException as e:  # noqa: BLE001 - o filho nunca volta ao laço do servidor
+        print(f"Erro no processo pytest: {e!r}", file=sys.stderr)
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(code)
+
+
+def serve(sock: socket.socket) -> None:
+    """Atende pedidos até o socket ser fechado."""
+    pytest, plugin = _warm_up()
+    buffer = bytearray()
+    while True:
+        received = _receive(sock, buffer)
+        if received is None:
+            return
+        request, fds = received
+        if len(fds) != 1:
+            for fd in fds:
+                os.close(fd)
+            _send(sock, {"error": "pedido sem descritor de saída"})
+            continue
+        pid = os.fork()
+        if pid == 0:
+            _run_child(sock, request, fds[0], pytest, plugin)
+        os.close(fds[0])
+        _send(sock, {"pid": pid})
+        _, status = os.waitpid(pid, 0)
+        _send(sock, {"returncode": os.waitstatus_to_exitcode(status)})
+
+
+if __name__ == "__main__":
+    # Como `python -m pytest`: o diretório atual (e não o deste arquivo) no sys.path
+    sys.path[0] = os.getcwd()
+    with socket.socket(fileno=int(sys.argv[1])) as server_socket:
+        try:
+            serve(server_socket)
+        except (BrokenPipeError, ConnectionResetError, KeyboardInterrupt):
+            pass
@@ -0,0 +1,123 @@
+"""Divisão determinística dos testes em shards balanceados por duração."""
+
+import heapq
+import statistics
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from src.database import Database
+from src.test_runner import TestFileKey, find_test_files
+
+# Duração estimada quando não há histórico algum
+DEFAULT_FILE_DURATION = 1.0
+
+
+@dataclass(frozen=True)
+class Shard:
+    """Fatia i de N (1 <= i <= N) da suíte de testes."""
+
+    index: int
+    count: int
+
+    @classmethod
+    def parse(cls, spec: str) -> "Shard":
+        """Cria a partir de uma especificação "i/N".
+
+        Raises:
+            ValueError: Se a especificação for inválida.
+        """
+        try:
+            index_raw, count_raw = spec.split("/")
+            index, count = int(index_raw), int(count_raw)
+        except ValueError:
+            raise ValueError(f"Shard inválido '{spec}': use o formato i/N (ex.: 2/4)") from None
+        if count < 1 or not 1 <= index <= count:
+            raise ValueError(f"Shard inválido '{spec}': é necessário 1 <= i <= N")
+        return cls(index, count)
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+
+def partition(
+    units: Iterable[TestFileKey], durations: Dict[TestFileKey, float], count: int
+) -> List[List[TestFileKey]]:
+    """Distribui arquivos entre `count` shards minimizando o mais lento.
+
+    Usa o algoritmo guloso LPT: arquivos em ordem decrescente de duração
+    vão para o shard de menor carga. Empates são resolvidos pela chave do
+    arquivo e pelo índice do shard, de modo que todas as máquinas chegam
+    à mesma divisão a partir do mesmo banco.
+
+    Args:
+        units: Arquivos (objective_id, nome do arquivo).
+        durations: Duração estimada de cada arquivo.
+        count: Número de shards.
+
+    Returns:
+        Lista com os arquivos de cada shard, na ordem dos shards.
+    """
+    shards: List[List[TestFileKey]] = [[] for _ in range(count)]
+    loads = [(0.0, index) for index in range(count)]
+    for unit in sorted(set(units), key=lambda unit: (-durations.get(unit, 0.0), unit)):
+        load, index = heapq.heappop(loads)
+        shards[index].append(unit)
+        heapq.heappush(loads, (load + durations.get(unit, 0.0), index))
+    return shards
+
+
+def estimate_durations(db: Database, units: Iterable[TestFileKey]) -> Dict[TestFileKey, float]:
+    """Estima a duração de cada arquivo a partir da rollup diária de execuções.
+
+    Arquivos sem histórico recebem a mediana dos conhecidos (ou
+    DEFAULT_FILE_DURATION se nenhum tiver histórico).
+    """
+    history: Dict[TestFileKey, float] = {}
+    for (objective_id, test_file), duration in db.get_file_durations().items():
+        history[(objective_id, Path(test_file).name)] = duration
+    units = list(units)
+    known = [history[unit] for unit in units if unit in history]
+    fallback = statistics.median(known) if known else DEFAULT_FILE_DURATION
+    return {unit: history.get(unit, fallback) for unit in units}
+
+
+def collect_units(
+    db: Database, base_path: Optional[Path] = None, objective_id: Optional[str] = None
+) -> List[TestFileKey]:
+    """Lista os arquivos de teste de todos os objetivos (ou de um só)."""
+    if base_path is None:
+        base_path = Path("tests")
+    if objective_id is not None:
+        objective_ids = [objective_id]
+    else:
+        objective_ids = [obj.id for obj in db.list_objectives()]
+    units: List[TestFileKey] = []
+    for oid in objective_ids:
+        test_dir = base_path / "objectives" / oid
+        if test_dir.is_dir():
+            units.extend((oid, path.name) for path in find_test_files(test_dir))
+    return units
+
+
+def select_shard(
+    db: Database,
+    shard: Shard,
+    base_path: Optional[Path] = None,
+    objective_id: Optional[str] = None,
+) -> Tuple[Set[TestFileKey], float]:
+    """Calcula os arquivos do shard e sua duração estimada.
+
+    Args:
+        db: Banco com o histórico de durações.
+        shard: Shard desejado.
+        base_path: Caminho base para testes (opcional). Se None, usa "tests".
+        objective_id: Restringe a divisão aos arquivos de um objetivo.
+
+    Returns:
+        Tupla (arquivos do shard, duração estimada em segundos).
+    """
+    units = collect_units(db, base_path, objective_id)
+    durations = estimate_durations(db, units)
+    selected = partition(units, durations, shard.count)[shard.index - 1]
+    return set(selected), sum(durations[unit] for unit in selected)
@@ -1,11 +1,33 @@
 """Gerador automático de testes para objetivos."""
 
+import hashlib
 import json
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List
+from typing import Dict, List
 
 from src.models import Objective, ObjectiveType
 
+# Manifesto com os hashes registrados no momento da geração
+MANIFEST_FILE = ".vibe-manifest.json"
+
+
+@dataclass
+class GenerationReport:
+    """Resultado de uma geração de testes para um objetivo.
+
+    Cada lista contém nomes de arquivos relativos ao diretório do objetivo.
+    """
+
+    created: List[str] = field(default_factory=list)
+    updated: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+    protected: List[str] = field(default_factory=list)
+
+    def written(self) -> List[str]:
+        """Retorna os arquivos efetivamente escritos em disco."""
+        return self.created + self.updated
+
 
 def map_objective_to_test_types(objective: Objective) -> List[str]:
     """Mapeia tipos de objetivo para tipos de teste.
@@ -104,9 +126,107 @@ def test_{test_type}():
     return content
 
 
+def content_hash(content: str) -> str:
+    """Retorna o hash SHA-256 do conteúdo de um arquivo de teste."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def load_manifest(test_dir: Path) -> Dict[str, str]:
+    """Carrega o manifesto {arquivo: hash} de um diretório de testes.
+
+    Args:
+        test_dir: Diretório de testes do objetivo.
+
+    Returns:
+        Dicionário com os hashes registrados. Vazio se não houver manifesto.
+    """
+    manifest_path = test_dir / MANIFEST_FILE
+    if not manifest_path.exists():
+        return {}
+    try:
+        data = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    files = data.get("files", {}) if isinstance(data, dict) else {}
+    return {str(k): str(v) for k, v in files.items()}
+
+
+def _save_manifest(test_dir: Path, hashes: Dict[str, str]) -> None:
+    """Grava o manifesto de hashes do diretório de testes."""
+    manifest_path = test_dir / MANIFEST_FILE
+    content = json.dumps({"files": dict(sorted(hashes.items()))}, indent=2) + "\n"
+    manifest_path.write_text(content, encoding="utf-8")
+
+
+def sync_tests_for_objective(
+    objective: Objective, base_path: Path | None = None
+) -> GenerationReport:
+    """Gera os testes de um objetivo reescrevendo apenas o necessário.
+
+    Compara o hash de cada arquivo em disco com o hash registrado no
+    manifesto no momento da geração:
+
+    - arquivo inexistente: é criado;
+    - arquivo igual ao que seria gerado: é mantido intacto;
+    - arquivo intocado mas com conteúdo gerado diferente: é reescrito;
+    - arquivo editado manualmente (hash divergente ou sem registro): é protegido.
+
+    Args:
+        objective: Objetivo para o qual gerar testes.
+        base_path: Caminho base opcional (para testes). Se None, usa "tests".
+
+    Returns:
+        GenerationReport com os arquivos criados, atualizados, mantidos e protegidos.
+    """
+    report = GenerationReport()
+    test_types = map_objective_to_test_types(objective)
+    if not test_types:
+        return report
+
+    test_dir = generate_test_directory(objective, base_path)
+    manifest = load_manifest(test_dir)
+    hashes = dict(manifest)
+
+    for test_type in test_types:
+        file_name = f"test_{test_type}.py"
+        test_file = test_dir / file_name
+        content = generate_test_file(objective, test_type)
+        new_hash = content_hash(content)
+
+        if not test_file.exists():
+            test_file.write_text(content, encoding="utf-8")
+            hashes[file_name] = new_hash
+            report.created.append(file_name)
+            continue
+
+        current_hash = content_hash(test_file.read_text(encoding="utf-8"))
+        if current_hash == new_hash:
+            hashes[file_name] = new_hash
+            report.skipped.append(file_name)
+        elif manifest.get(file_name) == current_hash:
+            test_file.write_text(content, encoding="utf-8")
+            hashes[file_name] = new_hash
+            report.updated.append(file_name)
+        else:
+            report.protected.append(file_name)
+
+    # Criar arquivo __init__.py no diretório
+    init_file = test_dir / "__init__.py"
+    if not init_file.exists():
+        init_file.write_text("# Pacote de testes gerados automaticamente\n")
+
+    if hashes != manifest:
+        _save_manifest(test_dir, hashes)
+
+    return report
+
+
 def generate_tests_for_objective(objective: Objective, base_path: Path | None = None) -> bool:
     """Gera todos os testes para um objetivo.
 
+    Arquivos sem alteração não são reescritos e arquivos editados
+    manualmente nunca são sobrescritos (ver sync_tests_for_objective).
+
     Args:
         objective: Objetivo para o qual gerar testes.
         base_path: Caminho base opcional (para testes). Se None, usa "tests".
@@ -115,25 +235,9 @@ def generate_tests_for_objective(objective: Objective, base_path: Path | None =
         True se todos os testes foram gerados com sucesso, False caso contrário.
     """
     try:
-        # Obter tipos de teste
-        test_types = map_objective_to_test_types(objective)
-        if not test_types:
+        if not map_objective_to_test_types(objective):
             return False
-        
-        # Criar diretório
-        test_dir = generate_test_directory(objective, base_path)
-        
-        # Gerar arquivos de teste
-        for test_type in test_types:
-            content = generate_test_file(objective, test_type)
-            test_file = test_dir / f"test_{test_type}.py"
-            test_file.write_text(content, encoding="utf-8")
-        
-        # Criar arquivo __init__.py no diretório
-        init_file = test_dir / "__init__.py"
-        if not init_file.exists():
-            init_file.write_text("# Pacote de testes gerados automaticamente\n")
-        
+        sync_tests_for_objective(objective, base_path)
         return True
     except Exception as e:
         print(f"Erro ao gerar testes: {e}")
@@ -1,23 +1,442 @@
 """Executor de testes para objetivos."""
 
+import ast
+import codecs
+import json
+import os
 import re
+import signal
+import statistics
 import subprocess
 import sys
 import tempfile
-from datetime import datetime
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Callable,
+    Collection,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
 
+from src import dependencies, metrics, pytest_plugin, tracing
+from src.blobs import DEFAULT_PREVIEW_CHARS, truncate_middle
 from src.database import Database
-from src.models import TestRun, TestStatus, TestSummary
+from src.models import Objective, ObjectiveStatus, TestRun, TestStatus, TestSummary
+
+if TYPE_CHECKING:
+    from src.worker_pool import WarmProcess, WorkerPool
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - indisponível no Windows
+    resource = None  # type: ignore[assignment]
+
+# Timeout por arquivo quando nenhum orçamento de tempo é configurado; com
+# timeout por teste, é também o mínimo do watchdog do arquivo
+DEFAULT_FILE_TIMEOUT = 30.0
+
+# Folga do watchdog do arquivo para iniciar o pytest e coletar os testes
+FILE_TIMEOUT_SLACK = 10.0
+
+# Script que executa o pytest com o plugin do Vibe
+PYTEST_PLUGIN_SCRIPT = Path(pytest_plugin.__file__).resolve()
+
+# Tamanho máximo de error_message mantido nos resultados em memória; o
+# texto completo vai para o blob store (state/blobs), referenciado em output_ref
+DEFAULT_MAX_ERROR_CHARS = DEFAULT_PREVIEW_CHARS
+
+# Saída recente do teste em andamento mantida em memória (buffer circular)
+OUTPUT_RING_CHARS = 16 * 1024
+
+# Leitura da saída do pytest em blocos de bytes
+READ_CHUNK_BYTES = 64 * 1024
+
+# Linhas maiores são cortadas; comporta a linha de resultado do plugin
+MAX_LINE_CHARS = pytest_plugin.RESULT_LINE_LIMIT
+
+# Tupla de resultado: (test_name, status, duration, error_message)
+TestResult = Tuple[str, TestStatus, float, Optional[str]]
+
+
+# Arquivos de teste selecionados: (objective_id, nome do arquivo)
+TestFileKey = Tuple[str, str]
+
+
+def find_test_files(test_dir: Path) -> List[Path]:
+    """Lista os arquivos de teste de um diretório de objetivo, em ordem.
+
+    Módulos de suporte (__init__.py, conftest.py) não são executados.
+    """
+    return sorted(
+        path for path in test_dir.glob("*.py") if path.name not in ("__init__.py", "conftest.py")
+    )
+
+
+def count_test_cases(test_file: Path) -> int:
+    """Estima quantos testes um arquivo tem, sem importá-lo.
+
+    Conta as funções test* (no módulo e em classes Test*), multiplicadas
+    pelo número de casos de @pytest.mark.parametrize com listas literais.
+    """
+    try:
+        tree = ast.parse(test_file.read_text(encoding="utf-8"))
+    except (OSError, SyntaxError, ValueError):
+        return 1
+    functions: List[ast.stmt] = []
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name.startswith("Test"):
+            functions.extend(node.body)
+        else:
+            functions.append(node)
+    total = 0
+    for node in functions:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name.startswith(
+            "test"
+        ):
+            cases = 1
+            for decorator in node.decorator_list:
+                if (
+                    isinstance(decorator, ast.Call)
+                    and isinstance(decorator.func, ast.Attribute)
+                    and decorator.func.attr == "parametrize"
+                    and len(decorator.args) >= 2
+                    and isinstance(decorator.args[1], (ast.List, ast.Tuple))
+                ):
+                    cases *= max(1, len(decorator.args[1].elts))
+            total += cases
+    return max(total, 1)
+
+
+def schedule_objectives(
+    objectives: List[Objective],
+    summaries: Dict[str, TestSummary],
+    durations: Dict[str, float],
+) -> List[Objective]:
+    """Ordena objetivos para dar feedback rápido e aproveitar o paralelismo.
+
+    Objetivos que falharam na última execução vêm primeiro; dentro de
+    cada grupo, os mais longos primeiro (melhor ocupação dos processos
+    paralelos). Objetivos sem histórico de duração recebem a mediana das
+    conhecidas. Empates mantêm a ordem original.
+
+    Args:
+        objectives: Objetivos a ordenar.
+        summaries: Último sumário de cada objetivo.
+        durations: Duração média por rodada de cada objetivo.
+
+    Returns:
+        Nova lista ordenada.
+    """
+    known = [durations[obj.id] for obj in objectives if obj.id in durations]
+    fallback = statistics.median(known) if known else 0.0
+
+    def key(obj: Objective) -> Tuple[bool, float]:
+        summary = summaries.get(obj.id)
+        passing = summary is None or summary.is_passing()
+        return passing, -durations.get(obj.id, fallback)
+
+    return sorted(objectives, key=key)
+
+
+class OutputCapture:
+    """Captura em streaming da saída do pytest com memória limitada.
+
+    feed() recebe blocos de bytes e devolve as linhas completas; linhas
+    maiores que max_line_chars são cortadas e o excedente descartado
+    (contado em dropped_chars). As linhas do teste em andamento ficam em
+    um buffer circular de até ring_chars caracteres, esvaziado a cada
+    teste concluído e usado como contexto quando o processo é
+    interrompido.
+    """
+
+    def __init__(
+        self, ring_chars: int = OUTPUT_RING_CHARS, max_line_chars: int = MAX_LINE_CHARS
+    ) -> None:
+        self.ring_chars = ring_chars
+        self.max_line_chars = max_line_chars
+        self.dropped_chars = 0
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._partial: List[str] = []
+        self._partial_chars = 0
+        self._ring: Deque[str] = deque()
+        self._ring_chars = 0
+
+    def feed(self, data: bytes) -> List[str]:
+        """Processa um bloco da saída e retorna as linhas que ele completou."""
+        return self._split(self._decoder.decode(data))
+
+    def close(self) -> List[str]:
+        """Fim da saída: retorna a última linha, mesmo sem quebra final."""
+        lines = self._split(self._decoder.decode(b"", final=True))
+        if self._partial:
+            lines.append(self._take_partial())
+        return lines
+
+    def remember(self, line: str) -> None:
+        """Guarda uma linha do teste em andamento no buffer circular."""
+        line = line[-self.ring_chars :]
+        self._ring.append(line)
+        self._ring_chars += len(line) + 1
+        while self._ring_chars > self.ring_chars:
+            self._ring_chars -= len(self._ring.popleft()) + 1
+
+    def reset(self) -> None:
+        """Esvazia o buffer circular (o teste em andamento terminou)."""
+        self._ring.clear()
+        self._ring_chars = 0
+
+    def recent(self) -> str:
+        """Saída recente do teste em andamento."""
+        return "\n".join(self._ring)
+
+    def _split(self, text: str) -> List[str]:
+        *complete, rest = text.split("\n")
+        lines = []
+        for piece in complete:
+            self._append_partial(piece)
+            lines.append(self._take_partial())
+        self._append_partial(rest)
+        return lines
+
+    def _append_partial(self, piece: str) -> None:
+        room = self.max_line_chars - self._partial_chars
+        if len(piece) > room:
+            self.dropped_chars += len(piece) - max(room, 0)
+            piece = piece[: max(room, 0)]
+        if piece:
+            self._partial.append(piece)
+            self._partial_chars += len(piece)
+
+    def _take_partial(self) -> str:
+        line = "".join(self._partial)
+        self._partial = []
+        self._partial_chars = 0
+        return line
+
+
+@dataclass
+class RunLimits:
+    """Limites aplicados aos processos de teste.
+
+    Os orçamentos do contrato do objetivo (timeout_teste e timeout_total)
+    têm precedência sobre test_timeout e objective_timeout.
+    """
+
+    test_timeout: Optional[float] = None
+    objective_timeout: Optional[float] = None
+    cpu_seconds: Optional[int] = None
+    memory_mb: Optional[int] = None
+
+    def preexec(self) -> Optional[Callable[[], None]]:
+        """Retorna a função que aplica os rlimits no processo filho."""
+        if resource is None or not (self.cpu_seconds or self.memory_mb):
+            return None
+        cpu_seconds = self.cpu_seconds
+        memory_mb = self.memory_mb
+
+        def apply() -> None:
+            if cpu_seconds:
+                resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds))
+            if memory_mb:
+                limit = memory_mb * 1024 * 1024
+                resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+        return apply
+
+
+class PytestOutputParser:
+    """Parser incremental da saída do pytest em modo verbose.
+
+    Recebe a saída linha a linha com feed(). Linhas estruturadas do
+    plugin do Vibe (RESULT_PREFIX) viram resultados imediatamente. Sem
+    elas (pytest executado sem o plugin), o parser usa as linhas de
+    status do modo -v, associa os erros das seções FAILURES/ERRORS e
+    entrega os resultados em close().
+
+    node_ids associa cada teste ao seu node ID sem o caminho do arquivo
+    (ex.: "TestClasse::test_x[1]"), usado para reexecutar só as falhas.
+    """
+
+    def __init__(self) -> None:
+        self.in_progress: Optional[str] = None
+        self.node_ids: Dict[str, str] = {}
+        self._structured = False
+        self._done = False
+        self._in_error = False
+        self._current_error: Optional[str] = None
+        self._statuses: List[TestResult] = []
+        self._errors: Dict[str, List[str]] = {}
+
+    def feed_text(self, text: str) -> List[TestResult]:
+        """Processa um bloco de saída, linha a linha."""
+        results: List[TestResult] = []
+        for line in text.split("\n"):
+            results.extend(self.feed(line))
+        return results
+
+    def feed(self, line: str) -> List[TestResult]:
+        """Processa uma linha e retorna os resultados concluídos por ela."""
+        line = line.strip()
+        if not line:
+            return []
+
+        if line.startswith(pytest_plugin.RESULT_PREFIX):
+            self._structured = True
+            self.in_progress = None
+            try:
+                data = json.loads(line[len(pytest_plugin.RESULT_PREFIX) :])
+            except ValueError:  # linha cortada pelo limite de tamanho
+                return []
+            self._remember_node(data.get("nodeid", ""))
+            return [
+                (
+                    data["name"],
+                    TestStatus(data["status"]),
+                    float(data["duration"]),
+                    data.get("error"),
+                )
+            ]
+
+        # Banners "==== ... ====" delimitam as seções do relatório
+        if line.startswith("===="):
+            if "short test summary" in line:
+                self._done = True
+            self._in_error = "FAILURES" in line or "ERRORS" in line
+            self._current_error = None
+            return []
+
+        # Teste iniciado: "arquivo.py::teste" ainda sem status
+        parts = line.split()
+        if "::" in parts[0] and not (self._in_error or self._done):
+            self.in_progress = parts[0].split("::")[-1] if len(parts) == 1 else None
+
+        if self._structured or self._done:
+            return []
+
+        if self._in_error:
+            # Cabeçalho "____ test_name ____" inicia o erro de um teste
+            if line.startswith("__") and line.endswith("__"):
+                name = line.strip("_ ").split("::")[-1]
+                name = name.removeprefix("ERROR at setup of ").removeprefix("ERROR at teardown of ")
+                self._current_error = name
+                self._errors.setdefault(name, [])
+            elif self._current_error and not line.startswith("----"):
+                self._errors[self._current_error].append(line)
+            return []
+
+        # Detectar resultado de teste (formato comum do pytest)
+        # Exemplo: "test_file.py::test_name PASSED [ 99%]"
+        if len(parts) < 2 or "::" not in parts[0]:
+            return []
+        if "PASSED" in parts:
+            status = TestStatus.PASSED
+        elif "FAILED" in parts:
+            status = TestStatus.FAILED
+        elif "SKIPPED" in parts:
+            status = TestStatus.SKIPPED
+        elif "ERROR" in parts:
+            status = TestStatus.ERROR
+        else:
+            return []
+
+        # Extrair duração (quando informada como "[0.12s]")
+        duration = 0.0
+        match = re.search(r"\[([\d.]+)s\]", line)
+        if match:
+            try:
+                duration = float(match.group(1))
+            except ValueError:
+                pass
+
+        self._remember_node(parts[0])
+        self._statuses.append((parts[0].split("::")[-1], status, duration, None))
+        return []
+
+    def close(self) -> List[TestResult]:
+        """Finaliza o parse, retornando os resultados ainda não entregues."""
+        if self._structured:
+            return []
+        # Associar mensagens de erro aos testes que falharam
+        parsed: List[TestResult] = []
+        for name, status, duration, _ in self._statuses:
+            error_msg = "\n".join(self._errors[name]) if self._errors.get(name) else None
+            if error_msg and pytest_plugin.TIMEOUT_MARKER in error_msg:
+                # Teste interrompido pelo timeout por teste
+                status = TestStatus.ERROR
+            parsed.append((name, status, duration, error_msg))
+        self._statuses = []
+        return parsed
+
+    def _remember_node(self, nodeid: str) -> None:
+        """Registra o node ID (sem o arquivo) do teste."""
+        if "::" in nodeid:
+            self.node_ids[nodeid.split("::")[-1]] = nodeid.split("::", 1)[1]
 
 
 class TestRunner:
     """Executa testes e registra resultados."""
 
-    def __init__(self, db: Database) -> None:
-        """Inicializa o runner com conexão ao banco."""
+    def __init__(
+        self,
+        db: Database,
+        quiet: bool = False,
+        limits: Optional[RunLimits] = None,
+        selection: Optional[Collection[TestFileKey]] = None,
+        retries: int = 0,
+        coverage: bool = False,
+        max_error_chars: int = DEFAULT_MAX_ERROR_CHARS,
+        workers: Optional["WorkerPool"] = None,
+    ) -> None:
+        """Inicializa o runner com conexão ao banco.
+
+        Args:
+            db: Banco de dados onde os resultados são persistidos.
+            quiet: Se True, mensagens de progresso vão para stderr,
+                deixando stdout livre para saídas estruturadas.
+            limits: Timeouts e limites de recursos padrão.
+            selection: Se informado, apenas estes arquivos
+                (objective_id, nome do arquivo) são executados, como em
+                um shard (ver src/sharding.py).
+            retries: Reexecuções dos testes que falharem, na mesma
+                rodada; cada tentativa é registrada com seu número.
+            coverage: Registra as linhas do projeto executadas pelos
+                testes de cada objetivo (ver src/impact.py).
+            max_error_chars: Tamanho máximo de error_message nos
+                resultados (0 = sem limite); mensagens maiores são
+                cortadas. O texto completo sempre vai para o blob store,
+                referenciado em output_ref (ver `vibe test log`).
+            workers: Pool de workers pytest pré-aquecidos (ver
+                src/worker_pool.py); sem ele, cada arquivo inicia um
+                interpretador novo.
+        """
         self.db = db
+        self.quiet = quiet
+        self.limits = limits or RunLimits()
+        self.selection = set(selection) if selection is not None else None
+        self.retries = retries
+        self.coverage = coverage
+        self.max_error_chars = max_error_chars
+        self.workers = workers
+
+    def is_selected(self, objective_id: str) -> bool:
+        """Indica se o objetivo tem arquivos a executar na seleção atual."""
+        return self.selection is None or any(key[0] == objective_id for key in self.selection)
+
+    def _log(self, message: str) -> None:
+        """Exibe uma mensagem de progresso respeitando o modo quiet."""
+        print(message, file=sys.stderr if self.quiet else sys.stdout)
 
     def run_objective_tests(self, objective_id: str, base_path: Optional[Path] = None) -> Optional[TestSummary]:
         """Executa testes de um objetivo e salva resultados.
@@ -29,10 +448,103 @@ class TestRunner:
         Returns:
             TestSummary se execução bem-sucedida, None caso contrário.
         """
+        result = self.execute_objective(objective_id, base_path)
+        return result[0] if result else None
+
+    def execute_objective(
+        self,
+        objective_id: str,
+        base_path: Optional[Path] = None,
+        deadline: Optional[float] = None,
+    ) -> Optional[Tuple[TestSummary, List[TestRun]]]:
+        """Executa testes de um objetivo e retorna também as execuções individuais.
+
+        Arquivos interrompidos por timeout mantêm os resultados já
+        produzidos; o teste em andamento é registrado como ERROR.
+
+        Args:
+            objective_id: ID do objetivo.
+            base_path: Caminho base para testes (opcional). Se None, usa "tests".
+            deadline: Prazo global (time.monotonic) que limita o orçamento.
+
+        Returns:
+            Tupla (TestSummary, execuções desta rodada) ou None se falhar.
+        """
+        with tracing.span("objective", "runner", objective_id=objective_id):
+            prepared = self._prepare_objective(objective_id, base_path)
+            if prepared is None:
+                return None
+            objective, test_files = prepared
+            started = time.perf_counter()
+
+            test_runs: List[TestRun] = []
+            run_id = str(uuid.uuid4())
+            test_timeout, objective_deadline = self._budget(objective, deadline)
+            coverage: Dict[str, Set[int]] = {}
+            recorded = self.db.count_latest_results_by_file(objective_id)
+
+            # Executar pytest para cada arquivo
+            for test_file in test_files:
+                targets: Optional[List[str]] = None
+                for attempt in range(1, self.retries + 2):
+                    timeout = self._file_timeout(
+                        test_timeout,
+                        objective_deadline,
+                        self._expected_tests(recorded, test_file, targets),
+                    )
+                    if timeout <= 0:
+                        if attempt == 1:
+                            test_runs.append(
+                                self._make_test_run(
+                                    objective_id,
+                                    run_id,
+                                    test_file,
+                                    self._budget_exhausted(test_file),
+                                )
+                            )
+                        break
+                    if targets:
+                        self._log_retry(test_file, targets, attempt)
+                    parser = PytestOutputParser()
+                    coverage_out = self._coverage_file()
+                    with tracing.span("pytest", "runner", file=test_file.name, attempt=attempt):
+                        result = self._run_pytest(
+                            test_file, timeout, test_timeout, targets, parser, coverage_out
+                        )
+                    self._collect_coverage(coverage_out, coverage)
+                    if result is None:
+                        break
+                    test_runs.extend(
+                        self._make_test_run(objective_id, run_id, test_file, item, attempt)
+                        for item in result
+                    )
+                    targets = self._retry_targets(result, parser)
+                    if not targets:
+                        break
+
+            # Salvar resultados
+            with tracing.span("persist", "runner", tests=len(test_runs)):
+                summary = TestSummary.from_test_runs(objective_id, test_runs)
+                self.db.save_test_runs(test_runs)
+                self._record_summary(summary)
+                self._check_durations(test_runs)
+                self._store_coverage(objective_id, coverage)
+            self._record_metrics(objective_id, test_runs, time.perf_counter() - started)
+            return summary, test_runs
+
+    def _prepare_objective(
+        self, objective_id: str, base_path: Optional[Path]
+    ) -> Optional[Tuple[Objective, List[Path]]]:
+        """Localiza o objetivo e seus arquivos de teste.
+
+        Returns:
+            Tupla (objetivo, arquivos de teste) ou None se não houver o
+            que executar (o motivo é exibido no log).
+        """
         # Verificar se objetivo existe
         objective = self.db.get_objective(objective_id)
         if not objective:
-            print(f"❌ Objetivo '{objective_id}' não encontrado.")
+            self._log(f"❌ Objetivo '{objective_id}' não encontrado.")
             return None
 
         # Determinar diretório de testes
@@ -40,205 +552,482 @@ class TestRunner:
             base_path = Path("tests")
         test_dir = base_path / "objectives" / objective_id
         if not test_dir.exists():
-            print(f"❌ Diretório de testes não encontrado: {test_dir}")
+            self._log(f"❌ Diretório de testes não encontrado: {test_dir}")
             return None
 
         # Encontrar arquivos de teste
-        test_files = list(test_dir.glob("*.py"))
+        with tracing.span("glob", "runner", directory=str(test_dir)):
+            test_files = find_test_files(test_dir)
         if not test_files:
-            print(f"⚠️  Nenhum arquivo de teste encontrado em {test_dir}")
+            self._log(f"⚠️  Nenhum arquivo de teste encontrado em {test_dir}")
             return None
+        if self.selection is not None:
+            test_files = [
+                path for path in test_files if (objective_id, path.name) in self.selection
+            ]
+            if not test_files:
+                return None
+        return objective, test_files
 
-        # Executar pytest para cada arquivo
-        summary = TestSummary(objective_id=objective_id)
-        test_runs: List[TestRun] = []
+    def _budget(
+        self, objective: Objective, deadline: Optional[float]
+    ) -> Tuple[Optional[float], Optional[float]]:
+        """Calcula o timeout por teste e o prazo (time.monotonic) do objetivo.
 
-        for test_file in test_files:
-            result = self._run_pytest(test_file)
-            if result is None:
-                continue
+        Os orçamentos do contrato do objetivo têm precedência sobre os
+        limites do runner; o prazo global, se houver, também se aplica.
+        """
+        test_timeout = objective.timeout_teste or self.limits.test_timeout
+        budget = objective.timeout_total or self.limits.objective_timeout
+        deadlines = [d for d in (deadline, time.monotonic() + budget if budget else None) if d]
+        return test_timeout, min(deadlines) if deadlines else None
 
-            # Processar resultados
-            for test_name, status, duration, error_msg in result:
-                test_run = TestRun(
-                    objective_id=objective_id,
-                    test_file=str(test_file.relative_to(Path.cwd())),
-                    test_name=test_name,
-                    status=status,
-                    error_message=error_msg,
-                    duration=duration,
-                )
-                test_runs.append(test_run)
-
-                # Atualizar contagens
-                summary.total_tests += 1
-                if status == TestStatus.PASSED:
-                    summary.passed += 1
-                elif status == TestStatus.FAILED:
-                    summary.failed += 1
-                elif status == TestStatus.SKIPPED:
-                    summary.skipped += 1
-                elif status == TestStatus.ERROR:
-                    summary.error += 1
-
-        # Salvar resultados
-        summary.last_run = datetime.now()
+    def _file_timeout(
+        self, test_timeout: Optional[float], objective_deadline: Optional[float], tests: int = 1
+    ) -> float:
+        """Retorna o tempo disponível para o próximo arquivo.
+
+        Todo arquivo tem um watchdog, mesmo quando só o timeout por teste
+        está definido: o plugin limita setup e chamada a test_timeout e o
+        teardown a outro tanto, mas não a coleta nem um processo travado
+        fora dos testes. O limite é então o de `tests` testes mais uma
+        folga (no mínimo DEFAULT_FILE_TIMEOUT), restrito ao prazo do
+        objetivo, se houver.
+        """
+        remaining = None if objective_deadline is None else objective_deadline - time.monotonic()
+        if not test_timeout:
+            return DEFAULT_FILE_TIMEOUT if remaining is None else remaining
+        limit = max(DEFAULT_FILE_TIMEOUT, tests * 2 * test_timeout + FILE_TIMEOUT_SLACK)
+        return limit if remaining is None else min(limit, remaining)
+
+    def _expected_tests(
+        self, recorded: Dict[str, int], test_file: Path, node_ids: Optional[List[str]]
+    ) -> int:
+        """Quantidade de testes esperada no arquivo, para o watchdog.
+
+        Reexecuções rodam só os node IDs informados; caso contrário vale a
+        maior entre a contagem estática e a da última execução registrada
+        (que inclui parametrizações não literais).
+
+        Args:
+            recorded: Testes por arquivo no último resultado do objetivo
+                (Database.count_latest_results_by_file), lido uma vez por
+                rodada.
+        """
+        if node_ids:
+            return len(node_ids)
+        recorded_tests = recorded.get(self._display_path(test_file), 0)
+        return max(count_test_cases(test_file), recorded_tests)
+
+    def _budget_exhausted(self, test_file: Path) -> TestResult:
+        """Resultado de um arquivo que não chegou a ser executado por falta de tempo."""
+        return (
+            test_file.stem,
+            TestStatus.ERROR,
+            0.0,
+            "Orçamento de tempo esgotado antes da execução do arquivo",
+        )
+
+    def _record_metrics(self, objective_id: str, test_runs: List[TestRun], elapsed: float) -> None:
+        """Atualiza as métricas do processo (src/metrics.py) com a rodada concluída."""
         for run in test_runs:
-            self.db.save_test_run(run)
+            metrics.TESTS.inc(objective=objective_id, status=run.status.value)
+            metrics.TEST_DURATION.observe(run.duration or 0.0)
+        metrics.OBJECTIVE_RUN_DURATION.observe(elapsed)
 
-        # Salvar ou atualizar sumário
-        existing = self.db.get_test_summary(objective_id)
-        if existing:
-            self.db.update_test_summary(objective_id, summary)
-        else:
-            self.db.save_test_summary(summary)
+    def _check_durations(self, test_runs: List[TestRun]) -> None:
+        """Atualiza as regressões de duração dos testes da rodada e avisa as novas."""
+        for regression in self.db.update_duration_regressions(test_runs):
+            self._log(
+                f"🐢 {regression.test_name} ficou mais lento: {regression.duration:.3f}s "
+                f"(mediana {regression.baseline_median:.3f}s, {regression.ratio:.1f}x)"
+            )
+
+    def _record_summary(self, summary: TestSummary) -> None:
+        """Salva o sumário e, se o objetivo mudou entre aprovado e reprovado,
+        recalcula o bloqueio dos objetivos que dependem dele."""
+        previous = self.db.get_test_summary(summary.objective_id)
+        self.db.store_test_summary(summary)
+        if previous is not None and previous.is_passing() == summary.is_passing():
+            return
+        for objective_id, status in dependencies.update_blocking(
+            self.db, self.db.get_dependents(summary.objective_id)
+        ):
+            icon = "🔒" if status == ObjectiveStatus.BLOQUEADO else "🔓"
+            self._log(f"{icon} Objetivo {objective_id[:8]} agora está {status.value}")
 
-        return summary
+    def _blocked_by(self, objective: Objective) -> Optional[Objective]:
+        """Primeira dependência que impede o objetivo de rodar, se houver."""
+        unsatisfied = dependencies.unsatisfied_dependencies(self.db, objective)
+        return unsatisfied[0] if unsatisfied else None
+
+    def _coverage_file(self) -> Optional[Path]:
+        """Arquivo temporário onde o plugin grava a cobertura (se ativada)."""
+        if not self.coverage:
+            return None
+        fd, name = tempfile.mkstemp(prefix="vibe-coverage-", suffix=".json")
+        os.close(fd)
+        return Path(name)
 
-    def _run_pytest(self, test_file: Path) -> Optional[List[tuple]]:
+    def _collect_coverage(
+        self, coverage_out: Optional[Path], coverage: Dict[str, Set[int]]
+    ) -> None:
+        """Acumula a cobertura gravada pelo plugin e remove o arquivo."""
+        if coverage_out is None:
+            return
+        try:
+            text = coverage_out.read_text(encoding="utf-8")
+            data = json.loads(text) if text else {}
+        except (OSError, ValueError):
+            # Processo encerrado antes de gravar (ex.: timeout)
+            data = {}
+        finally:
+            coverage_out.unlink(missing_ok=True)
+        for path, lines in data.items():
+            coverage.setdefault(path, set()).update(lines)
+
+    def _store_coverage(self, objective_id: str, coverage: Dict[str, Set[int]]) -> None:
+        """Substitui a cobertura do objetivo, se alguma foi coletada."""
+        if self.coverage and coverage:
+            self.db.store_objective_coverage(objective_id, coverage)
+
+    def _retry_targets(self, results: List[TestResult], parser: PytestOutputParser) -> List[str]:
+        """Node IDs (sem o arquivo) dos testes que falharam e podem ser reexecutados."""
+        targets: List[str] = []
+        for name, status, _, _ in results:
+            node_id = parser.node_ids.get(name)
+            if (
+                status in (TestStatus.FAILED, TestStatus.ERROR)
+                and node_id
+                and node_id not in targets
+            ):
+                targets.append(node_id)
+        return targets
+
+    def _log_retry(self, test_file: Path, targets: List[str], attempt: int) -> None:
+        """Informa a reexecução de testes que falharam."""
+        self._log(
+            f"🔁 Reexecutando {len(targets)} teste(s) de {test_file.name} (tentativa {attempt})"
+        )
+
+    def _make_test_run(
+        self, objective_id: str, run_id: str, test_file: Path, result: TestResult, attempt: int = 1
+    ) -> TestRun:
+        """Converte um resultado parseado em TestRun."""
+        test_name, status, duration, error_msg = result
+        test_run = TestRun(
+            run_id=run_id,
+            attempt=attempt,
+            objective_id=objective_id,
+            test_file=self._display_path(test_file),
+            test_name=test_name,
+            status=status,
+            error_message=error_msg,
+            duration=duration,
+        )
+        if error_msg:
+            # Falhas repetidas têm o mesmo texto e reaproveitam o mesmo blob
+            test_run.output_ref = self.db.blobs.put(error_msg)
+            if self.max_error_chars:
+                test_run.error_message = truncate_middle(
+                    error_msg,
+                    self.max_error_chars,
+                    f"texto completo: vibe test log {test_run.id[:8]}",
+                )
+        return test_run
+
+    def _display_path(self, test_file: Path) -> str:
+        """Retorna o caminho do arquivo relativo ao diretório atual, se possível."""
+        try:
+            return str(test_file.resolve().relative_to(Path.cwd()))
+        except ValueError:
+            return str(test_file)
+
+    def _pytest_command(self, test_file: Path, node_ids: Optional[List[str]] = None) -> List[str]:
+        """Linha de comando do pytest (com o plugin do Vibe) para um arquivo.
+
+        Com node_ids, apenas esses testes do arquivo são executados.
+        """
+        targets = (
+            [f"{test_file}::{node_id}" for node_id in node_ids] if node_ids else [str(test_file)]
+        )
+        return [
+            sys.executable,
+            str(PYTEST_PLUGIN_SCRIPT),
+            *targets,
+            "-v",
+            "--tb=short",
+            "--disable-warnings",
+        ]
+
+    def _pytest_env(
+        self, test_timeout: Optional[float], coverage_out: Optional[Path] = None
+    ) -> Dict[str, str]:
+        """Ambiente do processo de teste."""
+        return dict(
+            os.environ, PYTHONUNBUFFERED="1", **self._plugin_env(test_timeout, coverage_out)
+        )
+
+    @staticmethod
+    def _plugin_env(
+        test_timeout: Optional[float], coverage_out: Optional[Path] = None
+    ) -> Dict[str, str]:
+        """Variáveis de configuração do plugin (ver src/pytest_plugin.py)."""
+        env: Dict[str, str] = {}
+        if test_timeout:
+            env["VIBE_TEST_TIMEOUT"] = str(test_timeout)
+        if coverage_out is not None:
+            env["VIBE_COVERAGE_OUT"] = str(coverage_out)
+        return env
+
+    def _start_warm(
+        self,
+        test_file: Path,
+        node_ids: Optional[List[str]],
+        test_timeout: Optional[float],
+        coverage_out: Optional[Path],
+    ) -> "WarmProcess":
+        """Inicia o pytest de um arquivo em um worker pré-aquecido."""
+        assert self.workers is not None
+        return self.workers.start(
+            self._pytest_command(test_file, node_ids)[2:],
+            env=self._plugin_env(test_timeout, coverage_out),
+            cpu_seconds=self.limits.cpu_seconds,
+            memory_mb=self.limits.memory_mb,
+        )
+
+    def _run_pytest(
+        self,
+        test_file: Path,
+        timeout: Optional[float] = DEFAULT_FILE_TIMEOUT,
+        test_timeout: Optional[float] = None,
+        node_ids: Optional[List[str]] = None,
+        parser: Optional[PytestOutputParser] = None,
+        coverage_out: Optional[Path] = None,
+    ) -> Optional[List[TestResult]]:
         """Executa pytest em um arquivo e retorna resultados.
 
+        O processo roda em uma sessão própria; em caso de timeout todo o
+        grupo de processos é encerrado e os resultados parciais são mantidos.
+        A saída (stdout e stderr combinados) é lida em blocos por uma
+        thread e parseada linha a linha, sem ser acumulada em memória.
+
         Args:
             test_file: Caminho para o arquivo de teste.
+            timeout: Tempo máximo do arquivo em segundos (None = sem limite).
+            test_timeout: Tempo máximo de cada teste em segundos.
+            node_ids: Executar apenas estes testes do arquivo.
+            parser: Parser a usar (permite consultar node_ids depois).
+            coverage_out: Arquivo onde o plugin grava a cobertura.
 
         Returns:
             Lista de tuplas (test_name, status, duration, error_message)
             ou None se execução falhar.
         """
         try:
-            # Usar subprocess para capturar output
-            result = subprocess.run(
-                [
-                    sys.executable, "-m", "pytest",
-                    str(test_file),
-                    "-v",
-                    "--tb=short",
-                    "--disable-warnings",
-                ],
-                capture_output=True,
-                text=True,
-                timeout=30,
-            )
-            return self._parse_pytest_output(result.stdout, result.stderr)
-        except subprocess.TimeoutExpired:
-            print(f"⏱️  Timeout ao executar {test_file}")
-            return None
-        except Exception as e:
-            print(f"❌ Erro ao executar pytest: {e}")
+            process: "subprocess.Popen[bytes] | WarmProcess"
+            if self.workers is not None:
+                process = self._start_warm(test_file, node_ids, test_timeout, coverage_out)
+            else:
+                process = subprocess.Popen(
+                    self._pytest_command(test_file, node_ids),
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    env=self._pytest_env(test_timeout, coverage_out),
+                    start_new_session=True,
+                    preexec_fn=self.limits.preexec(),
+                )
+        except OSError as e:
+            self._log(f"❌ Erro ao executar pytest: {e}")
             return None
+        metrics.PYTEST_SPAWNS.inc()
 
-    def _parse_pytest_output(self, stdout: str, stderr: str) -> List[Tuple[str, TestStatus, float, Optional[str]]]:
+        parser = parser or PytestOutputParser()
+        capture = OutputCapture()
+        results: List[TestResult] = []
+        assert process.stdout is not None
+        reader = threading.Thread(
+            target=self._read_output, args=(process.stdout, parser, capture, results), daemon=True
+        )
+        reader.start()
+        try:
+            returncode = process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self._kill_process_group(process.pid)
+            process.wait()
+            reader.join()
+            self._log(f"⏱️  Timeout ao executar {test_file} ({timeout:.1f}s)")
+            results.extend(parser.close())
+            results.append(
+                self._interrupted_result(
+                    parser, capture, test_file, f"Timeout: arquivo interrompido após {timeout:.1f}s"
+                )
+            )
+            return results
+        reader.join()
+
+        results.extend(parser.close())
+        if returncode < 0:
+            # Encerrado por sinal (ex.: SIGXCPU ao exceder o limite de CPU)
+            results.append(
+                self._interrupted_result(
+                    parser, capture, test_file, self._signal_reason(test_file, returncode)
+                )
+            )
+        return results
+
+    def _read_output(
+        self,
+        stream: IO[bytes],
+        parser: PytestOutputParser,
+        capture: OutputCapture,
+        results: List[TestResult],
+    ) -> None:
+        """Lê a saída do processo até o fim, acumulando os resultados (thread leitora)."""
+        with tracing.span("parse", "runner"), stream:
+            while True:
+                chunk = stream.read1(READ_CHUNK_BYTES)  # type: ignore[attr-defined]
+                if not chunk:
+                    break
+                results.extend(self._feed_lines(parser, capture, capture.feed(chunk)))
+        results.extend(self._feed_lines(parser, capture, capture.close()))
+
+    @staticmethod
+    def _feed_lines(
+        parser: PytestOutputParser, capture: OutputCapture, lines: List[str]
+    ) -> List[TestResult]:
+        """Passa linhas ao parser, mantendo no buffer circular as do teste em andamento."""
+        results: List[TestResult] = []
+        for line in lines:
+            finished = parser.feed(line)
+            if finished:
+                capture.reset()
+                results.extend(finished)
+            else:
+                capture.remember(line)
+        return results
+
+    def _interrupted_result(
+        self, parser: PytestOutputParser, capture: OutputCapture, test_file: Path, reason: str
+    ) -> TestResult:
+        """ERROR do teste em andamento (ou do arquivo) quando o processo é interrompido.
+
+        A mensagem inclui a saída recente do teste, do buffer circular.
+        """
+        recent = capture.recent().strip()
+        message = f"{reason}\n\nSaída recente:\n{recent}" if recent else reason
+        return (parser.in_progress or test_file.stem, TestStatus.ERROR, 0.0, message)
+
+    def _signal_reason(self, test_file: Path, returncode: int) -> str:
+        """Registra e descreve o encerramento do processo por sinal."""
+        signal_name = signal.Signals(-returncode).name
+        self._log(f"⚠️  Processo de {test_file} encerrado por {signal_name}")
+        return f"Processo encerrado pelo sinal {signal_name}"
+
+    @staticmethod
+    def _kill_process_group(pid: int) -> None:
+        """Encerra o processo de teste e todos os seus descendentes."""
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+    def _parse_pytest_output(
+        self, stdout: str, stderr: str, parser: Optional[PytestOutputParser] = None
+    ) -> List[TestResult]:
         """Parseia output do pytest para extrair resultados.
 
         Args:
             stdout: Saída padrão do pytest.
             stderr: Saída de erro do pytest.
+            parser: Parser a usar (opcional).
 
         Returns:
             Lista de (test_name, status, duration, error_message).
         """
-        results: List[Tuple[str, TestStatus, float, Optional[str]]] = []
-        lines = stdout.split("\n")
-
-        current_test: Optional[str] = None
-        current_status: Optional[TestStatus] = None
-        current_duration: float = 0.0
-        error_lines: List[str] = []
-        in_error = False
-
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-
-            # Detectar início de uma seção de erros
-            if line.startswith("FAILURES") or line.startswith("ERRORS") or line.startswith("===="):
-                in_error = True
-                continue
-            
-            if in_error:
-                # Coletar linhas de erro
-                if line and not line.startswith("===="):
-                    error_lines.append(line)
-                continue
-
-            # Detectar resultado de teste (formato comum do pytest)
-            # Exemplo: "test_file.py::test_name PASSED [ 99%]"
-            # Ou: "test_file.py::test_name FAILED [ 99%]"
-            if "::" in line and ("PASSED" in line or "FAILED" in line or "SKIPPED" in line or "ERROR" in line):
-                # Extrair nome do teste
-                parts = line.split()
-                if len(parts) < 2:
-                    continue
-                    
-                # O nome do teste está antes do primeiro espaço após "::"
-                test_part = parts[0]
-                if "::" in test_part:
-                    test_name = test_part.split("::")[-1]
-                else:
-                    test_name = test_part
-                
-                # Determinar status
-                if "PASSED" in line:
-                    status = TestStatus.PASSED
-                elif "FAILED" in line:
-                    status = TestStatus.FAILED
-                elif "SKIPPED" in line:
-                    status = TestStatus.SKIPPED
-                else:
-                    status = TestStatus.ERROR
-                
-                # Extrair duração
-                duration = 0.0
-                for part in parts:
-                    if part.startswith("[") and "s]" in part:
-                        # Encontrar o número antes de 's'
-                        match = re.search(r'\[([\d.]+)s\]', part)
-                        if match:
-                            try:
-                                duration = float(match.group(1))
-                            except ValueError:
-                                pass
-                        break
-                
-                # Salvar teste anterior se houver
-                if current_test and current_status:
-                    error_msg = "\n".join(error_lines) if error_lines else None
-                    results.append((current_test, current_status, current_duration, error_msg))
-                    error_lines = []
-                
-                # Iniciar novo teste
-                current_test = test_name
-                current_status = status
-                current_duration = duration
-            
-            # Coletar linhas de erro para o teste atual
-            elif current_test and current_status in [TestStatus.FAILED, TestStatus.ERROR]:
-                if line and not line.startswith("---"):
-                    error_lines.append(line)
-
-        # Adicionar último teste
-        if current_test and current_status:
-            error_msg = "\n".join(error_lines) if error_lines else None
-            results.append((current_test, current_status, current_duration, error_msg))
-
+        parser = parser or PytestOutputParser()
+        results = parser.feed_text(stdout)
+        results.extend(parser.close())
         return results
 
-    def run_all_tests(self) -> Dict[str, TestSummary]:
+    def run_all_tests(
+        self, deadline: Optional[float] = None, fail_fast: bool = False
+    ) -> Dict[str, TestSummary]:
         """Executa testes de todos os objetivos.
 
+        Args:
+            deadline: Prazo global em segundos para toda a execução.
+            fail_fast: Interrompe após o primeiro objetivo com falha.
+
         Returns:
             Dicionário {objective_id: TestSummary}.
         """
-        objectives = self.db.list_objectives()
         summaries = {}
 
-        for obj in objectives:
-            print(f"🧪 Executando testes para: {obj.nome}")
-            summary = self.run_objective_tests(obj.id)
-            if summary:
-                summaries[obj.id] = summary
-                status = "✅" if summary.is_passing() else "❌"
-                print(f"   {status} {summary.passed}/{summary.total_tests} testes passando")
+        for obj, summary, _ in self.iter_all_tests(deadline, fail_fast):
+            summaries[obj.id] = summary
+            status = "✅" if summary.is_passing() else "❌"
+            self._log(f"   {status} {summary.passed}/{summary.total_tests} testes passando")
 
         return summaries
+
+    def iter_all_tests(
+        self, deadline: Optional[float] = None, fail_fast: bool = False
+    ) -> Iterator[Tuple[Objective, TestSummary, List[TestRun]]]:
+        """Executa testes de todos os objetivos, produzindo cada resultado ao concluir.
+
+        Objetivos sem testes executáveis são omitidos. Os objetivos rodam
+        por nível do grafo de dependências (dependências antes); dentro do
+        nível, a ordem segue schedule_objectives. Dependentes de objetivos
+        que falharam (ou estão bloqueados) são pulados.
+
+        Args:
+            deadline: Prazo global em segundos. Ao esgotar, objetivos
+                restantes não são iniciados.
+            fail_fast: Interrompe após o primeiro objetivo com falha.
+
+        Yields:
+            Tuplas (objetivo, sumário, execuções desta rodada).
+        """
+        global_deadline = time.monotonic() + deadline if deadline else None
+        objectives = [obj for level in self._scheduled_levels() for obj in level]
+        for index, obj in enumerate(objectives):
+            if global_deadline is not None and time.monotonic() >= global_deadline:
+                self._log(
+                    f"⏱️  Prazo global esgotado: {len(objectives) - index} "
+                    "objetivo(s) não executado(s)"
+                )
+                return
+            blocker = self._blocked_by(obj)
+            if blocker is not None:
+                self._log(
+                    f"⏭️  Pulando {obj.nome}: depende de '{blocker.nome}', "
+                    "que falhou ou está bloqueado"
+                )
+                continue
+            self._log(f"🧪 Executando testes para: {obj.nome}")
+            result = self.execute_objective(obj.id, deadline=global_deadline)
+            if result:
+                yield obj, result[0], result[1]
+                remaining = len(objectives) - index - 1
+                if fail_fast and not result[0].is_passing() and remaining:
+                    self._log(f"🛑 --fail-fast: {remaining} objetivo(s) não executado(s)")
+                    return
+
+    def _scheduled_levels(self) -> List[List[Objective]]:
+        """Objetivos da seleção atual, por nível do grafo e na ordem de execução.
+
+        Raises:
+            DependencyCycleError: Se as dependências formarem um ciclo.
+        """
+        objectives = {obj.id: obj for obj in self.db.list_objectives() if self.is_selected(obj.id)}
+        graph = {obj.id: obj.dependencias for obj in objectives.values()}
+        summaries = self.db.get_test_summaries()
+        durations = self.db.get_objective_durations()
+        return [
+            schedule_objectives([objectives[oid] for oid in level], summaries, durations)
+            for level in dependencies.topological_levels(objectives, graph)
+        ]
@@ -0,0 +1,170 @@
+"""Spans de rastreamento exportados no formato Chrome trace-event (JSON).
+
+O arquivo gerado por `vibe test run --trace ARQUIVO` abre no Perfetto
+(ui.perfetto.dev) ou em chrome://tracing. Com o rastreamento desligado,
+`span()` devolve um objeto nulo compartilhado: o custo é uma chamada de
+função e um teste de flag.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Eventos mantidos em memória; os excedentes são descartados (e contados)
+MAX_EVENTS = 500_000
+
+
+class _NullSpan:
+    """Span usado com o rastreamento desligado."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """Intervalo medido; vira um evento completo ("ph": "X") ao terminar."""
+
+    __slots__ = ("tracer", "name", "category", "args", "started")
+
+    def __init__(self, tracer: "Tracer", name: str, category: str, args: Dict[str, Any]) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.started = 0
+
+    def __enter__(self) -> "_Span":
+        self.started = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer._record(self, time.perf_counter_ns())
+
+
+class Tracer:
+    """Coleta spans em memória e os exporta como Chrome trace-event JSON.
+
+    Cada thread, e cada tarefa asyncio, vira uma trilha (tid) própria:
+    spans de arquivos executados em paralelo pelo runner assíncrono
+    aparecem lado a lado em vez de sobrepostos na mesma trilha.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.dropped = 0
+        self._events: List[Dict[str, Any]] = []
+        self._origin = 0
+        self._tracks: Dict[Any, int] = {}
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Liga o rastreamento, descartando eventos anteriores."""
+        self._events = []
+        self._tracks = {}
+        self.dropped = 0
+        self._origin = time.perf_counter_ns()
+        self.enabled = True
+
+    def stop(self) -> None:
+        self.enabled = False
+
+    def span(self, name: str, category: str = "vibe", **args: Any) -> Any:
+        """Context manager que mede o bloco como um span (nulo se desligado)."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, category, args)
+
+    def _track(self) -> int:
+        """Trilha do chamador: a tarefa asyncio corrente ou a thread."""
+        try:
+            key: Any = asyncio.current_task()
+        except RuntimeError:
+            key = None
+        thread = threading.current_thread()
+        if key is None:
+            key = thread
+        track = self._tracks.get(key)
+        if track is None:
+            with self._lock:
+                track = self._tracks.setdefault(key, len(self._tracks) + 1)
+                label = key.get_name() if isinstance(key, asyncio.Task) else thread.name
+                self._events.append(
+                    {
+                        "ph": "M",
+                        "name": "thread_name",
+                        "pid": os.getpid(),
+                        "tid": track,
+                        "args": {"name": label},
+                    }
+                )
+        return track
+
+    def _record(self, span: _Span, finished: int) -> None:
+        if len(self._events) >= MAX_EVENTS:
+            self.dropped += 1
+            return
+        event: Dict[str, Any] = {
+            "ph": "X",
+            "name": span.name,
+            "cat": span.category,
+            "ts": (span.started - self._origin) / 1000,
+            "dur": (finished - span.started) / 1000,
+            "pid": os.getpid(),
+            "tid": self._track(),
+        }
+        if span.args:
+            event["args"] = span.args
+        self._events.append(event)
+
+    def export(self, path: Path) -> int:
+        """Grava os eventos coletados em `path`.
+
+        Returns:
+            Quantidade de spans gravados.
+        """
+        events = [
+            {"ph": "M", "name": "process_name", "pid": os.getpid(), "args": {"name": "vibe"}},
+            *self._events,
+        ]
+        document: Dict[str, Any] = {"traceEvents": events, "displayTimeUnit": "ms"}
+        if self.dropped:
+            document["otherData"] = {"dropped_spans": self.dropped}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(document, ensure_ascii=False, default=str), encoding="utf-8")
+        return sum(1 for event in self._events if event["ph"] == "X")
+
+
+# Rastreador do processo
+TRACER = Tracer()
+
+
+def span(name: str, category: str = "vibe", **args: Any) -> Any:
+    """Span no rastreador do processo (ver Tracer.span)."""
+    if not TRACER.enabled:
+        return _NULL_SPAN
+    return _Span(TRACER, name, category, args)
+
+
+def start() -> None:
+    TRACER.start()
+
+
+def export(path: Path, stop: bool = True) -> int:
+    """Exporta o rastreador do processo (e o desliga, por padrão)."""
+    if stop:
+        TRACER.stop()
+    return TRACER.export(path)
@@ -1,10 +1,92 @@
 """Validador de estrutura canônica do projeto."""
 
+import hashlib
+import json
+import os
+import subprocess
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List
+from typing import Any, Callable, Collection, Dict, Iterable, List, Optional, Set, Tuple, Union
 
-from src.database import Database
-from src.models import ObjectiveStatus
+from src import metrics
+from src.database import CachedValidation, Database, DurationRegression
+from src.models import Objective, ObjectiveStatus, TestSummary
+
+# Incrementar quando as regras mudarem, invalidando o cache de validação
+VALIDATION_CACHE_VERSION = 1
+
+# Intervalo sem execução a partir do qual um objetivo ATIVO gera aviso
+STALE_TESTS_AFTER = timedelta(hours=24)
+
+
+@dataclass
+class CheckReport:
+    """Resultado de `vibe project check`.
+
+    evaluated e reused contam as avaliações (regra, objetivo) refeitas e as
+    aproveitadas do cache de validação.
+    """
+
+    structure_errors: List[str] = field(default_factory=list)
+    integrity_errors: List[str] = field(default_factory=list)
+    health_problems: List[str] = field(default_factory=list)
+    performance_warnings: List[str] = field(default_factory=list)
+    summaries: Dict[str, TestSummary] = field(default_factory=dict)
+    objectives: List[Objective] = field(default_factory=list)
+    evaluated: int = 0
+    reused: int = 0
+
+
+# Uma regra por objetivo: (impressão digital das entradas, avaliação)
+# A avaliação devolve (problemas, validade opcional do resultado)
+Rule = Tuple[
+    Callable[[Objective], str],
+    Callable[[Objective], Tuple[List[str], Optional[datetime]]],
+]
+
+
+def affected_objectives(paths: Iterable[str], project_path: Path = Path(".")) -> Set[str]:
+    """Mapeia caminhos alterados para os objetivos afetados.
+
+    Um caminho afeta o objetivo <id> quando está sob tests/objectives/<id>/.
+    Caminhos relativos são resolvidos a partir do diretório atual;
+    caminhos fora do projeto são ignorados.
+    """
+    root = project_path.resolve()
+    objective_ids: Set[str] = set()
+    for raw in paths:
+        try:
+            parts = Path(raw).resolve().relative_to(root).parts
+        except ValueError:
+            continue
+        if len(parts) > 3 and parts[:2] == ("tests", "objectives"):
+            objective_ids.add(parts[2])
+    return objective_ids
+
+
+def staged_paths(project_path: Path = Path(".")) -> List[str]:
+    """Caminhos no índice do git (staged), relativos ao diretório atual.
+
+    Raises:
+        OSError: Se o git não estiver disponível.
+        subprocess.CalledProcessError: Se o projeto não estiver em um repositório.
+    """
+    result = subprocess.run(
+        ["git", "diff", "--cached", "--name-only", "--relative", "-z"],
+        cwd=project_path,
+        capture_output=True,
+        check=True,
+    )
+    names = result.stdout.decode("utf-8", errors="surrogateescape").split("\0")
+    return [str(project_path / name) for name in names if name]
+
+
+def _fingerprint(*parts: Any) -> str:
+    """Resume as entradas de uma regra em um hash estável."""
+    payload = json.dumps([VALIDATION_CACHE_VERSION, *parts], ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
 
 
 class StructureValidator:
@@ -56,33 +138,51 @@ class StructureValidator:
             return errors
         
         db = Database(db_path)
-        objectives = db.list_objectives()
-        
-        for obj in objectives:
-            test_dir = self.project_path / "tests" / "objectives" / obj.id
-            if not test_dir.exists():
-                errors.append(f"Objetivo '{obj.nome}' ({obj.id}) não tem diretório de testes")
-                continue
-            # Verificar se há pelo menos um arquivo .py
-            test_files = list(test_dir.glob("*.py"))
-            if not test_files:
-                errors.append(f"Objetivo '{obj.nome}' ({obj.id}) não tem arquivos de teste")
-                continue
-            # Verificar se os testes são executáveis (pelo menos contêm 'def test_')
-            has_test_func = False
-            for tf in test_files:
-                try:
-                    content = tf.read_text(encoding="utf-8")
-                    if "def test_" in content:
-                        has_test_func = True
-                        break
-                except Exception:
-                    pass
-            if not has_test_func:
-                errors.append(f"Objetivo '{obj.nome}' ({obj.id}) não tem funções de teste válidas")
-        
+        for obj in db.list_objectives():
+            errors.extend(self._integrity_problems(obj))
         return errors
 
+    def _test_dir(self, objective_id: str) -> Path:
+        return self.project_path / "tests" / "objectives" / objective_id
+
+    def _integrity_problems(self, obj: Objective) -> List[str]:
+        """Regra de integridade: o objetivo tem testes executáveis."""
+        test_dir = self._test_dir(obj.id)
+        if not test_dir.exists():
+            return [f"Objetivo '{obj.nome}' ({obj.id}) não tem diretório de testes"]
+        # Verificar se há pelo menos um arquivo .py
+        test_files = list(test_dir.glob("*.py"))
+        if not test_files:
+            return [f"Objetivo '{obj.nome}' ({obj.id}) não tem arquivos de teste"]
+        # Verificar se os testes são executáveis (pelo menos contêm 'def test_')
+        for tf in test_files:
+            try:
+                if "def test_" in tf.read_text(encoding="utf-8"):
+                    return []
+            except Exception:
+                pass
+        return [f"Objetivo '{obj.nome}' ({obj.id}) não tem funções de teste válidas"]
+
+    def _integrity_fingerprint(self, obj: Objective) -> str:
+        """Entradas da regra de integridade: nome e stat dos arquivos .py.
+
+        Adicionar, remover ou editar um arquivo altera mtime/tamanho, como
+        no índice do git; o conteúdo só é lido quando a regra é reavaliada.
+        """
+        files: Union[List[Tuple[str, int, int]], str, None]
+        try:
+            with os.scandir(self._test_dir(obj.id)) as entries:
+                files = sorted(
+                    (entry.name, entry.stat().st_mtime_ns, entry.stat().st_size)
+                    for entry in entries
+                    if entry.name.endswith(".py")
+                )
+        except FileNotFoundError:
+            files = None
+        except NotADirectoryError:
+            files = "not-a-dir"
+        return _fingerprint(obj.id, obj.nome, files)
+
     def check_test_health(self) -> List[str]:
         """Valida a saúde dos testes de todos os objetivos.
 
@@ -95,44 +195,169 @@ class StructureValidator:
             return problems
         
         db = Database(db_path)
-        objectives = db.list_objectives()
-        
-        for obj in objectives:
-            # Verificar se tem testes gerados
-            test_dir = self.project_path / "tests" / "objectives" / obj.id
-            if not test_dir.exists():
-                problems.append(f"Objetivo '{obj.nome}' ({obj.id}) não tem testes gerados")
-                continue
-            
-            # Verificar se testes foram executados
-            summary = db.get_test_summary(obj.id)
-            if not summary:
-                problems.append(f"Objetivo '{obj.nome}' ({obj.id}) nunca teve testes executados")
-                continue
-            
-            # Verificar se testes estão passando
-            if not summary.is_passing():
-                problems.append(
-                    f"Objetivo '{obj.nome}' ({obj.id}) tem testes falhando "
-                    f"({summary.failed + summary.error}/{summary.total_tests})"
-                )
-            
-            # Verificar se objetivo marcado como CONCLUIDO mas testes falhando
-            if obj.status == ObjectiveStatus.CONCLUIDO and not summary.is_passing():
+        summaries = db.get_test_summaries()
+        now = datetime.now()
+        for obj in db.list_objectives():
+            problems.extend(self._health_problems(obj, summaries.get(obj.id), now)[0])
+        return problems
+
+    def _health_problems(
+        self, obj: Objective, summary: Optional[TestSummary], now: datetime
+    ) -> Tuple[List[str], Optional[datetime]]:
+        """Regra de saúde dos testes de um objetivo.
+
+        Returns:
+            Tupla (problemas, instante em que o resultado expira ou None).
+        """
+        problems: List[str] = []
+        # Verificar se tem testes gerados
+        if not self._test_dir(obj.id).exists():
+            return [f"Objetivo '{obj.nome}' ({obj.id}) não tem testes gerados"], None
+
+        # Verificar se testes foram executados
+        if not summary:
+            return [f"Objetivo '{obj.nome}' ({obj.id}) nunca teve testes executados"], None
+
+        # Verificar se testes estão passando
+        if not summary.is_passing():
+            problems.append(
+                f"Objetivo '{obj.nome}' ({obj.id}) tem testes falhando "
+                f"({summary.failed + summary.error}/{summary.total_tests})"
+            )
+
+        # Verificar se objetivo marcado como CONCLUIDO mas testes falhando
+        if obj.status == ObjectiveStatus.CONCLUIDO and not summary.is_passing():
+            problems.append(
+                f"Objetivo '{obj.nome}' ({obj.id}) marcado como CONCLUIDO "
+                f"mas {summary.failed + summary.error} teste(s) falhando"
+            )
+
+        # Verificar se objetivo ATIVO sem testes executados há mais de 24h.
+        # O resultado depende do relógio: vale até o próximo dia completo.
+        valid_until = None
+        if obj.status == ObjectiveStatus.ATIVO:
+            time_diff = now - summary.last_run
+            valid_until = summary.last_run + timedelta(days=time_diff.days + 1)
+            if time_diff > STALE_TESTS_AFTER:
                 problems.append(
-                    f"Objetivo '{obj.nome}' ({obj.id}) marcado como CONCLUIDO "
-                    f"mas {summary.failed + summary.error} teste(s) falhando"
+                    f"Objetivo '{obj.nome}' ({obj.id}) ATIVO mas testes não executados "
+                    f"há {time_diff.days} dias"
                 )
-            
-            # Verificar se objetivo ATIVO sem testes executados há mais de 24h
-            if obj.status == ObjectiveStatus.ATIVO:
-                from datetime import datetime, timedelta
-                now = datetime.now()
-                time_diff = now - summary.last_run
-                if time_diff > timedelta(hours=24):
-                    problems.append(
-                        f"Objetivo '{obj.nome}' ({obj.id}) ATIVO mas testes não executados "
-                        f"há {time_diff.days} dias"
-                    )
-        
-        return problems
+        return problems, valid_until
+
+    def _performance_warnings(
+        self, obj: Objective, regressions: List[DurationRegression]
+    ) -> List[str]:
+        """Avisos de desempenho: testes do objetivo com regressão de duração em aberto."""
+        return [
+            f"Objetivo '{obj.nome}' ({obj.id}): {item.test_name} ficou mais lento "
+            f"({item.baseline_median:.3f}s → {item.duration:.3f}s, {item.ratio:.1f}x a mediana)"
+            for item in regressions
+        ]
+
+    def _health_fingerprint(self, obj: Objective, summary: Optional[TestSummary]) -> str:
+        """Entradas da regra de saúde: objetivo, diretório de testes e sumário."""
+        return _fingerprint(
+            obj.id,
+            obj.nome,
+            obj.status.value,
+            self._test_dir(obj.id).exists(),
+            summary.to_dict() if summary else None,
+        )
+
+    def run_checks(
+        self, full: bool = False, objective_ids: Optional[Collection[str]] = None
+    ) -> CheckReport:
+        """Executa todas as regras de `vibe project check`.
+
+        Os resultados por (regra, objetivo) ficam em cache no banco junto
+        com a impressão digital das entradas; só são reavaliados os
+        objetivos cujas entradas mudaram ou cujo resultado expirou.
+        A estrutura canônica é sempre verificada (custa o mesmo que
+        calcular sua impressão digital).
+
+        Args:
+            full: Ignora o cache e reavalia todas as regras.
+            objective_ids: Verifica apenas estes objetivos (modo --changed):
+                a estrutura canônica não é validada e IDs inexistentes
+                são ignorados.
+
+        Returns:
+            CheckReport com os problemas de cada regra.
+        """
+        report = CheckReport()
+        if objective_ids is None:
+            started = time.perf_counter()
+            report.structure_errors = self.validate_canonical_structure()
+            metrics.VALIDATOR_SCAN_DURATION.observe(
+                time.perf_counter() - started, check="structure"
+            )
+        elif not objective_ids:
+            return report
+        db_path = self.project_path / "state" / "vibe.db"
+        if not db_path.exists():
+            return report
+
+        db = Database(db_path)
+        if objective_ids is None:
+            report.objectives = db.list_objectives()
+            report.summaries = db.get_test_summaries()
+        else:
+            for objective_id in sorted(objective_ids):
+                obj = db.get_objective(objective_id)
+                summary = db.get_test_summary(objective_id) if obj else None
+                if obj:
+                    report.objectives.append(obj)
+                if summary:
+                    report.summaries[objective_id] = summary
+        now = datetime.now()
+        rules: Dict[str, Rule] = {
+            "integrity": (
+                self._integrity_fingerprint,
+                lambda obj: (self._integrity_problems(obj), None),
+            ),
+            "health": (
+                lambda obj: self._health_fingerprint(obj, report.summaries.get(obj.id)),
+                lambda obj: self._health_problems(obj, report.summaries.get(obj.id), now),
+            ),
+        }
+        results: Dict[str, List[str]] = {}
+        for rule, (fingerprint_of, evaluate) in rules.items():
+            started = time.perf_counter()
+            evaluated, reused = report.evaluated, report.reused
+            subjects = None if objective_ids is None else [obj.id for obj in report.objectives]
+            cached = db.get_validation_results(rule, subjects)
+            changed: List[CachedValidation] = []
+            problems: List[str] = []
+            for obj in report.objectives:
+                fingerprint = fingerprint_of(obj)
+                entry = cached.pop(obj.id, None)
+                if (
+                    full
+                    or entry is None
+                    or entry.fingerprint != fingerprint
+                    or (entry.valid_until is not None and now >= entry.valid_until)
+                ):
+                    found, valid_until = evaluate(obj)
+                    entry = CachedValidation(obj.id, fingerprint, found, valid_until)
+                    changed.append(entry)
+                    report.evaluated += 1
+                else:
+                    report.reused += 1
+                problems.extend(entry.problems)
+            # Sobras do cache são objetivos removidos
+            db.save_validation_results(rule, changed, stale_subjects=cached)
+            results[rule] = problems
+            metrics.VALIDATOR_SCAN_DURATION.observe(time.perf_counter() - started, check=rule)
+            metrics.VALIDATOR_EVALUATIONS.inc(report.evaluated - evaluated, result="evaluated")
+            metrics.VALIDATOR_EVALUATIONS.inc(report.reused - reused, result="reused")
+
+        report.integrity_errors = results["integrity"]
+        report.health_problems = results["health"]
+        # Sem cache: as regressões em aberto são lidas em uma consulta
+        regressions = db.get_duration_regressions(objective_ids)
+        for obj in report.objectives:
+            report.performance_warnings.extend(
+                self._performance_warnings(obj, regressions.get(obj.id, []))
+            )
+        return report
@@ -0,0 +1,287 @@
+"""Pool de servidores pytest pré-aquecidos (ver src/pytest_server.py).
+
+Cada worker é um processo de longa duração que já importou o pytest e
+os plugins; a cada arquivo de teste ele faz um fork, e o filho executa
+o pytest com a saída ligada a um pipe do runner. O TestRunner lê essa
+saída exatamente como a de um processo iniciado com subprocess, mas sem
+pagar a inicialização do interpretador e os imports a cada arquivo.
+
+O worker em si não acumula estado entre execuções (conftest, módulos
+de teste e plugins do projeto são carregados apenas nos filhos), por
+isso não é reciclado; só é substituído quando encerra ou deixa de
+responder.
+"""
+
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import IO, Any, Dict, List, Optional
+
+from src import metrics, pytest_server
+
+# Script do servidor, executado com o interpretador atual
+PYTEST_SERVER_SCRIPT = Path(pytest_server.__file__).resolve()
+
+# Tempo máximo para um worker iniciar um processo (inclui o aquecimento)
+START_TIMEOUT = 60.0
+
+# fork e passagem de descritores por socket (SCM_RIGHTS) são exigidos
+SUPPORTED = hasattr(os, "fork") and hasattr(socket, "send_fds")
+
+
+class WorkerError(OSError):
+    """Falha de comunicação com um worker (processo encerrado ou resposta inválida)."""
+
+
+class _Worker:
+    """Servidor pytest e seu canal de controle."""
+
+    def __init__(self, env: Dict[str, str]) -> None:
+        self.socket, child = socket.socketpair()
+        try:
+            self.process = subprocess.Popen(
+                [sys.executable, str(PYTEST_SERVER_SCRIPT), str(child.fileno())],
+                pass_fds=(child.fileno(),),
+                stdin=subprocess.DEVNULL,
+                env=env,
+            )
+        except BaseException:
+            self.socket.close()
+            raise
+        finally:
+            child.close()
+        self._buffer = bytearray()
+
+    def request(self, message: Dict[str, Any], output: int) -> int:
+        """Envia um pedido com o descritor de saída e retorna o pid do filho."""
+        try:
+            socket.send_fds(self.socket, [json.dumps(message).encode() + b"\n"], [output])
+        except OSError as e:
+            raise WorkerError(f"worker pytest indisponível: {e}") from e
+        reply = self.receive(START_TIMEOUT)
+        if "pid" not in reply:
+            raise WorkerError(f"worker pytest recusou o pedido: {reply.get('error', reply)}")
+        return int(reply["pid"])
+
+    def receive(self, timeout: Optional[float]) -> Dict[str, Any]:
+        """Lê a próxima resposta; socket.timeout se ela não chegar a tempo."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while b"\n" not in self._buffer:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise socket.timeout("timed out")
+            self.socket.settimeout(remaining)
+            try:
+                data = self.socket.recv(64 * 1024)
+            except socket.timeout:
+                raise
+            except OSError as e:
+                raise WorkerError(f"worker pytest encerrado: {e}") from e
+            if not data:
+                raise WorkerError("worker pytest encerrado")
+            self._buffer.extend(data)
+        line, _, rest = bytes(self._buffer).partition(b"\n")
+        self._buffer[:] = rest
+        reply: Dict[str, Any] = json.loads(line)
+        return reply
+
+    def close(self) -> None:
+        """Encerra o servidor (ele sai ao ver o socket fechado)."""
+        self.socket.close()
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+class WarmProcess:
+    """Processo pytest iniciado por um worker, com a interface usada do Popen.
+
+    stdout é a saída combinada (stdout e stderr) do processo; wait()
+    devolve o código de saída, negativo quando encerrado por sinal.
+    """
+
+    def __init__(self, pool: "WorkerPool", worker: _Worker, pid: int, stdout: IO[bytes]) -> None:
+        self.pid = pid
+        self.stdout = stdout
+        self.returncode: Optional[int] = None
+        self._pool = pool
+        self._worker: Optional[_Worker] = worker
+        self._lock = threading.Lock()
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        # Pode ser chamado de mais de uma thread (runner assíncrono): só
+        # uma lê a resposta do worker, as demais veem o código já lido
+        with self._lock:
+            if self.returncode is not None:
+                return self.returncode
+            assert self._worker is not None
+            try:
+                reply = self._worker.receive(timeout)
+            except socket.timeout:
+                raise subprocess.TimeoutExpired(f"pytest (pid {self.pid})", timeout or 0) from None
+            except (WorkerError, ValueError):
+                # O servidor caiu com o filho em andamento: resultado desconhecido
+                self.returncode = -signal.SIGKILL
+                self._pool._release(self._worker, broken=True)
+            else:
+                self.returncode = int(reply.get("returncode", 1))
+                self._pool._release(self._worker)
+            self._worker = None
+            return self.returncode
+
+
+class WorkerPool:
+    """Conjunto de workers pytest pré-aquecidos, compartilhado entre objetivos.
+
+    Os workers são iniciados na criação do pool, para que o aquecimento
+    ocorra enquanto o runner prepara o primeiro objetivo. Cada worker
+    atende um processo por vez; start() espera um worker livre.
+    """
+
+    def __init__(
+        self,
+        size: int = 1,
+        env: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """Inicializa o pool.
+
+        Args:
+            size: Quantidade de workers (processos pytest simultâneos).
+            env: Ambiente dos workers (padrão: o do processo atual).
+        """
+        if not SUPPORTED:
+            raise RuntimeError("Workers pytest exigem fork e passagem de descritores (POSIX)")
+        self.size = max(1, size)
+        self.env = dict(os.environ if env is None else env, PYTHONUNBUFFERED="1")
+        self.replaced = 0
+        self._idle: List[_Worker] = []
+        self._busy = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        for _ in range(self.size):
+            self._idle.append(_Worker(self.env))
+
+    def start(
+        self,
+        args: List[str],
+        env: Optional[Dict[str, str]] = None,
+        cpu_seconds: Optional[int] = None,
+        memory_mb: Optional[int] = None,
+    ) -> WarmProcess:
+        """Inicia `pytest.main(args)` em um worker livre.
+
+        Args:
+            args: Argumentos do pytest (alvos e opções).
+            env: Variáveis acrescentadas ao ambiente do processo.
+            cpu_seconds: Limite de CPU do processo (RLIMIT_CPU).
+            memory_mb: Limite de memória do processo (RLIMIT_AS).
+
+        Raises:
+            WorkerError: Se nenhum worker conseguir iniciar o processo.
+        """
+        message = {
+            "args": args,
+            "env": env or {},
+            "cpu_seconds": cpu_seconds,
+            "memory_mb": memory_mb,
+        }
+        worker: Optional[_Worker] = self._acquire()
+        read_fd, write_fd = os.pipe()
+        try:
+            for attempt in (1, 2):
+                assert worker is not None
+                try:
+                    pid = worker.request(message, write_fd)
+                    break
+                except (WorkerError, socket.timeout) as e:
+                    self._release(worker, broken=True)
+                    worker = None
+                    if attempt == 2:
+                        raise WorkerError(f"worker pytest não iniciou o processo: {e}") from e
+                    # Worker caído (ex.: morto por fora): tenta uma vez com o substituto
+                    worker = self._acquire()
+        except BaseException:
+            os.close(read_fd)
+            if worker is not None:
+                self._release(worker, broken=True)
+            raise
+        finally:
+            os.close(write_fd)
+        assert worker is not None
+        return WarmProcess(self, worker, pid, os.fdopen(read_fd, "rb"))
+
+    def _acquire(self) -> _Worker:
+        """Reserva um worker ocioso, iniciando um novo se houver vaga sem worker."""
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise WorkerError("pool de workers pytest encerrado")
+                if self._idle:
+                    self._busy += 1
+                    return self._idle.pop()
+                if self._busy < self.size:
+                    self._busy += 1
+                    break
+                self._condition.wait()
+        try:
+            return _Worker(self.env)
+        except BaseException:
+            with self._condition:
+                self._busy -= 1
+                self._condition.notify()
+            raise
+
+    def _release(self, worker: _Worker, broken: bool = False) -> None:
+        """Devolve o worker ao pool, substituindo-o se estiver quebrado."""
+        if not broken:
+            with self._condition:
+                self._busy -= 1
+                self._condition.notify()
+                if not self._closed:
+                    self._idle.append(worker)
+                    return
+            worker.close()
+            return
+
+        metrics.PYTEST_WORKER_REPLACEMENTS.inc()
+        self.replaced += 1
+        worker.close()
+        # A vaga continua reservada enquanto o substituto é iniciado; ele
+        # aquece em segundo plano enquanto os demais trabalham
+        replacement: Optional[_Worker] = None
+        if not self._closed:
+            try:
+                replacement = _Worker(self.env)
+            except OSError:
+                replacement = None
+        with self._condition:
+            self._busy -= 1
+            if replacement is not None and not self._closed:
+                self._idle.append(replacement)
+                replacement = None
+            self._condition.notify()
+        if replacement is not None:
+            replacement.close()
+
+    def close(self) -> None:
+        """Encerra os workers ociosos; os ocupados encerram ao terminar."""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._condition.notify_all()
+        for worker in idle:
+            worker.close()
+
+    def __enter__(self) -> "WorkerPool":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
@@ -0,0 +1,163 @@
+"""Workspace: vários projetos vibe registrados em um índice central."""
+
+import asyncio
+import os
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.database import Database, ProjectHealth, WorkspaceProject
+
+# Variável de ambiente com o caminho do índice do workspace
+INDEX_ENV = "VIBE_WORKSPACE"
+
+# Índice usado quando a variável não está definida
+DEFAULT_INDEX_PATH = Path.home() / ".vibe" / "workspace.db"
+
+# Comandos executáveis em todos os projetos: nome → argumentos da CLI
+COMMANDS: Dict[str, List[str]] = {
+    "check": ["project", "check"],
+    "test": ["test", "run", "--all"],
+}
+
+# Caracteres finais da saída de cada projeto guardados no índice
+OUTPUT_TAIL_CHARS = 4000
+
+# Raiz do pacote, para os subprocessos importarem `src` de qualquer diretório
+_PACKAGE_ROOT = Path(__file__).resolve().parent.parent
+
+
+@dataclass
+class ProjectRun:
+    """Resultado de um comando executado em um projeto do workspace."""
+
+    project: str
+    command: str
+    exit_code: int
+    duration: float
+    output: str
+
+
+def index_path() -> Path:
+    """Caminho do índice do workspace ($VIBE_WORKSPACE ou ~/.vibe/workspace.db)."""
+    configured = os.environ.get(INDEX_ENV)
+    return Path(configured) if configured else DEFAULT_INDEX_PATH
+
+
+def project_db_path(root: Path) -> Path:
+    """Banco (shard) de um projeto."""
+    return root / "state" / "vibe.db"
+
+
+class Workspace:
+    """Registra projetos e executa comandos em todos eles em paralelo.
+
+    O índice é um banco vibe com as tabelas workspace_projects e
+    workspace_runs; cada projeto continua com o próprio state/vibe.db,
+    anexado ao índice apenas para consultas entre projetos.
+    """
+
+    def __init__(self, db: Database) -> None:
+        """Inicializa o workspace sobre o banco do índice."""
+        self.db = db
+
+    def add(self, root: Path, name: Optional[str] = None) -> WorkspaceProject:
+        """Registra um projeto.
+
+        Args:
+            root: Diretório raiz do projeto.
+            name: Nome no workspace (padrão: nome do diretório).
+
+        Raises:
+            ValueError: Se o diretório não existir ou o nome/raiz já estiver registrado.
+        """
+        root = root.resolve()
+        if not root.is_dir():
+            raise ValueError(f"Diretório não encontrado: {root}")
+        name = name or root.name
+        if not self.db.register_project(name, root):
+            raise ValueError(f"Projeto '{name}' ou diretório {root} já registrado")
+        return next(project for project in self.db.list_projects() if project.name == name)
+
+    def shards(self) -> List[Tuple[str, Path]]:
+        """Pares (projeto, banco do projeto) de todos os projetos registrados."""
+        return [
+            (project.name, project_db_path(Path(project.root)))
+            for project in self.db.list_projects()
+        ]
+
+    def health(self) -> List[ProjectHealth]:
+        """Situação dos objetivos de todos os projetos (via ATTACH)."""
+        return self.db.get_projects_health(self.shards())
+
+    def run(
+        self,
+        command: str,
+        jobs: Optional[int] = None,
+        on_done: Optional[Callable[[ProjectRun], None]] = None,
+    ) -> List[ProjectRun]:
+        """Executa um comando de COMMANDS em todos os projetos.
+
+        Cada projeto roda a CLI em um subprocesso com o próprio diretório
+        como diretório atual; até `jobs` projetos rodam ao mesmo tempo.
+        Os resultados são gravados no índice à medida que terminam.
+
+        Args:
+            command: Nome do comando ("check" ou "test").
+            jobs: Máximo de projetos simultâneos (padrão: número de CPUs).
+            on_done: Chamado a cada projeto concluído.
+
+        Returns:
+            Resultados na ordem de conclusão.
+        """
+        return asyncio.run(self._run_all(command, max(1, jobs or os.cpu_count() or 1), on_done))
+
+    async def _run_all(
+        self, command: str, jobs: int, on_done: Optional[Callable[[ProjectRun], None]]
+    ) -> List[ProjectRun]:
+        semaphore = asyncio.Semaphore(jobs)
+        results: List[ProjectRun] = []
+
+        async def run_one(project: WorkspaceProject) -> ProjectRun:
+            async with semaphore:
+                return await self._run_project(project, command)
+
+        for next_done in asyncio.as_completed(
+            [run_one(project) for project in self.db.list_projects()]
+        ):
+            result = await next_done
+            self.db.record_workspace_runs(
+                [(result.project, result.command, result.exit_code, result.duration, result.output)]
+            )
+            results.append(result)
+            if on_done:
+                on_done(result)
+        return results
+
+    async def _run_project(self, project: WorkspaceProject, command: str) -> ProjectRun:
+        """Executa o comando em um projeto, capturando a saída combinada."""
+        env = os.environ.copy()
+        env["PYTHONPATH"] = os.pathsep.join(
+            filter(None, [str(_PACKAGE_ROOT), env.get("PYTHONPATH")])
+        )
+        started = time.monotonic()
+        try:
+            process = await asyncio.create_subprocess_exec(
+                sys.executable,
+                "-m",
+                "src.cli",
+                *COMMANDS[command],
+                cwd=project.root,
+                env=env,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+            )
+            stdout, _ = await process.communicate()
+        except OSError as e:
+            return ProjectRun(project.name, command, 2, time.monotonic() - started, str(e))
+        output = stdout.decode("utf-8", errors="replace")[-OUTPUT_TAIL_CHARS:]
+        return ProjectRun(
+            project.name, command, process.returncode or 0, time.monotonic() - started, output
+        )
@@ -0,0 +1,118 @@
+"""Testes para o async_runner."""
+
+from pathlib import Path
+from typing import List, Tuple
+
+import pytest
+
+from src.async_runner import AsyncTestRunner
+from src.database import Database
+from src.models import Objective, ObjectiveType, TestRun, TestStatus
+from src.test_runner import RunLimits
+
+
+@pytest.fixture
+def database(tmp_path: Path) -> Database:
+    """Retorna uma instância do Database com banco temporário."""
+    return Database(tmp_path / "test.db")
+
+
+def _create_objective(database: Database, tmp_path: Path, nome: str, files: dict) -> Objective:
+    """Cria um objetivo com os arquivos de teste informados em <tmp>/tests."""
+    obj = Objective(nome=nome, descricao="Async", tipos=[ObjectiveType.CLI_COMMAND])
+    database.create_objective(obj)
+    test_dir = tmp_path / "tests" / "objectives" / obj.id
+    test_dir.mkdir(parents=True)
+    for name, content in files.items():
+        (test_dir / name).write_text(content)
+    return obj
+
+
+def test_results_are_persisted_as_they_arrive(database: Database, tmp_path: Path) -> None:
+    """Testa que cada teste é salvo e notificado antes do fim do objetivo."""
+    obj = _create_objective(
+        database,
+        tmp_path,
+        "Streaming",
+        {
+            "test_a.py": "def test_ok():\n    assert True\n\ndef test_fail():\n    assert False\n",
+            "test_b.py": "import pytest\n\n@pytest.mark.skip\ndef test_skip():\n    pass\n",
+        },
+    )
+    seen: List[Tuple[str, int]] = []
+
+    def on_result(objective: Objective, run: TestRun) -> None:
+        # Já persistido quando o callback é chamado
+        seen.append((run.test_name, len(database.get_test_runs(objective.id))))
+
+    runner = AsyncTestRunner(database, quiet=True, concurrency=2, on_result=on_result)
+    result = runner.execute_objective(obj.id, base_path=tmp_path / "tests")
+
+    assert result is not None
+    summary, runs = result
+    assert (summary.passed, summary.failed, summary.skipped) == (1, 1, 1)
+    assert sorted(name for name, _ in seen) == ["test_fail", "test_ok", "test_skip"]
+    assert all(saved >= 1 for _, saved in seen)
+    assert {run.run_id for run in runs} == {runs[0].run_id}
+    assert database.get_test_summary(obj.id).total_tests == 3
+    assert len(database.get_latest_test_results(obj.id)) == 3
+
+
+def test_timeout_keeps_partial_results(database: Database, tmp_path: Path) -> None:
+    """Testa que o timeout encerra o processo e marca o teste em andamento."""
+    obj = _create_objective(
+        database,
+        tmp_path,
+        "Travado",
+        {
+            "test_hang.py": (
+                "import time\n\ndef test_done():\n    pass\n\n"
+                "def test_hung():\n    time.sleep(60)\n"
+            ),
+        },
+    )
+    runner = AsyncTestRunner(database, quiet=True, limits=RunLimits(objective_timeout=2.0))
+    result = runner.execute_objective(obj.id, base_path=tmp_path / "tests")
+
+    assert result is not None
+    statuses = {run.test_name: run.status for run in result[1]}
+    assert statuses == {"test_done": TestStatus.PASSED, "test_hung": TestStatus.ERROR}
+
+
+def test_iter_all_tests_runs_objectives_concurrently(
+    database: Database, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Testa a execução de todos os objetivos com o bridge síncrono."""
+    monkeypatch.chdir(tmp_path)
+    for nome in ("A", "B", "C"):
+        _create_objective(database, tmp_path, nome, {"test_x.py": "def test_x():\n    pass\n"})
+
+    runner = AsyncTestRunner(database, quiet=True, concurrency=3)
+    results = list(runner.iter_all_tests())
+
+    assert sorted(obj.nome for obj, _, _ in results) == ["A", "B", "C"]
+    assert all(summary.is_passing() for _, summary, _ in results)
+
+
+def test_fail_fast_cancels_remaining_objectives(
+    database: Database, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Testa que --fail-fast cancela objetivos em andamento após a primeira falha."""
+    monkeypatch.chdir(tmp_path)
+    _create_objective(
+        database, tmp_path, "Falha", {"test_x.py": "def test_x():\n    assert False\n"}
+    )
+    slow = _create_objective(
+        database,
+        tmp_path,
+        "Lento",
+        {
+            "test_y.py": "import time\n\ndef test_y():\n    time.sleep(30)\n",
+        },
+    )
+
+    runner = AsyncTestRunner(database, quiet=True, concurrency=2)
+    results = list(runner.iter_all_tests(fail_fast=True))
+
+    assert [obj.nome for obj, _, _ in results] == ["Falha"]
+    assert database.get_test_summary(slow.id) is None
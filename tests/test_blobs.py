@@ -0,0 +1,44 @@
+"""Testes para o armazenamento de blobs."""
+
+import os
+from pathlib import Path
+
+from src.blobs import BlobStore
+
+
+def test_put_get_deduplicates(tmp_path: Path) -> None:
+    """Testa gravação comprimida, leitura e deduplicação pelo conteúdo."""
+    store = BlobStore.for_database(tmp_path / "state" / "vibe.db")
+    text = "Traceback\n" + "linha repetida\n" * 10_000
+
+    ref = store.put(text)
+    assert store.put(text) == ref
+    files = [path for path in (tmp_path / "state" / "blobs").rglob("*") if path.is_file()]
+    assert len(files) == 1
+    assert files[0].stat().st_size < len(text) // 20
+    assert store.get(ref) == text
+
+
+def test_get_rejects_unknown_refs(tmp_path: Path) -> None:
+    """Testa referências inexistentes, inválidas ou corrompidas."""
+    store = BlobStore(tmp_path)
+    assert store.get("0" * 64) is None
+    assert store.get("../../etc/passwd") is None
+    ref = store.put("texto")
+    (tmp_path / ref[:2] / ref[2:]).write_bytes(b"lixo")
+    assert store.get(ref) is None
+
+
+def test_gc_keeps_live_and_recent_blobs(tmp_path: Path) -> None:
+    """Testa a coleta de lixo: só remove blobs sem referência fora da carência."""
+    store = BlobStore(tmp_path)
+    live = store.put("referenciado")
+    dead = store.put("órfão")
+    recent = store.put("recém-gravado")
+    for ref in (live, dead):
+        os.utime(tmp_path / ref[:2] / ref[2:], (0, 0))
+
+    report = store.gc({live})
+    assert report.removed == 1 and report.bytes_freed > 0
+    assert set(store.refs()) == {live, recent}
+    assert store.get(dead) is None
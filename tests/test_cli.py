@@ -279,14 +279,658 @@ def test_objective_status(runner: CliRunner, setup_temp_db, temp_db_path: Path)
     """Testa comando objective status."""
     db = Database(temp_db_path)
     from src.models import Objective
+
     obj = Objective(
         nome="Status Test",
         descricao="Test status command",
         tipos=[ObjectiveType.CLI_COMMAND],
     )
     db.create_objective(obj)
-    
+
     result = runner.invoke(main, ["objective", "status", obj.id])
     assert result.exit_code == 0
     assert "Status Test" in result.output
     assert obj.id[:8] in result.output
+
+
+def test_objective_generate_tests_reports_changes(
+    runner: CliRunner,
+    setup_temp_db,
+    temp_db_path: Path,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Testa que generate-tests só reescreve arquivos alterados."""
+    monkeypatch.chdir(tmp_path)
+    db = Database(temp_db_path)
+    from src.models import Objective
+
+    obj = Objective(
+        nome="Regenerar",
+        descricao="Desc",
+        tipos=[ObjectiveType.CLI_COMMAND],
+    )
+    db.create_objective(obj)
+
+    result = runner.invoke(main, ["objective", "generate-tests", obj.id])
+    assert result.exit_code == 0
+    assert "criado: test_test_execution.py" in result.output
+
+    edited = tmp_path / "tests" / "objectives" / obj.id / "test_test_output.py"
+    edited.write_text("def test_test_output():\n    assert True\n", encoding="utf-8")
+
+    result = runner.invoke(main, ["objective", "generate-tests", obj.id])
+    assert result.exit_code == 0
+    assert "inalterado: test_test_execution.py" in result.output
+    assert "protegido (editado manualmente): test_test_output.py" in result.output
+
+
+def test_objective_import_export_roundtrip(
+    runner: CliRunner, setup_temp_db, temp_db_path: Path, tmp_path: Path
+) -> None:
+    """Testa importação e exportação em JSONL."""
+    from src.models import Objective
+
+    objs = [
+        Objective(nome=f"Importado {i}", descricao="Desc", tipos=[ObjectiveType.STATE])
+        for i in range(3)
+    ]
+    lines = [json.dumps(obj.to_dict()) for obj in objs]
+    lines.insert(1, "{invalido")
+    lines.append(json.dumps({"nome": "", "descricao": "Sem nome", "tipos": ["state"]}))
+    source = tmp_path / "objetivos.jsonl"
+    source.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    result = runner.invoke(
+        main, ["objective", "import", str(source), "--no-tests", "--batch-size", "2"]
+    )
+    assert result.exit_code == 1
+    assert "Importados: 3" in result.output
+    assert "Inválidos: 2" in result.output
+
+    # Reimportar não duplica
+    result = runner.invoke(main, ["objective", "import", str(source), "--no-tests"])
+    assert "Importados: 0" in result.output
+    assert "Já existentes: 3" in result.output
+
+    result = runner.invoke(main, ["objective", "export"])
+    assert result.exit_code == 0
+    exported = [json.loads(line) for line in result.output.splitlines()]
+    assert [d["id"] for d in exported] == [obj.id for obj in objs]
+    assert exported[0] == objs[0].to_dict()
+
+
+def test_objective_import_rejects_dependency_cycle(
+    runner: CliRunner, setup_temp_db, temp_db_path: Path, tmp_path: Path
+) -> None:
+    """Testa que um lote com ciclo ou dependência inexistente é recusado."""
+    from src.models import Objective
+    a = Objective(nome="A", descricao="Desc", tipos=[ObjectiveType.STATE])
+    b = Objective(nome="B", descricao="Desc", tipos=[ObjectiveType.STATE], dependencias=[a.id])
+    a.dependencias = [b.id]
+    source = tmp_path / "ciclo.jsonl"
+    source.write_text(f"{json.dumps(a.to_dict())}\n{json.dumps(b.to_dict())}\n", encoding="utf-8")
+
+    result = runner.invoke(main, ["objective", "import", str(source), "--no-tests"])
+    assert result.exit_code == 1
+    assert "Ciclo de dependências" in result.output
+    assert "Inválidos: 2" in result.output
+    assert Database(temp_db_path).list_objectives() == []
+
+    a.dependencias = ["inexistente"]
+    source.write_text(json.dumps(a.to_dict()) + "\n", encoding="utf-8")
+    result = runner.invoke(main, ["objective", "import", str(source), "--no-tests"])
+    assert result.exit_code == 1
+    assert "Dependência inexistente" in result.output
+
+
+def test_objective_list_json_formats(runner: CliRunner, setup_temp_db, temp_db_path: Path) -> None:
+    """Testa saída --format json e ndjson de objective list."""
+    db = Database(temp_db_path)
+    from src.models import Objective
+    objs = [
+        Objective(nome=f"Formato {i}", descricao="Desc", tipos=[ObjectiveType.STATE])
+        for i in range(2)
+    ]
+    for obj in objs:
+        db.create_objective(obj)
+
+    result = runner.invoke(main, ["objective", "list", "--format", "json"])
+    assert result.exit_code == 0
+    document = json.loads(result.output)
+    assert {d["id"] for d in document} == {obj.id for obj in objs}
+
+    result = runner.invoke(main, ["objective", "list", "--format", "ndjson"])
+    assert result.exit_code == 0
+    records = [json.loads(line) for line in result.output.splitlines()]
+    assert records == document
+
+    result = runner.invoke(main, ["objective", "status", "--all", "--format", "ndjson"])
+    assert result.exit_code == 0
+    records = [json.loads(line) for line in result.output.splitlines()]
+    assert len(records) == 2
+    assert all(r["summary"] is None for r in records)
+
+
+def test_test_run_json_format(
+    runner: CliRunner,
+    setup_temp_db,
+    temp_db_path: Path,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Testa saída estruturada de test run."""
+    monkeypatch.chdir(tmp_path)
+    db = Database(temp_db_path)
+    from src.models import Objective
+
+    obj = Objective(nome="Run JSON", descricao="Desc", tipos=[ObjectiveType.CLI_COMMAND])
+    db.create_objective(obj)
+    test_dir = tmp_path / "tests" / "objectives" / obj.id
+    test_dir.mkdir(parents=True)
+    (test_dir / "test_ok.py").write_text("def test_ok():\n    assert True\n")
+
+    result = runner.invoke(main, ["test", "run", obj.id, "--format", "json"])
+    assert result.exit_code == 0
+    record = json.loads(result.stdout)
+    assert record["objective"]["id"] == obj.id
+    assert record["summary"]["passed"] == 1
+    assert record["test_runs"][0]["test_name"] == "test_ok"
+    assert record["test_runs"][0]["test_file"] == f"tests/objectives/{obj.id}/test_ok.py"
+
+    result = runner.invoke(main, ["test", "run", "--all", "--format", "ndjson"])
+    assert result.exit_code == 0
+    # Mensagens de progresso vão para stderr; stdout contém apenas registros
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [r["summary"]["total_tests"] for r in records] == [1]
+
+
+def test_test_run_jobs_streams_progress(
+    runner: CliRunner,
+    setup_temp_db,
+    temp_db_path: Path,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Testa test run --jobs com progresso teste a teste."""
+    monkeypatch.chdir(tmp_path)
+    db = Database(temp_db_path)
+    from src.models import Objective
+
+    obj = Objective(nome="Paralelo", descricao="Desc", tipos=[ObjectiveType.CLI_COMMAND])
+    db.create_objective(obj)
+    test_dir = tmp_path / "tests" / "objectives" / obj.id
+    test_dir.mkdir(parents=True)
+    (test_dir / "test_a.py").write_text("def test_a():\n    assert True\n")
+    (test_dir / "test_b.py").write_text("def test_b():\n    assert False\n")
+
+    result = runner.invoke(main, ["test", "run", "--all", "--jobs", "2"])
+    assert result.exit_code == 1
+    assert "Paralelo › test_a ... PASSED" in result.output
+    assert "Paralelo › test_b ... FAILED" in result.output
+    assert db.get_test_summary(obj.id).total_tests == 2
+
+
+def test_test_run_shards_and_merge(
+    runner: CliRunner,
+    setup_temp_db,
+    temp_db_path: Path,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Testa test run --shard e a mesclagem dos resultados com test merge."""
+    monkeypatch.chdir(tmp_path)
+    db = Database(temp_db_path)
+    from src.models import Objective
+
+    obj = Objective(nome="Sharded", descricao="Desc", tipos=[ObjectiveType.CLI_COMMAND])
+    db.create_objective(obj)
+    test_dir = tmp_path / "tests" / "objectives" / obj.id
+    test_dir.mkdir(parents=True)
+    (test_dir / "test_a.py").write_text("def test_a():\n    assert True\n")
+    (test_dir / "test_b.py").write_text("def test_b():\n    assert True\n")
+
+    outputs = []
+    for spec in ("1/2", "2/2"):
+        result = runner.invoke(
+            main, ["test", "run", "--all", "--shard", spec, "--format", "ndjson"]
+        )
+        assert result.exit_code == 0
+        records = [json.loads(line) for line in result.stdout.splitlines()]
+        assert [r["summary"]["total_tests"] for r in records] == [1]
+        path = tmp_path / f"shard-{spec[0]}.ndjson"
+        path.write_text(result.stdout)
+        outputs.append(str(path))
+
+    result = runner.invoke(main, ["test", "run", "--all", "--shard", "3/2"])
+    assert result.exit_code == 2
+
+    # Mesclar em um banco novo
+    temp_db_path.unlink()
+    result = runner.invoke(main, ["test", "merge", *outputs])
+    assert result.exit_code == 0
+    assert "Execuções importadas: 2" in result.output
+    merged = Database(temp_db_path)
+    assert merged.get_objective(obj.id).nome == "Sharded"
+    assert merged.get_test_summary(obj.id).total_tests == 2
+    assert len(merged.get_latest_test_results(obj.id)) == 2
+
+    # Reimportar não duplica execuções
+    result = runner.invoke(main, ["test", "merge", *outputs])
+    assert "Já existentes: 2" in result.output
+    assert len(merged.get_test_runs(obj.id)) == 2
+
+
+def test_test_flaky_command(runner: CliRunner, setup_temp_db, temp_db_path: Path) -> None:
+    """Testa o relatório de testes instáveis."""
+    result = runner.invoke(main, ["test", "flaky"])
+    assert result.exit_code == 0
+    assert "Nenhum teste instável" in result.output
+
+    from datetime import datetime, timedelta
+
+    from src.models import TestRun, TestStatus
+
+    db = Database(temp_db_path)
+    now = datetime.now()
+    for index, status in enumerate([TestStatus.PASSED, TestStatus.FAILED, TestStatus.PASSED]):
+        db.save_test_run(
+            TestRun(
+                objective_id="obj",
+                test_file="f.py",
+                test_name="test_x",
+                status=status,
+                run_at=now + timedelta(seconds=index),
+            )
+        )
+
+    result = runner.invoke(main, ["test", "flaky", "--format", "json"])
+    assert result.exit_code == 0
+    records = json.loads(result.stdout)
+    assert records[0]["test_name"] == "test_x"
+    assert records[0]["score"] == 1.0
+
+    result = runner.invoke(main, ["test", "flaky"])
+    assert "test_x" in result.output
+    assert "2 alternância(s) em 3 execuções" in result.output
+
+
+def test_db_compact_command(runner: CliRunner, setup_temp_db, temp_db_path: Path) -> None:
+    """Testa comando db compact e a política automática."""
+    result = runner.invoke(main, ["db", "compact", "--keep", "5", "--auto"])
+    assert result.exit_code == 0
+    assert "Execuções removidas: 0" in result.output
+    assert "Política automática ativa" in result.output
+    assert Database(temp_db_path).get_setting("retention.keep_last") == "5"
+
+    result = runner.invoke(main, ["db", "compact", "--disable-auto"])
+    assert result.exit_code == 0
+    assert Database(temp_db_path).get_setting("retention.keep_last") is None
+
+
+def test_objective_depend_command(runner: CliRunner, setup_temp_db, temp_db_path: Path) -> None:
+    """Testa objective depend/undepend e a recusa de ciclos."""
+    db = Database(temp_db_path)
+    from src.models import Objective
+    base = Objective(nome="Base", descricao="Desc", tipos=[ObjectiveType.CLI_COMMAND])
+    topo = Objective(nome="Topo", descricao="Desc", tipos=[ObjectiveType.CLI_COMMAND])
+    db.create_objective(base)
+    db.create_objective(topo)
+
+    result = runner.invoke(main, ["objective", "depend", topo.id, base.id])
+    assert result.exit_code == 0
+    assert "Topo depende de Base" in result.output
+    assert db.get_objective(topo.id).dependencias == [base.id]
+
+    result = runner.invoke(main, ["objective", "depend", base.id, topo.id])
+    assert result.exit_code == 1
+    assert "Ciclo de dependências" in result.output
+
+    result = runner.invoke(main, ["objective", "status", topo.id])
+    assert "Depende de: Base" in result.output
+
+    result = runner.invoke(main, ["objective", "undepend", topo.id, base.id])
+    assert result.exit_code == 0
+    assert db.get_objective(topo.id).dependencias == []
+
+
+def test_project_check_changed(
+    runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Testa project check --changed com arquivos informados e staged no git."""
+    import subprocess
+
+    from src.models import Objective
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "state").mkdir()
+    db = Database(tmp_path / "state" / "vibe.db")
+    valid = Objective(nome="Valido", descricao="Desc", tipos=[ObjectiveType.CLI_COMMAND])
+    broken = Objective(nome="Quebrado", descricao="Desc", tipos=[ObjectiveType.CLI_COMMAND])
+    for obj, content in ((valid, "def test_ok():\n    assert True\n"), (broken, "# TODO\n")):
+        db.create_objective(obj)
+        test_dir = tmp_path / "tests" / "objectives" / obj.id
+        test_dir.mkdir(parents=True)
+        (test_dir / "test_a.py").write_text(content)
+
+    valid_file = f"tests/objectives/{valid.id}/test_a.py"
+    broken_file = f"tests/objectives/{broken.id}/test_a.py"
+
+    result = runner.invoke(main, ["project", "check", "--changed", ".", "src/cli.py"])
+    assert result.exit_code == 0
+    assert "Nenhum objetivo afetado" in result.output
+
+    result = runner.invoke(main, ["project", "check", "--changed", ".", valid_file])
+    assert "Quebrado" not in result.output
+    assert "Diretório faltante" not in result.output
+
+    result = runner.invoke(main, ["project", "check", "--changed", ".", broken_file])
+    assert result.exit_code == 1
+    assert "Quebrado" in result.output
+
+    result = runner.invoke(main, ["project", "check", ".", broken_file])
+    assert result.exit_code == 1
+    assert "--changed" in result.output
+
+    subprocess.run(["git", "init", "-q"], check=True)
+    subprocess.run(["git", "add", broken_file], check=True)
+    result = runner.invoke(main, ["project", "check", "--changed"])
+    assert result.exit_code == 1
+    assert "Quebrado" in result.output
+
+
+def test_workspace_commands(
+    runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Testa workspace add/list/status com o índice em $VIBE_WORKSPACE."""
+    from src.models import Objective
+
+    monkeypatch.setenv("VIBE_WORKSPACE", str(tmp_path / "index" / "workspace.db"))
+    project_root = tmp_path / "proj"
+    (project_root / "state").mkdir(parents=True)
+    db = Database(project_root / "state" / "vibe.db")
+    db.create_objective(Objective(nome="Obj", descricao="Desc", tipos=[ObjectiveType.CLI_COMMAND]))
+
+    result = runner.invoke(main, ["workspace", "add", str(project_root)])
+    assert result.exit_code == 0
+    result = runner.invoke(main, ["workspace", "add", str(project_root)])
+    assert result.exit_code == 1
+
+    result = runner.invoke(main, ["workspace", "list", "--format", "json"])
+    assert [p["name"] for p in json.loads(result.stdout)] == ["proj"]
+
+    result = runner.invoke(main, ["workspace", "status", "--format", "json"])
+    records = json.loads(result.stdout)
+    assert records[0]["project"] == "proj"
+    assert records[0]["objectives"] == 1
+    assert records[0]["tested"] == 0
+    assert records[0]["check_exit_code"] is None
+
+    result = runner.invoke(main, ["workspace", "remove", "proj"])
+    assert result.exit_code == 0
+
+
+def test_test_run_affected(
+    runner: CliRunner,
+    setup_temp_db,
+    temp_db_path: Path,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Testa test run --coverage seguido de --affected REF."""
+    import subprocess
+
+    from src.models import Objective
+
+    monkeypatch.chdir(tmp_path)
+    module = "def usada():\n    return 1\n\n\ndef nao_usada():\n    return 2\n"
+    (tmp_path / "mod.py").write_text(module)
+    subprocess.run(["git", "init", "-q"], check=True)
+    subprocess.run(["git", "add", "mod.py"], check=True)
+    subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", "commit", "-qm", "base"], check=True
+    )
+
+    db = Database(temp_db_path)
+    obj = Objective(nome="Impacto", descricao="Desc", tipos=[ObjectiveType.CLI_COMMAND])
+    db.create_objective(obj)
+    test_dir = tmp_path / "tests" / "objectives" / obj.id
+    test_dir.mkdir(parents=True)
+    (test_dir / "test_mod.py").write_text(
+        "from mod import usada\n\ndef test_usada():\n    assert usada() == 1\n"
+    )
+
+    result = runner.invoke(main, ["test", "run", "--all", "--coverage"])
+    assert result.exit_code == 0
+
+    (tmp_path / "mod.py").write_text(module.replace("return 2", "return 3"))
+    result = runner.invoke(main, ["test", "run", "--affected", "HEAD", "--format", "ndjson"])
+    assert result.exit_code == 0
+    assert result.stdout == ""
+
+    (tmp_path / "mod.py").write_text(module.replace("return 1", "return 1  # alterada"))
+    result = runner.invoke(main, ["test", "run", "--affected", "HEAD", "--format", "ndjson"])
+    assert result.exit_code == 0
+    assert [json.loads(line)["objective"]["id"] for line in result.stdout.splitlines()] == [obj.id]
+
+    result = runner.invoke(main, ["test", "run", "--affected", "ref-inexistente"])
+    assert result.exit_code == 2
+
+
+def test_objective_search_command(runner: CliRunner, setup_temp_db, temp_db_path: Path) -> None:
+    """Testa objective search em texto e JSON."""
+    db = Database(temp_db_path)
+    from src.models import Objective
+
+    login = Objective(
+        nome="Login", descricao="Autenticação por senha", tipos=[ObjectiveType.CLI_COMMAND]
+    )
+    db.create_objective(login)
+    db.create_objective(
+        Objective(nome="Relatório", descricao="Exporta CSV", tipos=[ObjectiveType.CLI_COMMAND])
+    )
+
+    result = runner.invoke(main, ["objective", "search", "autent"])
+    assert result.exit_code == 0
+    assert "1 resultado(s)" in result.output
+    assert login.id[:8] in result.output
+
+    result = runner.invoke(main, ["objective", "search", "senha", "--format", "json"])
+    records = json.loads(result.output)
+    assert [record["id"] for record in records] == [login.id]
+    assert "[senha]" in records[0]["snippet"]
+
+    result = runner.invoke(main, ["objective", "search", "inexistente"])
+    assert "Nenhum objetivo encontrado" in result.output
+
+
+def test_short_id_prefix_resolution(runner: CliRunner, setup_temp_db, temp_db_path: Path) -> None:
+    """Testa o uso do ID curto e a mensagem de prefixo ambíguo."""
+    db = Database(temp_db_path)
+    from src.models import Objective
+
+    base = Objective(
+        id="aaaa1111-base", nome="Base", descricao="Desc", tipos=[ObjectiveType.CLI_COMMAND]
+    )
+    topo = Objective(
+        id="aaaa2222-topo", nome="Topo", descricao="Desc", tipos=[ObjectiveType.CLI_COMMAND]
+    )
+    db.create_objective(base)
+    db.create_objective(topo)
+
+    result = runner.invoke(main, ["objective", "status", "aaaa1111"])
+    assert result.exit_code == 0
+    assert f"ID: {base.id}" in result.output
+
+    result = runner.invoke(main, ["objective", "depend", "aaaa2", "aaaa1"])
+    assert result.exit_code == 0
+    assert db.get_objective(topo.id).dependencias == [base.id]
+
+    result = runner.invoke(main, ["objective", "status", "aaaa"])
+    assert result.exit_code == 1
+    assert "é ambíguo" in result.output
+    assert base.id in result.output and topo.id in result.output
+
+    result = runner.invoke(main, ["test", "run", "ffff"])
+    assert result.exit_code == 1
+    assert "não encontrado" in result.output
+
+    result = runner.invoke(main, ["objective", "undepend", "aaaa2", "aaaa1"])
+    assert result.exit_code == 0
+    assert db.get_objective(topo.id).dependencias == []
+
+
+def test_test_log_command(runner: CliRunner, setup_temp_db, temp_db_path: Path) -> None:
+    """Testa a exibição da saída completa de uma execução a partir do ID curto."""
+    from src.models import TestRun, TestStatus
+
+    db = Database(temp_db_path)
+    error = "Traceback\n" + "linha\n" * 5000 + "AssertionError: fim"
+    run = TestRun(
+        id="abcd1234-run",
+        objective_id="obj",
+        test_file="f.py",
+        test_name="test_a",
+        status=TestStatus.FAILED,
+        error_message=error,
+    )
+    db.save_test_run(run)
+
+    result = runner.invoke(main, ["test", "log", "abcd"])
+    assert result.exit_code == 0
+    assert "f.py › test_a" in result.output
+    assert error in result.output
+
+    result = runner.invoke(main, ["test", "log", "ffff"])
+    assert result.exit_code == 1
+    assert "não encontrada" in result.output
+
+
+def test_test_trends_command(runner: CliRunner, setup_temp_db, temp_db_path: Path) -> None:
+    """Testa o relatório de tendências em texto e JSON."""
+    from datetime import datetime, timedelta
+
+    from src.models import Objective, TestRun, TestStatus
+
+    db = Database(temp_db_path)
+    obj = Objective(nome="Tendência", descricao="Desc", tipos=[ObjectiveType.CLI_COMMAND])
+    db.create_objective(obj)
+    now = datetime.now()
+    db.save_test_runs(
+        [
+            TestRun(
+                run_id=f"r{index}",
+                objective_id=obj.id,
+                test_file="f.py",
+                test_name="test_a",
+                status=TestStatus.PASSED,
+                duration=duration,
+                run_at=now - timedelta(hours=10 - index),
+            )
+            for index, duration in enumerate([1.0] * 5 + [4.0])
+        ]
+    )
+
+    result = runner.invoke(main, ["test", "trends", obj.id[:8], "--since", "2d"])
+    assert result.exit_code == 0
+    assert "Tendência" in result.output
+    assert "100.0%" in result.output
+    assert "4.0x" in result.output
+
+    result = runner.invoke(main, ["test", "trends", "--format", "json"])
+    kinds = [record["kind"] for record in json.loads(result.output)]
+    assert kinds == ["pass_rate", "duration", "duration_jump"]
+
+    result = runner.invoke(main, ["test", "trends", "--since", "ontem"])
+    assert result.exit_code == 2
+
+
+def test_metrics_file_after_test_run(
+    runner: CliRunner,
+    setup_temp_db,
+    temp_db_path: Path,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Testa test run --metrics-file e o comando metrics."""
+    from src.models import Objective
+
+    monkeypatch.chdir(tmp_path)
+    db = Database(temp_db_path)
+    obj = Objective(nome="Métricas", descricao="Desc", tipos=[ObjectiveType.CLI_COMMAND])
+    db.create_objective(obj)
+    test_dir = tmp_path / "tests" / "objectives" / obj.id
+    test_dir.mkdir(parents=True)
+    (test_dir / "test_m.py").write_text(
+        "def test_ok():\n    assert True\n\ndef test_falha():\n    assert False\n"
+    )
+
+    output = tmp_path / "metrics" / "vibe.prom"
+    result = runner.invoke(main, ["test", "run", obj.id, "--metrics-file", str(output)])
+    assert result.exit_code == 1
+    text = output.read_text(encoding="utf-8")
+    assert f'vibe_tests_total{{objective="{obj.id}",status="FAILED"}}' in text
+    assert "vibe_pytest_spawns_total" in text
+    assert text.endswith("# EOF\n")
+
+    result = runner.invoke(main, ["metrics"])
+    assert result.exit_code == 0
+    assert f'vibe_objective_latest_tests{{objective="{obj.id}",status="PASSED"}} 1' in result.output
+
+
+def test_test_run_trace_file(
+    runner: CliRunner,
+    setup_temp_db,
+    temp_db_path: Path,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Testa test run --trace: spans do runner e do banco em JSON trace-event."""
+    import json
+
+    from src import tracing
+    from src.models import Objective
+
+    monkeypatch.chdir(tmp_path)
+    db = Database(temp_db_path)
+    obj = Objective(nome="Trace", descricao="Desc", tipos=[ObjectiveType.CLI_COMMAND])
+    db.create_objective(obj)
+    test_dir = tmp_path / "tests" / "objectives" / obj.id
+    test_dir.mkdir(parents=True)
+    (test_dir / "test_t.py").write_text("def test_ok():\n    assert True\n")
+
+    output = tmp_path / "trace.json"
+    result = runner.invoke(main, ["test", "run", obj.id, "--trace", str(output)])
+    assert result.exit_code == 0
+    assert "Trace gravado" in result.output
+    assert not tracing.TRACER.enabled
+    events = json.loads(output.read_text(encoding="utf-8"))["traceEvents"]
+    names = {event["name"] for event in events if event["ph"] == "X"}
+    assert {"objective", "glob", "pytest", "parse", "persist", "db.save_test_runs"} <= names
+
+
+def test_test_run_warm_workers(
+    runner: CliRunner,
+    setup_temp_db,
+    temp_db_path: Path,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Testa test run --warm-workers com um e com vários processos simultâneos."""
+    from src.models import Objective
+
+    monkeypatch.chdir(tmp_path)
+    db = Database(temp_db_path)
+    obj = Objective(nome="Warm", descricao="Desc", tipos=[ObjectiveType.CLI_COMMAND])
+    db.create_objective(obj)
+    test_dir = tmp_path / "tests" / "objectives" / obj.id
+    test_dir.mkdir(parents=True)
+    (test_dir / "test_a.py").write_text("def test_ok():\n    assert True\n")
+    (test_dir / "test_b.py").write_text("def test_falha():\n    assert False\n")
+
+    for jobs in ("1", "2"):
+        result = runner.invoke(
+            main, ["test", "run", obj.id, "--warm-workers", "--jobs", jobs, "--format", "json"]
+        )
+        assert result.exit_code == 1
+        assert '"passed": 1' in result.stdout and '"failed": 1' in result.stdout
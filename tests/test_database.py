@@ -2,10 +2,11 @@
 
 import json
 from pathlib import Path
+from typing import List
 
 import pytest
 
-from src.database import Database
+from src.database import AmbiguousObjectiveIdError, CacheStats, Database
 from src.models import Objective, ObjectiveStatus, ObjectiveType
 
 
@@ -288,3 +289,698 @@ def test_test_summary_crud(database: Database) -> None:
     assert updated is not None
     assert updated.passed == 9
     assert updated.failed == 0
+
+
+def test_create_objectives_batch(database: Database) -> None:
+    """Testa inserção em lote ignorando IDs já existentes."""
+    existing = Objective(nome="Existente", descricao="D", tipos=[ObjectiveType.STATE])
+    database.create_objective(existing)
+
+    batch = [
+        Objective(nome=f"Lote {i}", descricao="D", tipos=[ObjectiveType.CLI_COMMAND])
+        for i in range(3)
+    ]
+    inserted = database.create_objectives(batch + [existing])
+    assert [obj.id for obj in inserted] == [obj.id for obj in batch]
+    assert len(database.list_objectives()) == 4
+    assert database.create_objectives([]) == []
+
+
+def test_iter_objectives_streams_in_insertion_order(database: Database) -> None:
+    """Testa iteração em lotes sobre os objetivos."""
+    objs = [
+        Objective(nome=f"Obj {i}", descricao="D", tipos=[ObjectiveType.PROJECT]) for i in range(5)
+    ]
+    database.create_objectives(objs)
+    streamed = list(database.iter_objectives(batch_size=2))
+    assert [obj.id for obj in streamed] == [obj.id for obj in objs]
+
+
+def _save_runs(
+    database: Database, objective_id: str, statuses: list, day: str = "2026-01-01"
+) -> None:
+    """Grava execuções sequenciais de um mesmo teste."""
+    from datetime import datetime, timedelta
+
+    from src.models import TestRun, TestStatus
+
+    base = datetime.fromisoformat(f"{day}T00:00:00")
+    for i, status in enumerate(statuses):
+        database.save_test_run(
+            TestRun(
+                objective_id=objective_id,
+                test_file="tests/objectives/x/test_a.py",
+                test_name="test_a",
+                status=TestStatus(status),
+                duration=float(i + 1),
+                run_at=base + timedelta(minutes=i),
+            )
+        )
+
+
+def test_compact_test_runs_keeps_recent_and_audit_rows(database: Database) -> None:
+    """Testa retenção das últimas N execuções e de transições de status."""
+    statuses = ["FAILED", "FAILED", "PASSED", "PASSED", "PASSED", "PASSED", "PASSED", "PASSED"]
+    _save_runs(database, "obj", statuses)
+
+    report = database.compact_test_runs(keep_last=2)
+    # Preservados: 2 recentes + primeira execução + transição FAILED→PASSED
+    runs = database.get_test_runs("obj")
+    assert len(runs) == 4
+    assert report.rows_deleted == 4
+    assert report.audit_rows_kept == 2
+    assert [r.status.value for r in runs[-2:]] == ["PASSED", "FAILED"]
+
+    import sqlite3
+    conn = sqlite3.connect(database.db_path)
+    row = conn.execute(
+        "SELECT runs, passed, failed, duration_total, duration_max FROM test_daily_rollup"
+    ).fetchone()
+    conn.close()
+    # A rollup mantida pelo trigger continua contando as execuções removidas
+    assert row == (8, 6, 2, 36.0, 8.0)
+
+    # Compactar novamente não remove mais nada
+    assert database.compact_test_runs(keep_last=2).rows_deleted == 0
+
+
+def test_legacy_test_run_daily_is_merged_into_rollup(temp_db_path: Path) -> None:
+    """Testa a migração da antiga test_run_daily (agregados compactados) para a rollup."""
+    import sqlite3
+
+    database = Database(temp_db_path)
+    for day in ("2026-01-01", "2026-01-02"):
+        _save_runs(database, "obj", ["PASSED", "FAILED"], day=day)
+
+    # Banco anterior à rollup: execuções de 2026-01-01 já compactadas
+    conn = sqlite3.connect(temp_db_path)
+    conn.execute("DROP TABLE test_daily_rollup")
+    conn.execute("DELETE FROM test_runs WHERE run_at < '2026-01-02'")
+    conn.execute("""
+        CREATE TABLE test_run_daily (
+            objective_id TEXT NOT NULL, test_file TEXT NOT NULL, test_name TEXT NOT NULL,
+            day TEXT NOT NULL, runs INTEGER NOT NULL, passed INTEGER NOT NULL,
+            failed INTEGER NOT NULL, skipped INTEGER NOT NULL, error INTEGER NOT NULL,
+            duration_total REAL NOT NULL, duration_p50 REAL NOT NULL,
+            duration_p95 REAL NOT NULL, duration_max REAL NOT NULL,
+            PRIMARY KEY (objective_id, test_file, test_name, day)
+        )
+    """)
+    conn.execute(
+        "INSERT INTO test_run_daily VALUES "
+        "('obj', 'tests/objectives/x/test_a.py', 'test_a', '2026-01-01', 2, 1, 1, 0, 0, "
+        "3.0, 1.0, 2.0, 2.0)"
+    )
+    conn.commit()
+    conn.close()
+
+    Database(temp_db_path)
+    conn = sqlite3.connect(temp_db_path)
+    rows = conn.execute(
+        "SELECT day, runs, passed, failed, duration_total FROM test_daily_rollup ORDER BY day"
+    ).fetchall()
+    legacy = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'test_run_daily'").fetchone()
+    conn.close()
+    assert rows == [("2026-01-01", 2, 1, 1, 3.0), ("2026-01-02", 2, 1, 1, 3.0)]
+    assert legacy is None
+
+
+def test_test_output_goes_to_deduplicated_blobs(database: Database) -> None:
+    """Testa erros gravados como referência a blobs, migração de linhas antigas e coleta de lixo."""
+    import os
+    import sqlite3
+    from datetime import datetime, timedelta
+
+    from src.models import TestRun, TestStatus
+
+    now = datetime.now()
+    error = "Traceback\n" + "    assert False\n" * 2000
+    runs = [
+        TestRun(
+            run_id=f"r{i}",
+            objective_id="obj",
+            test_file="f.py",
+            test_name="test_skeleton",
+            status=TestStatus.FAILED,
+            error_message=error,
+            run_at=now + timedelta(seconds=i),
+        )
+        for i in range(3)
+    ]
+    database.save_test_runs(runs)
+
+    conn = sqlite3.connect(database.db_path)
+    stored = conn.execute("SELECT DISTINCT error_message, output_ref FROM test_runs").fetchall()
+    assert stored == [(None, database.blobs.put(error))]
+    assert len(list(database.blobs.refs())) == 1
+    # Linha de um banco anterior aos blobs, com o erro inline
+    conn.execute(
+        "UPDATE test_runs SET output_ref = NULL, error_message = 'antigo' WHERE run_id = 'r0'"
+    )
+    conn.commit()
+    conn.close()
+
+    run = database.get_test_run(runs[2].id)
+    assert run is not None
+    assert run.error_message is None
+    database.load_error_previews([run])
+    assert "caracteres omitidos; texto completo: vibe test log" in run.error_message
+    assert database.get_test_output(run) == error
+    assert database.resolve_test_run_id(runs[1].id[:12]) == runs[1].id
+    assert database.get_test_output(database.get_test_run(runs[0].id)) == "antigo"
+
+    report = database.compact_test_runs(keep_last=1)
+    assert report.errors_externalized == 1
+    assert report.blobs_removed == 0
+    assert database.get_test_output(database.get_test_run(runs[0].id)) == "antigo"
+
+    # Sem referências e fora da carência, os blobs são removidos
+    conn = sqlite3.connect(database.db_path)
+    conn.execute("DELETE FROM test_runs")
+    conn.execute("DELETE FROM latest_test_results")
+    conn.commit()
+    conn.close()
+    old = (now - timedelta(days=1)).timestamp()
+    for ref in database.blobs.refs():
+        os.utime(database.blobs.root / ref[:2] / ref[2:], (old, old))
+    report = database.compact_test_runs(keep_last=1)
+    assert report.blobs_removed == 2
+    assert list(database.blobs.refs()) == []
+
+
+def test_reading_test_runs_does_not_load_blobs(
+    database: Database, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Testa que as consultas de execuções não leem blobs; a prévia é carregada sob demanda."""
+    from src.models import TestRun, TestStatus
+
+    runs = [
+        TestRun(
+            objective_id="obj",
+            test_file="f.py",
+            test_name=f"test_{i}",
+            status=TestStatus.FAILED,
+            error_message="AssertionError: falhou",
+        )
+        for i in range(3)
+    ]
+    database.save_test_runs(runs)
+
+    def fail(ref: str) -> None:
+        raise AssertionError(f"blob {ref} lido durante a consulta")
+
+    monkeypatch.setattr(database.blobs, "get", fail)
+    latest = database.get_latest_test_results("obj")
+    assert [run.error_message for run in latest] == [None, None, None]
+    assert all(run.output_ref for run in latest)
+    assert all(run.error_message is None for run in database.get_test_runs("obj"))
+    assert database.get_test_run(runs[0].id).error_message is None
+
+    reads: List[str] = []
+
+    def read(ref: str) -> str:
+        reads.append(ref)
+        return "falhou"
+
+    monkeypatch.setattr(database.blobs, "get", read)
+    database.load_error_previews(latest)
+    assert [run.error_message for run in latest] == ["falhou"] * 3
+    assert len(reads) == 1  # blob compartilhado lido uma única vez
+
+
+def test_trends_from_rollup_and_window_functions(database: Database) -> None:
+    """Testa a rollup diária (mantida pelo trigger e imune à compactação) e as tendências."""
+    from datetime import datetime, timedelta
+
+    from src.models import TestRun, TestStatus
+
+    base = datetime(2026, 3, 1, 12)
+    durations = [1.0, 1.1, 0.9, 1.0, 1.0, 3.0, 1.0]
+    for index, duration in enumerate(durations):
+        status = TestStatus.FAILED if index % 3 == 0 else TestStatus.PASSED
+        database.save_test_runs(
+            [
+                TestRun(
+                    run_id=f"r{index}",
+                    objective_id="obj",
+                    test_file="f.py",
+                    test_name="test_a",
+                    status=status,
+                    duration=duration,
+                    run_at=base + timedelta(days=index // 2),
+                ),
+            ]
+        )
+
+    def rates() -> list:
+        return [
+            (t.day, t.runs, t.passed, t.pass_rate, t.rolling_pass_rate)
+            for t in database.get_pass_rate_trend(window_days=2)
+        ]
+
+    expected = [
+        ("2026-03-01", 2, 1, 0.5, 0.5),
+        ("2026-03-02", 2, 1, 0.5, 0.5),
+        ("2026-03-03", 2, 2, 1.0, 0.75),
+        ("2026-03-04", 1, 0, 0.0, 2 / 3),
+    ]
+    assert rates() == expected
+    database.compact_test_runs(keep_last=1)
+    assert rates() == expected
+    assert [t.day for t in database.get_pass_rate_trend(since=base + timedelta(days=3))] == [
+        "2026-03-04"
+    ]
+
+
+def test_duration_trends_and_jumps(database: Database) -> None:
+    """Testa os percentis das últimas execuções e a detecção de saltos de duração."""
+    from datetime import datetime, timedelta
+
+    from src.models import TestRun, TestStatus
+
+    base = datetime(2026, 3, 1, 12)
+    durations = [1.0, 1.1, 0.9, 1.0, 1.0, 3.0, 1.0]
+    database.save_test_runs(
+        [
+            TestRun(
+                run_id=f"r{index}",
+                objective_id="obj",
+                test_file="f.py",
+                test_name="test_a",
+                status=TestStatus.PASSED,
+                duration=duration,
+                run_at=base + timedelta(hours=index),
+            )
+            for index, duration in enumerate(durations)
+        ]
+    )
+
+    [trend] = database.get_duration_trends(last_runs=5)
+    # Últimas 5: 0.9, 1.0, 1.0, 3.0, 1.0
+    assert (trend.runs, trend.p50, trend.p95, trend.max, trend.latest) == (5, 1.0, 3.0, 3.0, 1.0)
+
+    [jump] = database.get_duration_jumps()
+    assert (jump.run_id, jump.duration, jump.baseline, jump.ratio) == ("r5", 3.0, 1.0, 3.0)
+    assert database.get_duration_jumps(threshold=3.5) == []
+    assert database.get_duration_jumps(since=base + timedelta(hours=6)) == []
+
+
+def test_file_durations_from_recent_rollup(database: Database) -> None:
+    """Testa a duração por arquivo (soma das médias por teste) na janela recente da rollup."""
+    from datetime import datetime, timedelta
+
+    from src.database import FILE_DURATION_WINDOW_DAYS
+    from src.models import TestRun, TestStatus
+
+    last = datetime(2026, 3, 20, 12)
+
+    def run(test_file: str, test_name: str, duration: float, days_ago: int) -> TestRun:
+        return TestRun(
+            objective_id="obj",
+            test_file=test_file,
+            test_name=test_name,
+            status=TestStatus.PASSED,
+            duration=duration,
+            run_at=last - timedelta(days=days_ago),
+        )
+
+    database.save_test_runs(
+        [
+            run("a.py", "test_1", 100.0, FILE_DURATION_WINDOW_DAYS),  # fora da janela
+            run("a.py", "test_1", 1.0, FILE_DURATION_WINDOW_DAYS - 1),
+            run("a.py", "test_1", 3.0, 0),
+            run("a.py", "test_2", 0.5, 0),
+            run("b.py", "test_3", 4.0, 2),
+        ]
+    )
+    assert database.get_file_durations() == {("obj", "a.py"): 2.5, ("obj", "b.py"): 4.0}
+    database.compact_test_runs(keep_last=1)
+    assert database.get_file_durations() == {("obj", "a.py"): 2.5, ("obj", "b.py"): 4.0}
+    assert database.get_objective_durations() == {"obj": 6.5}
+
+
+def test_duration_regressions_use_median_and_mad(database: Database) -> None:
+    """Testa a detecção, o encerramento e a persistência das regressões de duração."""
+    from datetime import datetime, timedelta
+
+    from src.models import TestRun, TestStatus
+
+    base = datetime(2026, 3, 1, 12)
+
+    def run(index: int, duration: float, status: TestStatus = TestStatus.PASSED) -> TestRun:
+        test_run = TestRun(
+            run_id=f"r{index}",
+            objective_id="obj",
+            test_file="f.py",
+            test_name="test_a",
+            status=status,
+            duration=duration,
+            run_at=base + timedelta(minutes=index),
+        )
+        database.save_test_runs([test_run])
+        return test_run
+
+    # Histórico curto demais: nada é marcado
+    assert database.update_duration_regressions([run(0, 5.0)]) == []
+    # Histórico com um outlier (5.0) que não desloca a mediana
+    for index, duration in enumerate([1.0, 1.02, 0.98, 1.01, 0.99], start=1):
+        run(index, duration)
+    assert database.update_duration_regressions([run(6, 1.03)]) == []
+
+    [regression] = database.update_duration_regressions([run(7, 1.6)])
+    assert (regression.baseline_median, regression.duration) == (1.01, 1.6)
+    assert regression.score >= 3.5
+    assert database.get_duration_regressions() == {"obj": [regression]}
+    assert database.get_duration_regressions({"outro"}) == {}
+
+    # Falha não altera o estado; duração normal encerra a regressão
+    database.update_duration_regressions([run(8, 0.1, TestStatus.FAILED)])
+    assert database.get_duration_regressions() == {"obj": [regression]}
+    database.update_duration_regressions([run(9, 1.0)])
+    assert database.get_duration_regressions() == {}
+
+
+def test_retention_policy_setting(database: Database) -> None:
+    """Testa a política automática de retenção."""
+    _save_runs(database, "obj", ["PASSED"] * 5)
+    assert database.apply_retention_policy() is None
+
+    database.set_setting("retention.keep_last", "1")
+    report = database.apply_retention_policy()
+    assert report is not None
+    assert report.rows_deleted == 3
+    assert len(database.get_test_runs("obj")) == 2
+
+    database.set_setting("retention.keep_last", None)
+    assert database.get_setting("retention.keep_last") is None
+
+
+def test_incremental_vacuum_releases_all_free_pages(database: Database) -> None:
+    """Testa que a compactação com vacuum incremental esvazia a freelist."""
+    import sqlite3
+    from datetime import datetime, timedelta
+
+    from src.models import TestRun, TestStatus
+
+    database.vacuum(incremental=True)
+    base = datetime(2026, 1, 1)
+    database.save_test_runs(
+        [
+            TestRun(
+                objective_id="obj",
+                test_file="f.py",
+                test_name=f"test_{i % 50}",
+                status=TestStatus.PASSED,
+                duration=0.1,
+                run_at=base + timedelta(seconds=i),
+            )
+            for i in range(5000)
+        ]
+    )
+    size = database.file_size()
+
+    database.set_setting("retention.keep_last", "1")
+    report = database.apply_retention_policy()
+    assert report is not None and report.rows_deleted > 4000
+
+    conn = sqlite3.connect(database.db_path)
+    assert conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+    conn.close()
+    assert report.size_after < size / 2
+
+
+def test_latest_test_results_tracks_last_batch(database: Database) -> None:
+    """Testa a visão de últimos resultados por teste e o filtro por run_id."""
+    from datetime import datetime, timedelta
+
+    from src.models import TestRun, TestStatus
+
+    now = datetime.now()
+    first = [
+        TestRun(
+            run_id="r1",
+            objective_id="obj",
+            test_file="f.py",
+            test_name=name,
+            status=TestStatus.FAILED,
+            run_at=now,
+        )
+        for name in ("test_a", "test_b")
+    ]
+    database.save_test_runs(first)
+    second = [
+        TestRun(
+            run_id="r2",
+            objective_id="obj",
+            test_file="f.py",
+            test_name="test_a",
+            status=TestStatus.PASSED,
+            run_at=now + timedelta(seconds=1),
+        ),
+    ]
+    database.save_test_runs(second)
+
+    latest = database.get_latest_test_results("obj")
+    # test_b sumiu do arquivo na última rodada
+    assert [(r.test_name, r.status, r.run_id) for r in latest] == [
+        ("test_a", TestStatus.PASSED, "r2"),
+    ]
+    assert len(database.get_test_runs("obj")) == 3
+    assert [r.run_id for r in database.get_test_runs("obj", run_id="r1")] == ["r1", "r1"]
+    assert database.count_latest_results_by_file("obj") == {"f.py": 1}
+    assert database.count_latest_results_by_file("outro") == {}
+
+    latest_run = database.get_latest_test_run("obj")
+    assert latest_run is not None
+    assert latest_run.run_id == "r2"
+    assert database.get_latest_test_run("outro") is None
+
+
+def test_schema_migration_backfills_latest_results(temp_db_path: Path) -> None:
+    """Testa que bancos antigos ganham run_id e latest_test_results preenchida."""
+    import sqlite3
+    conn = sqlite3.connect(temp_db_path)
+    conn.execute("""
+        CREATE TABLE test_runs (
+            id TEXT PRIMARY KEY, objective_id TEXT NOT NULL, test_file TEXT NOT NULL,
+            test_name TEXT NOT NULL, status TEXT NOT NULL, error_message TEXT,
+            duration REAL, run_at TEXT NOT NULL
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO test_runs VALUES (?, 'obj', 'f.py', 'test_a', ?, NULL, 0.1, ?)",
+        [("1", "FAILED", "2026-01-01T00:00:00"), ("2", "PASSED", "2026-01-02T00:00:00")],
+    )
+    conn.commit()
+    conn.close()
+
+    db = Database(temp_db_path)
+    latest = db.get_latest_test_results("obj")
+    assert [(r.id, r.status.value, r.run_id) for r in latest] == [("2", "PASSED", "")]
+
+
+def test_get_flaky_tests_scores_status_flips(database: Database) -> None:
+    """Testa o score de instabilidade com tentativas de uma mesma rodada."""
+    from datetime import datetime, timedelta
+
+    from src.models import TestRun, TestStatus
+
+    now = datetime.now()
+    runs = []
+    # Rodadas: PASSED, (FAILED → PASSED na retentativa), PASSED, FAILED
+    for index, (status, attempt) in enumerate(
+        [
+            ("PASSED", 1),
+            ("FAILED", 1),
+            ("PASSED", 2),
+            ("PASSED", 1),
+            ("FAILED", 1),
+        ]
+    ):
+        runs.append(
+            TestRun(
+                run_id=f"r{index}",
+                objective_id="obj",
+                test_file="f.py",
+                test_name="test_flaky",
+                status=TestStatus(status),
+                attempt=attempt,
+                run_at=now + timedelta(seconds=index),
+            )
+        )
+    runs += [
+        TestRun(
+            run_id="s",
+            objective_id="obj",
+            test_file="f.py",
+            test_name="test_stable",
+            status=TestStatus.FAILED,
+            run_at=now + timedelta(seconds=index),
+        )
+        for index in range(3)
+    ]
+    for run in runs:
+        database.save_test_run(run)
+
+    flaky = database.get_flaky_tests()
+    assert [(f.test_name, f.runs, f.failures, f.flips, f.retry_passes) for f in flaky] == [
+        ("test_flaky", 5, 2, 3, 1),
+    ]
+    assert flaky[0].score == 0.75
+    # Janela das 2 execuções mais recentes: PASSED → FAILED
+    assert database.get_flaky_tests(window=2)[0].score == 1.0
+    assert database.get_flaky_tests(min_score=0.8) == []
+
+
+def test_objective_dependencies_persisted(database: Database) -> None:
+    """Testa a persistência das dependências e as consultas do grafo."""
+    base = Objective(nome="Base", descricao="Desc", tipos=[ObjectiveType.CLI_COMMAND])
+    meio = Objective(
+        nome="Meio", descricao="Desc", tipos=[ObjectiveType.CLI_COMMAND], dependencias=[base.id]
+    )
+    topo = Objective(
+        nome="Topo", descricao="Desc", tipos=[ObjectiveType.CLI_COMMAND], dependencias=[meio.id]
+    )
+    for obj in (base, meio, topo):
+        database.create_objective(obj)
+
+    assert database.get_objective(topo.id).dependencias == [meio.id]
+    assert {o.id: o.dependencias for o in database.list_objectives()}[meio.id] == [base.id]
+    assert database.get_dependents(base.id) == [meio.id]
+    assert database.depends_on(topo.id, base.id)
+    assert not database.depends_on(base.id, topo.id)
+
+    database.delete_objective(meio.id)
+    assert database.get_objective(topo.id).dependencias == []
+
+
+def test_search_objectives(database: Database) -> None:
+    """Testa a busca textual com ranking, prefixos e sincronização do índice."""
+    login = Objective(
+        nome="Autenticação de usuários",
+        descricao="Login com senha",
+        tipos=[ObjectiveType.CLI_COMMAND],
+        invariantes=["Senha nunca é gravada em texto puro"],
+    )
+    export = Objective(
+        nome="Exportar relatório",
+        descricao="Gera CSV; exige autenticação prévia",
+        tipos=[ObjectiveType.FILESYSTEM],
+    )
+    database.create_objective(login)
+    database.create_objective(export)
+
+    # Prefixo sem acento; o nome pesa mais que a descrição
+    hits = database.search_objectives("autenticacao")
+    assert [hit.objective.id for hit in hits] == [login.id, export.id]
+    assert database.search_objectives("texto puro")[0].objective.id == login.id
+    assert [h.objective.id for h in database.search_objectives("csv autent")] == [export.id]
+    # Sintaxe do FTS5 digitada pelo usuário é tratada como texto
+    assert [h.objective.id for h in database.search_objectives('"senha" (')] == [login.id]
+
+    login.nome = "Entrada no sistema"
+    database.update_objective(login)
+    assert [h.objective.id for h in database.search_objectives("entrada")] == [login.id]
+    database.delete_objective(login.id)
+    assert database.search_objectives("entrada") == []
+
+
+def test_search_objectives_like_fallback(database: Database) -> None:
+    """Sem FTS5, a busca usa LIKE em todas as colunas."""
+    database.create_objective(
+        Objective(nome="Relatório 100%", descricao="Gera CSV", tipos=[ObjectiveType.FILESYSTEM])
+    )
+    database.fts_enabled = False
+    assert len(database.search_objectives("csv")) == 1
+    assert len(database.search_objectives("100%")) == 1
+    assert database.search_objectives("10%0") == []
+
+
+def test_resolve_objective_id_by_prefix(database: Database) -> None:
+    """Testa a resolução de prefixos de ID por intervalo no índice."""
+    for objective_id in ("abc", "abcd1234", "abce0000", "b000"):
+        database.create_objective(
+            Objective(
+                id=objective_id,
+                nome=objective_id,
+                descricao="Desc",
+                tipos=[ObjectiveType.CLI_COMMAND],
+            )
+        )
+
+    assert database.resolve_objective_id("abcd") == "abcd1234"
+    assert database.resolve_objective_id("abc") == "abc"  # ID exato tem precedência
+    assert database.resolve_objective_id("b") == "b000"
+    assert database.resolve_objective_id("zz") is None
+    assert database.resolve_objective_id("") is None
+    with pytest.raises(AmbiguousObjectiveIdError) as info:
+        database.resolve_objective_id("ab")
+    assert info.value.candidates == ["abc", "abcd1234", "abce0000"]
+
+    with database._connection("explain") as conn:
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN "
+            "SELECT id FROM objectives WHERE id >= ? AND id < ? ORDER BY id LIMIT 2",
+            ("ab", "ac"),
+        ).fetchall()
+    assert "USING COVERING INDEX" in plan[0]["detail"]
+
+
+def test_object_cache_identity_and_write_through(temp_db_path: Path) -> None:
+    """Testa o cache de objetivos: mesma instância, contadores e escrita direta."""
+    db = Database(temp_db_path, cache_size=2)
+    base = Objective(nome="Base", descricao="Desc", tipos=[ObjectiveType.CLI_COMMAND])
+    topo = Objective(nome="Topo", descricao="Desc", tipos=[ObjectiveType.CLI_COMMAND])
+    db.create_objective(base)
+    db.create_objective(topo)
+
+    first = db.get_objective(topo.id)
+    assert db.get_objective(topo.id) is first
+    assert (db.cache_stats.hits, db.cache_stats.misses) == (2, 0)
+
+    db.add_dependency(topo.id, base.id)
+    db.set_objective_status(topo.id, ObjectiveStatus.BLOQUEADO)
+    assert first.dependencias == [base.id] and first.status == ObjectiveStatus.BLOQUEADO
+    first.nome = "Topo editado"
+    db.update_objective(first)
+
+    db.delete_objective(base.id)
+    assert first.dependencias == []
+    assert db.get_objective(base.id) is None
+
+    # O banco confirma o que o cache mostra
+    fresh = Database(temp_db_path).get_objective(topo.id)
+    assert (fresh.nome, fresh.status, fresh.dependencias) == (
+        "Topo editado",
+        ObjectiveStatus.BLOQUEADO,
+        [],
+    )
+
+
+def test_object_cache_is_bounded_and_invalidates_summaries(temp_db_path: Path) -> None:
+    """Testa o descarte LRU e a invalidação de sumários gravados."""
+    from src.models import TestSummary
+
+    db = Database(temp_db_path, cache_size=2)
+    objectives = [
+        Objective(nome=f"Obj {i}", descricao="Desc", tipos=[ObjectiveType.CLI_COMMAND])
+        for i in range(3)
+    ]
+    db.create_objectives(objectives)
+    for obj in objectives:
+        db.get_objective(obj.id)
+    assert db.cache_stats.evictions == 1
+    db.get_objective(objectives[0].id)
+    assert db.cache_stats.misses == 4
+
+    obj_id = objectives[2].id
+    assert db.get_test_summary(obj_id) is None
+    assert db.get_test_summary(obj_id) is None
+    db.store_test_summary(TestSummary(objective_id=obj_id, total_tests=1, passed=0, failed=1))
+    assert db.get_test_summary(obj_id).failed == 1
+    db.store_test_summary(TestSummary(objective_id=obj_id, total_tests=1, passed=1))
+    assert db.get_test_summary(obj_id).passed == 1
+
+    uncached = Database(temp_db_path)
+    uncached.get_objective(obj_id)
+    assert uncached.cache_stats == CacheStats()
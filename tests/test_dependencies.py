@@ -0,0 +1,133 @@
+"""Testes para o grafo de dependências entre objetivos."""
+
+from pathlib import Path
+
+import pytest
+
+from src import dependencies
+from src.database import Database
+from src.dependencies import DependencyCycleError, UnknownDependencyError
+from src.models import Objective, ObjectiveStatus, ObjectiveType, TestSummary
+from src.test_runner import TestRunner
+
+
+@pytest.fixture
+def database(tmp_path: Path) -> Database:
+    """Retorna uma instância do Database com banco temporário."""
+    return Database(tmp_path / "test.db")
+
+
+def _create(db: Database, nome: str, dependencias=None) -> Objective:
+    obj = Objective(
+        nome=nome,
+        descricao="Desc",
+        tipos=[ObjectiveType.CLI_COMMAND],
+        dependencias=list(dependencias or []),
+    )
+    db.create_objective(obj)
+    return obj
+
+
+def _summary(objective_id: str, passing: bool) -> TestSummary:
+    return TestSummary(
+        objective_id=objective_id, total_tests=1, passed=int(passing), failed=int(not passing)
+    )
+
+
+def test_find_cycle() -> None:
+    """Testa a detecção de ciclos no grafo."""
+    assert dependencies.find_cycle({"a": ["b"], "b": ["c"], "c": []}) is None
+    assert dependencies.find_cycle({"a": ["b"], "b": ["c"], "c": ["a"]}) == ["a", "b", "c", "a"]
+
+
+def test_topological_levels() -> None:
+    """Testa o agrupamento em níveis, ignorando dependências externas."""
+    graph = {"app": ["lib", "cfg"], "lib": ["core"], "cfg": ["externo"]}
+    levels = dependencies.topological_levels(["app", "lib", "cfg", "core"], graph)
+    assert levels == [["cfg", "core"], ["lib"], ["app"]]
+
+    with pytest.raises(DependencyCycleError) as excinfo:
+        dependencies.topological_levels(["a", "b"], {"a": ["b"], "b": ["a"]})
+    assert set(excinfo.value.cycle) == {"a", "b"}
+
+
+def test_add_dependency_rejects_cycle(database: Database) -> None:
+    """Testa que arestas que fecham ciclo são recusadas."""
+    base = _create(database, "Base")
+    meio = _create(database, "Meio", [base.id])
+    topo = _create(database, "Topo", [meio.id])
+
+    with pytest.raises(DependencyCycleError):
+        dependencies.add_dependency(database, base.id, topo.id)
+    assert database.get_objective(base.id).dependencias == []
+    assert database.depends_on(topo.id, base.id)
+
+
+def test_create_and_update_validate_dependencies(database: Database) -> None:
+    """Testa que dependências inexistentes ou em ciclo não são gravadas."""
+    base = _create(database, "Base")
+    orphan = Objective(
+        nome="Órfão",
+        descricao="Desc",
+        tipos=[ObjectiveType.CLI_COMMAND],
+        dependencias=["inexistente"],
+    )
+    with pytest.raises(UnknownDependencyError):
+        database.create_objective(orphan)
+    assert database.get_objective(orphan.id) is None
+
+    # Ciclo dentro do lote: nenhum objetivo é gravado
+    a = Objective(nome="A", descricao="Desc", tipos=[ObjectiveType.CLI_COMMAND])
+    b = Objective(
+        nome="B", descricao="Desc", tipos=[ObjectiveType.CLI_COMMAND], dependencias=[a.id]
+    )
+    a.dependencias = [b.id]
+    with pytest.raises(DependencyCycleError):
+        database.create_objectives([a, b])
+    assert database.get_objective(a.id) is None and database.get_objective(b.id) is None
+
+    # Dependência para outro objetivo do mesmo lote é aceita
+    a.dependencias = [base.id]
+    assert database.create_objectives([b, a]) == [b, a]
+
+    base.dependencias = [b.id]
+    with pytest.raises(DependencyCycleError):
+        database.update_objective(base)
+    assert database.get_objective(base.id).dependencias == []
+
+
+def test_blocking_propagates_and_releases(database: Database) -> None:
+    """Testa o bloqueio transitivo e o retorno a DEFINIDO."""
+    base = _create(database, "Base")
+    meio = _create(database, "Meio", [base.id])
+    topo = _create(database, "Topo", [meio.id])
+
+    database.store_test_summary(_summary(base.id, passing=False))
+    changes = dependencies.update_blocking(database, database.get_dependents(base.id))
+    assert changes == [(meio.id, ObjectiveStatus.BLOQUEADO), (topo.id, ObjectiveStatus.BLOQUEADO)]
+
+    database.store_test_summary(_summary(base.id, passing=True))
+    changes = dependencies.update_blocking(database, database.get_dependents(base.id))
+    assert changes == [(meio.id, ObjectiveStatus.DEFINIDO), (topo.id, ObjectiveStatus.DEFINIDO)]
+
+
+def test_run_all_skips_dependents_of_failures(
+    database: Database, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Testa que dependentes de objetivos com falha não são executados."""
+    monkeypatch.chdir(tmp_path)
+    base = _create(database, "Base")
+    dependente = _create(database, "Dependente", [base.id])
+    independente = _create(database, "Independente")
+    for obj, body in (
+        (base, "assert False"),
+        (dependente, "assert True"),
+        (independente, "assert True"),
+    ):
+        test_dir = tmp_path / "tests" / "objectives" / obj.id
+        test_dir.mkdir(parents=True)
+        (test_dir / "test_x.py").write_text(f"def test_x():\n    {body}\n")
+
+    summaries = TestRunner(database, quiet=True).run_all_tests()
+    assert set(summaries) == {base.id, independente.id}
+    assert database.get_objective(dependente.id).status == ObjectiveStatus.BLOQUEADO
@@ -0,0 +1,114 @@
+"""Testes para a análise de impacto baseada em cobertura."""
+
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from src.database import Database
+from src.impact import changed_lines, find_affected, parse_diff
+from src.models import Objective, ObjectiveType
+from src.test_runner import TestRunner
+
+DIFF = """\
+diff --git a/src/app.py b/src/app.py
+index 1111111..2222222 100644
+--- a/src/app.py
++++ b/src/app.py
+@@ -3,2 +3,3 @@ def f():
+-    a = 1
+-    b = 2
++    a = 10
++    b = 20
++    c = 30
+@@ -10,0 +12 @@ def g():
++    novo = True
+diff --git a/src/velho.py b/src/novo.py
+similarity index 90%
+rename from src/velho.py
+rename to src/novo.py
+--- a/src/velho.py
++++ b/src/novo.py
+@@ -1 +1 @@
+-x = 1
++x = 2
+diff --git a/src/removido.py b/src/removido.py
+deleted file mode 100644
+--- a/src/removido.py
++++ /dev/null
+@@ -1,2 +0,0 @@
+-a = 1
+-b = 2
+"""
+
+MODULE = """\
+def usada():
+    return 1
+
+
+def nao_usada():
+    return 2
+"""
+
+
+def test_parse_diff() -> None:
+    """Testa a extração das linhas alteradas de um diff unificado."""
+    changes = parse_diff(DIFF)
+    # Linhas antigas 3-4, novas 3-5 e vizinhas da inserção após a linha 10
+    assert changes["src/app.py"] == {3, 4, 5, 10, 11, 12}
+    assert changes["src/velho.py"] is None
+    assert changes["src/novo.py"] == {1}
+    assert changes["src/removido.py"] is None
+
+
+def _objective(db: Database, root: Path, test_body: str) -> Objective:
+    obj = Objective(nome="Cobertura", descricao="Desc", tipos=[ObjectiveType.CLI_COMMAND])
+    db.create_objective(obj)
+    test_dir = root / "tests" / "objectives" / obj.id
+    test_dir.mkdir(parents=True)
+    (test_dir / "test_mod.py").write_text(test_body)
+    return obj
+
+
+def test_coverage_guides_affected_objectives(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Testa a coleta de cobertura e o cruzamento com as alterações."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "mod.py").write_text(MODULE)
+    db = Database(tmp_path / "vibe.db")
+    covered = _objective(
+        db, tmp_path, "from mod import usada\n\ndef test_usada():\n    assert usada() == 1\n"
+    )
+    uncovered = Objective(nome="Sem cobertura", descricao="Desc", tipos=[ObjectiveType.CLI_COMMAND])
+    db.create_objective(uncovered)
+
+    TestRunner(db, quiet=True, coverage=True).execute_objective(covered.id)
+    coverage = db.get_objective_coverage(covered.id)
+    assert set(coverage) == {"mod.py"}
+    executed = {line for first, last in coverage["mod.py"] for line in range(first, last + 1)}
+    assert 2 in executed and 6 not in executed
+
+    assert db.get_objectives_covering({"mod.py": {6}}) == set()
+    assert db.get_objectives_covering({"mod.py": {2}}) == {covered.id}
+    assert db.get_objectives_covering({"mod.py": None}) == {covered.id}
+
+    affected, without_coverage = find_affected(db, {"mod.py": {6}})
+    assert affected == without_coverage == {uncovered.id}
+    affected, _ = find_affected(db, {f"tests/objectives/{covered.id}/test_mod.py": {1}})
+    assert covered.id in affected
+
+
+def test_changed_lines_from_git(tmp_path: Path) -> None:
+    """Testa o diff entre uma referência e a árvore de trabalho."""
+
+    def git(*args: str) -> None:
+        subprocess.run(["git", *args], cwd=tmp_path, check=True, capture_output=True)
+
+    git("init", "-q")
+    (tmp_path / "mod.py").write_text(MODULE)
+    git("add", "mod.py")
+    git("-c", "user.name=t", "-c", "user.email=t@t", "commit", "-qm", "base")
+    (tmp_path / "mod.py").write_text(MODULE.replace("return 2", "return 3"))
+
+    assert changed_lines("HEAD", tmp_path) == {"mod.py": {6}}
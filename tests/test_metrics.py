@@ -0,0 +1,70 @@
+"""Testes para as métricas em OpenMetrics."""
+
+from datetime import datetime
+from pathlib import Path
+
+from src import metrics
+from src.database import Database
+from src.models import Objective, ObjectiveType, TestRun, TestStatus
+
+
+def test_registry_renders_openmetrics() -> None:
+    """Testa contadores, histogramas, escape de rótulos e o marcador final."""
+    registry = metrics.Registry()
+    counter = registry.counter("app_requests", "Requisições", ("path",))
+    counter.inc(path='/a"b')
+    counter.inc(2, path='/a"b')
+    histogram = registry.histogram("app_latency_seconds", "Latência", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value)
+    assert registry.counter("app_requests", "Requisições", ("path",)) is counter
+
+    assert metrics.render(registry).splitlines() == [
+        "# TYPE app_requests counter",
+        "# HELP app_requests Requisições",
+        'app_requests_total{path="/a\\"b"} 3',
+        "# TYPE app_latency_seconds histogram",
+        "# HELP app_latency_seconds Latência",
+        'app_latency_seconds_bucket{le="0.1"} 1',
+        'app_latency_seconds_bucket{le="1.0"} 2',
+        'app_latency_seconds_bucket{le="+Inf"} 3',
+        "app_latency_seconds_sum 5.55",
+        "app_latency_seconds_count 3",
+        "# EOF",
+    ]
+
+
+def test_project_registry_and_database_counters(tmp_path: Path) -> None:
+    """Testa as métricas do estado do projeto e os contadores do Database."""
+    db = Database(tmp_path / "vibe.db")
+    obj = Objective(nome="Métricas", descricao="Desc", tipos=[ObjectiveType.CLI_COMMAND])
+    db.create_objective(obj)
+    saves = metrics.DB_OPERATIONS.value(operation="save_test_runs")
+    db.save_test_runs(
+        [
+            TestRun(
+                run_id="r",
+                objective_id=obj.id,
+                test_file="f.py",
+                test_name=f"test_{status.value}",
+                status=status,
+                duration=0.5,
+                run_at=datetime.now(),
+            )
+            for status in (TestStatus.PASSED, TestStatus.FAILED)
+        ]
+    )
+    assert metrics.DB_OPERATIONS.value(operation="save_test_runs") == saves + 1
+    assert metrics.DB_OPERATION_DURATION.count(operation="save_test_runs") == saves + 1
+
+    text = metrics.render(metrics.project_registry(db))
+    assert (
+        f'vibe_objective_info{{objective="{obj.id}",name="Métricas",status="DEFINIDO"}} 1' in text
+    )
+    assert f'vibe_test_runs_history_total{{objective="{obj.id}",status="FAILED"}} 1' in text
+    assert f'vibe_test_runs_history_seconds_total{{objective="{obj.id}"}} 1' in text
+
+    output = tmp_path / "textfile" / "vibe.prom"
+    metrics.write_textfile(output, text)
+    assert output.read_text(encoding="utf-8") == text
+    assert [path.name for path in output.parent.iterdir()] == ["vibe.prom"]
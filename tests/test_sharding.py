@@ -0,0 +1,75 @@
+"""Testes para o sharding."""
+
+from pathlib import Path
+
+import pytest
+
+from src.database import Database
+from src.models import Objective, ObjectiveType, TestRun, TestStatus
+from src.sharding import Shard, estimate_durations, partition, select_shard
+
+
+def test_shard_parse() -> None:
+    """Testa a leitura da especificação i/N."""
+    assert Shard.parse("2/4") == Shard(2, 4)
+    assert str(Shard.parse("1/1")) == "1/1"
+    for spec in ("0/2", "3/2", "a/b", "2"):
+        with pytest.raises(ValueError):
+            Shard.parse(spec)
+
+
+def test_partition_balances_durations_deterministically() -> None:
+    """Testa que a divisão equilibra a carga e independe da ordem de entrada."""
+    durations = {
+        ("o1", "a.py"): 7.0,
+        ("o1", "b.py"): 5.0,
+        ("o2", "c.py"): 4.0,
+        ("o2", "d.py"): 3.0,
+        ("o3", "e.py"): 1.0,
+    }
+    shards = partition(durations, durations, 2)
+    assert shards == partition(reversed(list(durations)), durations, 2)
+    loads = [sum(durations[unit] for unit in shard) for shard in shards]
+    assert sorted(loads) == [10.0, 10.0]
+    assert sorted(unit for shard in shards for unit in shard) == sorted(durations)
+
+
+def test_select_shard_uses_history(tmp_path: Path) -> None:
+    """Testa que o histórico de execuções define a divisão e arquivos novos usam a mediana."""
+    db = Database(tmp_path / "test.db")
+    obj = Objective(nome="Shard", descricao="Desc", tipos=[ObjectiveType.CLI_COMMAND])
+    db.create_objective(obj)
+    test_dir = tmp_path / "tests" / "objectives" / obj.id
+    test_dir.mkdir(parents=True)
+    for name in ("test_slow.py", "test_fast.py", "test_new.py", "__init__.py"):
+        (test_dir / name).write_text("")
+    db.save_test_runs(
+        [
+            TestRun(
+                run_id="r1",
+                objective_id=obj.id,
+                test_file=f"tests/objectives/{obj.id}/test_slow.py",
+                test_name="test_x",
+                status=TestStatus.PASSED,
+                duration=9.0,
+            ),
+            TestRun(
+                run_id="r1",
+                objective_id=obj.id,
+                test_file=f"tests/objectives/{obj.id}/test_fast.py",
+                test_name="test_y",
+                status=TestStatus.PASSED,
+                duration=1.0,
+            ),
+        ]
+    )
+
+    units = [(obj.id, "test_slow.py"), (obj.id, "test_fast.py"), (obj.id, "test_new.py")]
+    durations = estimate_durations(db, units)
+    assert durations[(obj.id, "test_new.py")] == 5.0
+
+    first, estimated = select_shard(db, Shard(1, 2), base_path=tmp_path / "tests")
+    second, _ = select_shard(db, Shard(2, 2), base_path=tmp_path / "tests")
+    assert first == {(obj.id, "test_slow.py")}
+    assert estimated == 9.0
+    assert second == {(obj.id, "test_fast.py"), (obj.id, "test_new.py")}
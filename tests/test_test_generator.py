@@ -10,7 +10,9 @@ from src.test_generator import (
     generate_test_directory,
     generate_test_file,
     generate_tests_for_objective,
+    load_manifest,
     map_objective_to_test_types,
+    sync_tests_for_objective,
 )
 
 
@@ -161,5 +163,60 @@ def test_generated_tests_fail_by_default(tmp_path: Path) -> None:
     assert "FAILED" in output or "ERROR" in output or "assert False" in output
 
 
+def test_regeneration_skips_unchanged_files(tmp_path: Path) -> None:
+    """Testa que regenerar sem mudanças não reescreve arquivos."""
+    obj = Objective(nome="Idempotente", tipos=[ObjectiveType.CLI_COMMAND])
+
+    first = sync_tests_for_objective(obj, base_path=tmp_path)
+    assert sorted(first.created) == [
+        "test_test_execution.py",
+        "test_test_exit_code.py",
+        "test_test_output.py",
+    ]
+    test_file = tmp_path / "objectives" / obj.id / "test_test_execution.py"
+    mtime = test_file.stat().st_mtime_ns
+
+    second = sync_tests_for_objective(obj, base_path=tmp_path)
+    assert second.written() == []
+    assert len(second.skipped) == 3
+    assert test_file.stat().st_mtime_ns == mtime
+
+    manifest = load_manifest(test_file.parent)
+    assert set(manifest) == set(first.created)
+
+
+def test_regeneration_updates_untouched_files(tmp_path: Path) -> None:
+    """Testa que arquivos intocados são atualizados quando o conteúdo muda."""
+    obj = Objective(nome="Original", tipos=[ObjectiveType.CLI_COMMAND])
+    sync_tests_for_objective(obj, base_path=tmp_path)
+
+    obj.nome = "Renomeado"
+    report = sync_tests_for_objective(obj, base_path=tmp_path)
+    assert len(report.updated) == 3
+    content = (tmp_path / "objectives" / obj.id / "test_test_output.py").read_text(encoding="utf-8")
+    assert "Renomeado" in content
+
+
+def test_regeneration_protects_edited_files(tmp_path: Path) -> None:
+    """Testa que arquivos editados manualmente nunca são sobrescritos."""
+    obj = Objective(nome="Protegido", tipos=[ObjectiveType.CLI_COMMAND])
+    sync_tests_for_objective(obj, base_path=tmp_path)
+
+    edited = tmp_path / "objectives" / obj.id / "test_test_execution.py"
+    edited.write_text("def test_test_execution():\n    assert True\n", encoding="utf-8")
+
+    obj.nome = "Protegido 2"
+    report = sync_tests_for_objective(obj, base_path=tmp_path)
+    assert report.protected == ["test_test_execution.py"]
+    assert "assert True" in edited.read_text(encoding="utf-8")
+    assert len(report.updated) == 2
+
+    # Arquivos sem registro no manifesto também são protegidos
+    (edited.parent / ".vibe-manifest.json").unlink()
+    report = sync_tests_for_objective(obj, base_path=tmp_path)
+    assert report.protected == ["test_test_execution.py"]
+    assert len(report.skipped) == 2
+
+
 # Necessário para os testes
 import os
@@ -148,3 +148,306 @@ def test_summary_calculation() -> None:
     
     summary.failed = 0
     assert summary.is_passing()
+
+
+def test_parse_pytest_output_assigns_errors_to_failing_tests(test_runner: TestRunner) -> None:
+    """Testa que banners não interrompem o parse e erros vão para o teste certo."""
+    stdout = """
+============================= test session starts ==============================
+collecting ... collected 2 items
+
+tests/objectives/x/test_a.py::test_fail FAILED                            [ 50%]
+tests/objectives/x/test_a.py::test_pass PASSED                            [100%]
+
+=================================== FAILURES ===================================
+__________________________________ test_fail ___________________________________
+tests/objectives/x/test_a.py:2: in test_fail
+    assert False, "Falha intencional"
+E   AssertionError: Falha intencional
+=========================== short test summary info ============================
+FAILED tests/objectives/x/test_a.py::test_fail - AssertionError: Falha intencional
+========================= 1 failed, 1 passed in 0.01s ==========================
+"""
+    results = test_runner._parse_pytest_output(stdout, "")
+    assert [(r[0], r[1]) for r in results] == [
+        ("test_fail", TestStatus.FAILED),
+        ("test_pass", TestStatus.PASSED),
+    ]
+    assert "Falha intencional" in results[0][3]
+    assert results[1][3] is None
+
+
+def test_parser_prefers_structured_results() -> None:
+    """Testa que linhas do plugin produzem resultados na hora, com duração real."""
+    from src.test_runner import PytestOutputParser
+    parser = PytestOutputParser()
+    assert parser.feed("tests/objectives/x/test_a.py::test_ok ") == []
+    assert parser.in_progress == "test_ok"
+    parser.feed("tests/objectives/x/test_a.py::test_ok PASSED [100%]")
+    results = parser.feed(
+        '##vibe-result {"name": "test_ok", "status": "PASSED", "duration": 0.25, "error": null}'
+    )
+    assert results == [("test_ok", TestStatus.PASSED, 0.25, None)]
+    assert parser.in_progress is None
+    assert parser.close() == []
+
+
+def _write_objective_tests(tmp_path: Path, objective_id: str, content: str) -> Path:
+    """Cria um arquivo de teste em <tmp>/tests/objectives/<id>/ e retorna a base."""
+    test_dir = tmp_path / "tests" / "objectives" / objective_id
+    test_dir.mkdir(parents=True)
+    (test_dir / "test_sample.py").write_text(content)
+    return tmp_path / "tests"
+
+
+def test_per_test_timeout_records_error(
+    test_runner: TestRunner, database: Database, tmp_path: Path
+) -> None:
+    """Testa que o timeout por teste do contrato marca o teste como ERROR."""
+    obj = Objective(
+        nome="Timeout por teste",
+        descricao="Teste lento",
+        tipos=[ObjectiveType.CLI_COMMAND],
+        timeout_teste=0.5,
+    )
+    database.create_objective(obj)
+    base = _write_objective_tests(
+        tmp_path,
+        obj.id,
+        """
+import time
+
+def test_fast():
+    assert True
+
+def test_slow():
+    time.sleep(10)
+""",
+    )
+
+    summary = test_runner.run_objective_tests(obj.id, base_path=base)
+    assert summary is not None
+    assert summary.passed == 1
+    assert summary.error == 1
+    latest = {r.test_name: r for r in database.get_latest_test_results(obj.id)}
+    assert latest["test_slow"].status == TestStatus.ERROR
+    assert "VibeTestTimeout" in database.get_test_output(latest["test_slow"])
+
+
+def test_objective_budget_kills_file_and_keeps_partial_results(
+    database: Database, tmp_path: Path
+) -> None:
+    """Testa que o orçamento do objetivo mata o processo e preserva resultados parciais."""
+    from src.test_runner import RunLimits
+
+    runner = TestRunner(database, quiet=True, limits=RunLimits(objective_timeout=2.0))
+    obj = Objective(nome="Orçamento", descricao="Travado", tipos=[ObjectiveType.CLI_COMMAND])
+    database.create_objective(obj)
+    base = _write_objective_tests(
+        tmp_path,
+        obj.id,
+        """
+import time
+
+def test_done():
+    assert True
+
+def test_hung():
+    time.sleep(60)
+""",
+    )
+
+    summary = runner.run_objective_tests(obj.id, base_path=base)
+    assert summary is not None
+    assert summary.passed == 1
+    assert summary.error == 1
+    runs = {r.test_name: r for r in database.get_latest_test_results(obj.id)}
+    assert runs["test_hung"].status == TestStatus.ERROR
+    assert "Timeout" in database.get_test_output(runs["test_hung"])
+
+
+def test_schedule_objectives_failing_first_then_longest() -> None:
+    """Testa a ordem: falhas recentes primeiro, depois os mais longos."""
+    from src.test_runner import schedule_objectives
+    objs = [Objective(nome=n, descricao="d", tipos=[ObjectiveType.CLI_COMMAND]) for n in "ABCD"]
+    a, b, c, d = objs
+    summaries = {
+        a.id: TestSummary(objective_id=a.id, total_tests=1, passed=1),
+        b.id: TestSummary(objective_id=b.id, total_tests=1, failed=1),
+        c.id: TestSummary(objective_id=c.id, total_tests=1, passed=1),
+    }
+    durations = {a.id: 1.0, b.id: 0.5, c.id: 9.0}
+    # D nunca rodou: recebe a duração mediana (1.0) e, empatado com A, mantém a ordem original
+    assert [o.nome for o in schedule_objectives(objs, summaries, durations)] == ["B", "C", "A", "D"]
+
+
+def test_fail_fast_stops_after_first_failure(
+    database: Database, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Testa que --fail-fast interrompe após o primeiro objetivo com falha."""
+    monkeypatch.chdir(tmp_path)
+    for nome in ("Um", "Dois", "Tres"):
+        obj = Objective(nome=nome, descricao="Falha", tipos=[ObjectiveType.CLI_COMMAND])
+        database.create_objective(obj)
+        _write_objective_tests(tmp_path, obj.id, "def test_fail():\n    assert False\n")
+
+    runner = TestRunner(database, quiet=True)
+    summaries = runner.run_all_tests(fail_fast=True)
+    assert len(summaries) == 1
+    assert len(runner.run_all_tests()) == 3
+
+
+def test_retries_rerun_only_failing_tests(database: Database, tmp_path: Path) -> None:
+    """Testa que apenas os testes com falha são reexecutados e cada tentativa é registrada."""
+    runner = TestRunner(database, quiet=True, retries=2)
+    obj = Objective(nome="Instável", descricao="Flaky", tipos=[ObjectiveType.CLI_COMMAND])
+    database.create_objective(obj)
+    marker = tmp_path / "calls.txt"
+    base = _write_objective_tests(
+        tmp_path,
+        obj.id,
+        f"""
+from pathlib import Path
+
+MARKER = Path({str(marker)!r})
+
+def test_stable():
+    with MARKER.open("a") as f:
+        f.write("stable\\n")
+
+class TestGroup:
+    def test_flaky(self):
+        with MARKER.open("a") as f:
+            f.write("flaky\\n")
+        assert MARKER.read_text().count("flaky") >= 2
+
+def test_broken():
+    assert False
+""",
+    )
+
+    result = runner.execute_objective(obj.id, base_path=base)
+    assert result is not None
+    summary, runs = result
+    attempts = sorted((run.test_name, run.attempt, run.status.value) for run in runs)
+    assert attempts == [
+        ("test_broken", 1, "FAILED"),
+        ("test_broken", 2, "FAILED"),
+        ("test_broken", 3, "FAILED"),
+        ("test_flaky", 1, "FAILED"),
+        ("test_flaky", 2, "PASSED"),
+        ("test_stable", 1, "PASSED"),
+    ]
+    assert marker.read_text().count("stable") == 1
+    assert (summary.total_tests, summary.passed, summary.failed) == (3, 2, 1)
+    latest = {r.test_name: r for r in database.get_latest_test_results(obj.id)}
+    assert latest["test_flaky"].attempt == 2
+    assert latest["test_flaky"].status == TestStatus.PASSED
+
+
+def test_output_capture_bounds_lines_and_ring() -> None:
+    """Testa o corte de linhas longas e o buffer circular do teste em andamento."""
+    from src.test_runner import OutputCapture
+
+    capture = OutputCapture(ring_chars=12, max_line_chars=5)
+    assert capture.feed("abc\nlinha".encode()) == ["abc"]
+    # Caractere multibyte dividido entre blocos e linha longa cortada
+    assert capture.feed("ção longa\nfim".encode()[:3]) == []
+    assert capture.feed("ção longa\nfim".encode()[3:]) == ["linha"]
+    assert capture.dropped_chars == len("ção longa")
+    assert capture.close() == ["fim"]
+
+    for line in ("um", "dois", "três", "quatro"):
+        capture.remember(line)
+    assert capture.recent() == "três\nquatro"
+    capture.reset()
+    assert capture.recent() == ""
+
+
+def test_huge_output_is_streamed_and_error_spilled(database: Database, tmp_path: Path) -> None:
+    """Testa saída enorme: memória limitada e erro cortado com o texto completo em blob."""
+    from src.blobs import DEFAULT_PREVIEW_CHARS
+
+    runner = TestRunner(database, quiet=True)
+    obj = Objective(nome="Saída enorme", descricao="Logs", tipos=[ObjectiveType.CLI_COMMAND])
+    database.create_objective(obj)
+    base = _write_objective_tests(
+        tmp_path,
+        obj.id,
+        """
+import sys
+
+def test_noisy():
+    for i in range(20000):
+        print("log " * 50)
+    sys.stdout.write("x" * 3_000_000)
+    assert False  # a saída capturada aparece no relatório de falhas
+
+def test_huge_error():
+    raise ValueError("detalhe " * 20000)
+""",
+    )
+
+    summary = runner.run_objective_tests(obj.id, base_path=base)
+    assert summary is not None
+    assert (summary.failed, summary.total_tests) == (2, 2)
+    run = {r.test_name: r for r in database.get_latest_test_results(obj.id)}["test_huge_error"]
+    database.load_error_previews([run])
+    assert len(run.error_message) < DEFAULT_PREVIEW_CHARS + 200
+    assert f"caracteres omitidos; texto completo: vibe test log {run.id[:8]}" in run.error_message
+    full = database.get_test_output(run)
+    assert full is not None and len(full) > 20000 * len("detalhe ")
+    assert run.error_message.endswith(full[-1000:])
+
+
+def test_test_timeout_covers_fixtures_and_hung_files(
+    database: Database, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Testa o timeout por teste no setup e o watchdog do arquivo sem prazo do objetivo."""
+    import time
+
+    from src import test_runner as runner_module
+    from src.test_runner import RunLimits, count_test_cases
+
+    runner = TestRunner(database, quiet=True, limits=RunLimits(test_timeout=1.0))
+    obj = Objective(
+        nome="Fixture travada", descricao="Setup lento", tipos=[ObjectiveType.CLI_COMMAND]
+    )
+    database.create_objective(obj)
+    base = _write_objective_tests(
+        tmp_path,
+        obj.id,
+        """
+import time
+
+import pytest
+
+@pytest.fixture
+def hung():
+    time.sleep(10)
+
+def test_ok():
+    assert True
+
+def test_hung_fixture(hung):
+    assert True
+""",
+    )
+
+    started = time.monotonic()
+    summary = runner.run_objective_tests(obj.id, base_path=base)
+    assert time.monotonic() - started < 8
+    assert summary is not None
+    assert (summary.passed, summary.error) == (1, 1)
+    runs = {r.test_name: r for r in database.get_latest_test_results(obj.id)}
+    assert "VibeTestTimeout: setup" in database.get_test_output(runs["test_hung_fixture"])
+    assert count_test_cases(base / "objectives" / obj.id / "test_sample.py") == 2
+
+    # Travado fora dos testes (na coleta): só o watchdog do arquivo encerra o processo
+    (base / "objectives" / obj.id / "test_sample.py").write_text("import time\ntime.sleep(60)\n")
+    monkeypatch.setattr(runner_module, "DEFAULT_FILE_TIMEOUT", 1.0)
+    monkeypatch.setattr(runner_module, "FILE_TIMEOUT_SLACK", 0.0)
+    started = time.monotonic()
+    summary = runner.run_objective_tests(obj.id, base_path=base)
+    assert time.monotonic() - started < 8
+    assert summary is not None and summary.error == 1
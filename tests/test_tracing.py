@@ -0,0 +1,58 @@
+"""Testes para os spans de rastreamento (Chrome trace-event)."""
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from src import tracing
+
+
+def test_disabled_tracer_returns_null_span(tmp_path: Path) -> None:
+    """Testa que, desligado, o rastreador não registra nada."""
+    tracer = tracing.Tracer()
+    with tracer.span("nada") as span:
+        pass
+    assert span is tracing._NULL_SPAN
+    assert tracer.export(tmp_path / "trace.json") == 0
+
+
+def test_spans_nest_and_export_trace_events(tmp_path: Path) -> None:
+    """Testa aninhamento, argumentos, erros e trilhas por tarefa asyncio."""
+    tracer = tracing.Tracer()
+    tracer.start()
+    with tracer.span("objective", "runner", objective_id="abc"):
+        with tracer.span("db.get_objective", "db"):
+            pass
+        with pytest.raises(ValueError):
+            with tracer.span("parse"):
+                raise ValueError("x")
+
+    async def file(name: str) -> None:
+        with tracer.span("pytest", file=name):
+            await asyncio.sleep(0)
+
+    async def run() -> None:
+        await asyncio.gather(file("a"), file("b"))
+
+    asyncio.run(run())
+    path = tmp_path / "trace.json"
+    assert tracer.export(path) == 5
+
+    document = json.loads(path.read_text(encoding="utf-8"))
+    spans = {
+        (e["name"], e.get("args", {}).get("file")): e
+        for e in document["traceEvents"]
+        if e["ph"] == "X"
+    }
+    outer = spans[("objective", None)]
+    inner = spans[("db.get_objective", None)]
+    assert outer["args"] == {"objective_id": "abc"}
+    assert inner["cat"] == "db"
+    assert outer["ts"] <= inner["ts"] and inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+    assert spans[("parse", None)]["args"] == {"error": "ValueError"}
+    tracks = {spans[("pytest", name)]["tid"] for name in ("a", "b")}
+    assert len(tracks) == 2 and outer["tid"] not in tracks
+    names = [e["args"]["name"] for e in document["traceEvents"] if e["name"] == "thread_name"]
+    assert len(names) == 3
@@ -62,3 +62,90 @@ def test_multiple_errors_are_reported(tmp_path: Path) -> None:
         StructureValidator.REQUIRED_FILES
     )
     assert len(errors) == expected_count
+
+
+def test_run_checks_reuses_cached_results(tmp_path: Path) -> None:
+    """Verificações com entradas inalteradas vêm do cache de validação."""
+    from src.database import Database
+    from src.models import Objective, ObjectiveType
+
+    (tmp_path / "state").mkdir()
+    db = Database(tmp_path / "state" / "vibe.db")
+    obj = Objective(nome="Cache", descricao="Desc", tipos=[ObjectiveType.CLI_COMMAND])
+    db.create_objective(obj)
+    test_dir = tmp_path / "tests" / "objectives" / obj.id
+    test_dir.mkdir(parents=True)
+    test_file = test_dir / "test_a.py"
+    test_file.write_text("# TODO\n")
+
+    validator = StructureValidator(tmp_path)
+    first = validator.run_checks()
+    assert (first.evaluated, first.reused) == (2, 0)
+    assert any("não tem funções de teste válidas" in e for e in first.integrity_errors)
+
+    second = validator.run_checks()
+    assert (second.evaluated, second.reused) == (0, 2)
+    assert second.integrity_errors == first.integrity_errors
+    assert second.health_problems == first.health_problems
+
+    # Editar um arquivo de teste reavalia apenas a integridade
+    test_file.write_text("def test_a():\n    assert True\n")
+    third = validator.run_checks()
+    assert (third.evaluated, third.reused) == (1, 1)
+    assert third.integrity_errors == []
+
+    assert validator.run_checks(full=True).evaluated == 2
+
+    db.delete_objective(obj.id)
+    validator.run_checks()
+    assert db.get_validation_results("integrity") == {}
+
+
+def test_affected_objectives(tmp_path: Path) -> None:
+    """Caminhos alterados são mapeados para os objetivos em tests/objectives/<id>/."""
+    from src.validator import affected_objectives
+
+    paths = [
+        str(tmp_path / "tests" / "objectives" / "abc" / "test_x.py"),
+        str(tmp_path / "tests" / "objectives" / "def" / "sub" / "test_y.py"),
+        str(tmp_path / "tests" / "test_outro.py"),
+        str(tmp_path / "src" / "cli.py"),
+        "/fora/do/projeto/tests/objectives/ghi/test_z.py",
+    ]
+    assert affected_objectives(paths, tmp_path) == {"abc", "def"}
+
+
+def test_run_checks_reports_duration_regressions(tmp_path: Path) -> None:
+    """Regressões de duração em aberto aparecem como avisos de desempenho."""
+    from datetime import datetime, timedelta
+
+    from src.database import Database
+    from src.models import Objective, ObjectiveType, TestRun, TestStatus
+
+    (tmp_path / "state").mkdir()
+    db = Database(tmp_path / "state" / "vibe.db")
+    obj = Objective(nome="Lento", descricao="Desc", tipos=[ObjectiveType.CLI_COMMAND])
+    db.create_objective(obj)
+    now = datetime.now()
+    runs = [
+        TestRun(
+            run_id=f"r{index}",
+            objective_id=obj.id,
+            test_file="f.py",
+            test_name="test_a",
+            status=TestStatus.PASSED,
+            duration=duration,
+            run_at=now + timedelta(seconds=index),
+        )
+        for index, duration in enumerate([0.5] * 6 + [2.0])
+    ]
+    db.save_test_runs(runs)
+    db.update_duration_regressions(runs[-1:])
+
+    report = StructureValidator(tmp_path).run_checks()
+    assert report.performance_warnings == [
+        f"Objetivo 'Lento' ({obj.id}): test_a ficou mais lento (0.500s → 2.000s, 4.0x a mediana)"
+    ]
+    assert (
+        StructureValidator(tmp_path).run_checks(objective_ids={"outro"}).performance_warnings == []
+    )
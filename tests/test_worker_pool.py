@@ -0,0 +1,114 @@
+"""Testes para o pool de workers pytest pré-aquecidos."""
+
+from pathlib import Path
+from typing import Dict, Iterator
+
+import pytest
+
+from src import metrics
+from src.async_runner import AsyncTestRunner
+from src.database import Database
+from src.models import Objective, ObjectiveType, TestStatus
+from src.test_runner import RunLimits, TestRunner
+from src.worker_pool import SUPPORTED, WorkerPool
+
+pytestmark = pytest.mark.skipif(not SUPPORTED, reason="exige fork e SCM_RIGHTS")
+
+
+@pytest.fixture
+def database(tmp_path: Path) -> Database:
+    """Retorna uma instância do Database com banco temporário."""
+    return Database(tmp_path / "test.db")
+
+
+@pytest.fixture
+def pool() -> Iterator[WorkerPool]:
+    """Pool com um worker."""
+    with WorkerPool(size=1) as workers:
+        yield workers
+
+
+def _create_objective(database: Database, tmp_path: Path, files: Dict[str, str]) -> Objective:
+    """Cria um objetivo com os arquivos de teste informados em <tmp>/tests."""
+    obj = Objective(nome="Warm", descricao="Workers", tipos=[ObjectiveType.CLI_COMMAND])
+    database.create_objective(obj)
+    test_dir = tmp_path / "tests" / "objectives" / obj.id
+    test_dir.mkdir(parents=True)
+    for name, content in files.items():
+        (test_dir / name).write_text(content)
+    return obj
+
+
+def test_warm_workers_isolate_runs(database: Database, pool: WorkerPool, tmp_path: Path) -> None:
+    """Testa resultados, isolamento entre arquivos e reexecuções no mesmo worker."""
+    obj = _create_objective(
+        database,
+        tmp_path,
+        {
+            "test_a.py": "import os\n\ndef test_leak():\n    os.environ['VIBE_LEAK'] = '1'\n\n"
+            "def test_fail():\n    assert False, 'falhou'\n",
+            "test_b.py": (
+                "import os\n\ndef test_clean():\n    assert 'VIBE_LEAK' not in os.environ\n"
+            ),
+        },
+    )
+    spawns = metrics.PYTEST_SPAWNS.value()
+    runner = TestRunner(database, quiet=True, retries=1, workers=pool)
+
+    result = runner.execute_objective(obj.id, base_path=tmp_path / "tests")
+
+    assert result is not None
+    summary, runs = result
+    assert (summary.passed, summary.failed) == (2, 1)
+    failed = [run for run in runs if run.status == TestStatus.FAILED]
+    assert [run.attempt for run in failed] == [1, 2]
+    assert "falhou" in (failed[0].error_message or "")
+    # Três processos (dois arquivos e uma reexecução) no mesmo worker
+    assert metrics.PYTEST_SPAWNS.value() == spawns + 3
+    assert pool.replaced == 0
+
+
+def test_warm_worker_timeout_and_dead_worker(
+    database: Database, pool: WorkerPool, tmp_path: Path
+) -> None:
+    """Testa o timeout de arquivo e a substituição de um worker encerrado por fora."""
+    obj = _create_objective(
+        database,
+        tmp_path,
+        {
+            "test_slow.py": (
+                "import time\n\ndef test_ok():\n    pass\n\n"
+                "def test_slow():\n    time.sleep(30)\n"
+            ),
+        },
+    )
+    runner = TestRunner(database, quiet=True, limits=RunLimits(objective_timeout=2), workers=pool)
+
+    result = runner.execute_objective(obj.id, base_path=tmp_path / "tests")
+    assert result is not None
+    statuses = {run.test_name: run.status for run in result[1]}
+    assert statuses == {"test_ok": TestStatus.PASSED, "test_slow": TestStatus.ERROR}
+
+    pool._idle[0].process.kill()
+    pool._idle[0].process.wait()
+    (tmp_path / "tests" / "objectives" / obj.id / "test_slow.py").write_text(
+        "def test_ok():\n    pass\n"
+    )
+    result = runner.execute_objective(obj.id, base_path=tmp_path / "tests")
+    assert result is not None and result[0].passed == 1
+    assert pool.replaced == 1
+
+
+def test_async_runner_with_warm_workers(database: Database, tmp_path: Path) -> None:
+    """Testa o runner assíncrono lendo a saída dos workers no loop de eventos."""
+    obj = _create_objective(
+        database,
+        tmp_path,
+        {f"test_{index}.py": f"def test_ok_{index}():\n    assert True\n" for index in range(4)},
+    )
+    with WorkerPool(size=2) as workers:
+        runner = AsyncTestRunner(database, quiet=True, concurrency=2, workers=workers)
+        result = runner.execute_objective(obj.id, base_path=tmp_path / "tests")
+
+    assert result is not None
+    assert result[0].passed == 4
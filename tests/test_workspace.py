@@ -0,0 +1,69 @@
+"""Testes para o workspace com vários projetos."""
+
+from pathlib import Path
+
+import pytest
+
+from src.database import Database
+from src.models import Objective, ObjectiveType, TestSummary
+from src.project import init_project
+from src.workspace import Workspace, project_db_path
+
+
+@pytest.fixture
+def workspace(tmp_path: Path) -> Workspace:
+    """Retorna um workspace com índice temporário."""
+    return Workspace(Database(tmp_path / "workspace.db"))
+
+
+def _make_project(root: Path, objectives: int, failing: int = 0) -> None:
+    root.mkdir(parents=True)
+    project_db_path(root).parent.mkdir()
+    db = Database(project_db_path(root))
+    for index in range(objectives):
+        obj = Objective(nome=f"Obj {index}", descricao="Desc", tipos=[ObjectiveType.CLI_COMMAND])
+        db.create_objective(obj)
+        failed = 1 if index < failing else 0
+        db.save_test_summary(
+            TestSummary(objective_id=obj.id, total_tests=1, passed=1 - failed, failed=failed)
+        )
+
+
+def test_add_rejects_duplicates(workspace: Workspace, tmp_path: Path) -> None:
+    """Testa o registro de projetos e a recusa de duplicados."""
+    (tmp_path / "proj").mkdir()
+    project = workspace.add(tmp_path / "proj")
+    assert project.name == "proj"
+    with pytest.raises(ValueError):
+        workspace.add(tmp_path / "proj", name="outro")
+    with pytest.raises(ValueError):
+        workspace.add(tmp_path / "inexistente")
+
+
+def test_health_attaches_projects_in_chunks(workspace: Workspace, tmp_path: Path) -> None:
+    """Testa a consulta entre projetos com mais bancos que o limite de ATTACH."""
+    for index in range(12):
+        _make_project(tmp_path / f"proj{index:02d}", objectives=index % 3 + 1, failing=index % 2)
+        workspace.add(tmp_path / f"proj{index:02d}")
+    (tmp_path / "sem-banco").mkdir()
+    workspace.add(tmp_path / "sem-banco")
+
+    health = workspace.health()
+    assert [item.project for item in health] == [f"proj{index:02d}" for index in range(12)]
+    for index, item in enumerate(health):
+        assert item.objectives == item.tested == index % 3 + 1
+        assert item.failing == index % 2
+        assert item.passing == item.objectives - item.failing
+
+
+def test_run_records_results(workspace: Workspace, tmp_path: Path) -> None:
+    """Testa a execução de project check em paralelo e o registro no índice."""
+    init_project(tmp_path / "valido")
+    (tmp_path / "invalido").mkdir()
+    workspace.add(tmp_path / "valido")
+    workspace.add(tmp_path / "invalido")
+
+    runs = workspace.run("check", jobs=2)
+    assert {run.project: run.exit_code for run in runs} == {"valido": 0, "invalido": 1}
+    assert "Diretório faltante" in next(run.output for run in runs if run.project == "invalido")
+    assert workspace.db.get_workspace_runs() == {("valido", "check"): 0, ("invalido", "check"): 1}